@@ -0,0 +1,263 @@
+"""Concurrent guest sessions against one server process, to find its concurrency ceiling.
+
+    python benchmarks/bench_load.py --users 1 2 4 8 --sessions 16
+    python benchmarks/bench_load.py --users 8 --sessions 40 --think 2 --db /tmp/load.db
+
+Starts ``streamlit run app.py`` and drives N simultaneous users through the
+whole flow over the browser's websocket protocol (the ``Session`` driver of
+bench_session_cpu.py), one thread per user: guest start, the demographics form,
+phase intros, 18 questions (option, advisor checkbox and pulse slider as
+fragment reruns, then "Continue ▶"), the results page and one more rerun there.
+AppTest cannot be used for this: its runs share process-global state and fail
+when several run at the same time.
+
+For each concurrency level the report shows rerun latency percentiles per stage
+as the client sees them, completed sessions per minute, and SQLite pressure
+read from the server's metrics file: the profile writer's wait for the write
+lock, busy retries, DB helper latencies and connections opened. Without
+``--db`` a throw-away DB is used; sessions are saved into it either way.
+
+Every rerun carries a ~40 ms floor that is not server work: Streamlit's
+websocket leaves Nagle's algorithm on, so after the first message of a rerun
+the rest wait for the client's delayed ACK. Browsers see the same. With
+``--quick-ack`` the client ACKs immediately (Linux TCP_QUICKACK), so the
+latencies show server time only.
+"""
+import argparse
+import json
+import random
+import re
+import socket
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import numpy as np
+from websockets.sync.client import connect
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from bench_session_cpu import REACTION_TIMER, Session, streamlit_server  # noqa: E402
+from neurorisk.metrics import bucket_quantile  # noqa: E402
+
+STAGES = ["home", "demographics", "simulation", "fragment", "results"]
+
+_SAMPLE = re.compile(r"^(\w+)(?:\{(.*)\})? (\S+)$")
+_LABEL = re.compile(r'(\w+)="((?:[^"\\]|\\.)*)"')
+
+
+class Recorder:
+    """Rerun latencies per stage, shared by all user threads."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.samples = {stage: [] for stage in STAGES}
+        self.completed = 0
+        self.errors = []
+
+    def add(self, stage: str, ms: float):
+        with self.lock:
+            self.samples[stage].append(ms)
+
+
+def _quick_ack(ws):
+    """Re-arm TCP_QUICKACK before every read (the kernel clears it again)."""
+    recv = ws.recv
+
+    def quick_recv(*args, **kwargs):
+        ws.socket.setsockopt(socket.IPPROTO_TCP, socket.TCP_QUICKACK, 1)
+        return recv(*args, **kwargs)
+    ws.recv = quick_recv
+
+
+def run_session(url: str, recorder: Recorder, think: float, rng: random.Random, quick_ack: bool = False):
+    """One guest from the home page to a second rerun of the results page."""
+    def timed(stage, action, *args):
+        if think:
+            time.sleep(think * rng.uniform(0.5, 1.5))
+        start = time.perf_counter()
+        result = action(*args)
+        recorder.add(stage, (time.perf_counter() - start) * 1000)
+        return result
+
+    try:
+        with connect(url, subprotocols=["streamlit"], max_size=None) as ws:
+            if quick_ack:
+                _quick_ack(ws)
+            session = timed("home", Session, ws)
+            timed("demographics", session.click, "Start Simulation as Guest")
+            timed("simulation", session.click, "To Simulation")
+            questions = 0
+            while True:
+                if session.find("button", "Continue to first"):
+                    timed("simulation", session.click, "Continue to first")
+                    continue
+                if not session.find("component_instance", REACTION_TIMER):
+                    break
+                questions += 1
+                timed("fragment", session.change, "radio", "Choose an option", "string_value", rng.randrange(4))
+                timed("fragment", session.change, "checkbox", "I would like help", "bool_value", rng.random() < 0.2)
+                timed("fragment", session.change, "slider", "If you look at your smartwatch",
+                      "double_array_value", [float(rng.randint(60, 110))])
+                reaction_ms = rng.uniform(2000, 12000)
+                timing = {"question_id": questions, "shown_ms": 0.0, "answered_ms": reaction_ms,
+                          "reaction_ms": reaction_ms}
+                # The last answer reruns straight into the results page (saving the profile)
+                timed("results" if questions == 18 else "simulation", session.change,
+                      "component_instance", REACTION_TIMER, "json_value", json.dumps(timing))
+            timed("results", session.rerun)
+        if session.exceptions:
+            raise RuntimeError(session.exceptions[0])
+        if questions != 18:
+            raise RuntimeError(f"session ended after {questions} questions")
+        with recorder.lock:
+            recorder.completed += 1
+    except Exception as e:
+        with recorder.lock:
+            recorder.errors.append(f"{type(e).__name__}: {e}")
+
+
+# ---------------------------------------------------------
+# Server metrics (Prometheus text file written by the app)
+# ---------------------------------------------------------
+def read_metrics(path: Path) -> dict:
+    """{(name, ((label, value), ...)): value} of every sample in the file."""
+    out = {}
+    for line in path.read_text(encoding="utf-8").splitlines():
+        match = _SAMPLE.match(line)
+        if match:
+            name, labels, value = match.groups()
+            out[(name, tuple(sorted(_LABEL.findall(labels or ""))))] = float(value)
+    return out
+
+
+def histogram_deltas(before: dict, after: dict, name: str) -> dict:
+    """{labels without le: (bucket bounds, per-bucket counts incl. +Inf)} observed between two reads."""
+    cumulative = {}
+    for (sample, labels), value in after.items():
+        if sample != f"{name}_bucket":
+            continue
+        le = dict(labels)["le"]
+        series = tuple(kv for kv in labels if kv[0] != "le")
+        delta = value - before.get((sample, labels), 0.0)
+        cumulative.setdefault(series, []).append((float(le), delta))  # float("+Inf") is inf
+    out = {}
+    for series, points in cumulative.items():
+        points.sort()
+        counts = [c - (points[i - 1][1] if i else 0.0) for i, (_, c) in enumerate(points)]
+        if sum(counts):
+            out[series] = ([le for le, _ in points[:-1]], counts)
+    return out
+
+
+def counter_delta(before: dict, after: dict, name: str) -> float:
+    return after.get((name, ()), 0.0) - before.get((name, ()), 0.0)
+
+
+def wait_for_metrics(path: Path, since: float, timeout: float = 30.0) -> dict:
+    """Metrics written after ``since`` with the profile writer's queue drained."""
+    deadline = time.time() + timeout
+    while True:
+        if path.exists() and path.stat().st_mtime > since:
+            metrics = read_metrics(path)
+            if not metrics.get(("neurorisk_writer_queued", ()), 0) or time.time() > deadline:
+                return metrics
+        time.sleep(0.2)
+
+
+# ---------------------------------------------------------
+# One concurrency level
+# ---------------------------------------------------------
+def run_level(url: str, metrics_file: Path, users: int, sessions: int, think: float, seed: int,
+              quick_ack: bool) -> dict:
+    before = wait_for_metrics(metrics_file, time.time())
+    recorder = Recorder()
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=users) as pool:
+        for i in range(sessions):
+            pool.submit(run_session, url, recorder, think, random.Random(seed * 100_003 + i), quick_ack)
+    elapsed = time.perf_counter() - start
+    after = wait_for_metrics(metrics_file, time.time())
+    return {"users": users, "elapsed": elapsed, "recorder": recorder, "before": before, "after": after}
+
+
+def _ms(seconds):
+    return "-" if seconds is None else f"{seconds * 1000:.1f}"
+
+
+def report(level: dict):
+    rec, before, after = level["recorder"], level["before"], level["after"]
+    print(f"\n== {level['users']} concurrent users: {rec.completed} sessions in {level['elapsed']:.1f}s "
+          f"({rec.completed / level['elapsed'] * 60:.1f} sessions/min), {len(rec.errors)} errors")
+    print(f"  {'stage':<14} {'reruns':>7} {'p50 ms':>9} {'p90 ms':>9} {'p99 ms':>9} {'max ms':>9}")
+    for stage, samples in rec.samples.items():
+        if samples:
+            p50, p90, p99 = np.percentile(samples, [50, 90, 99])
+            print(f"  {stage:<14} {len(samples):>7} {p50:9.1f} {p90:9.1f} {p99:9.1f} {max(samples):9.1f}")
+
+    def delta(name):
+        return int(counter_delta(before, after, name))
+
+    print(f"  SQLite: {delta('neurorisk_writer_batches_total')} writer commits "
+          f"({delta('neurorisk_writer_committed_total')} profiles, {delta('neurorisk_writer_failed_total')} failed, "
+          f"{delta('neurorisk_writer_busy_retries_total')} busy retries), "
+          f"{delta('neurorisk_db_connections_opened_total')} connections opened")
+    for buckets, counts in histogram_deltas(before, after, "neurorisk_db_lock_wait_seconds").values():
+        print(f"    {'write-lock wait':<26} {sum(counts):>6.0f} waits   p50 {_ms(bucket_quantile(buckets, counts, 0.5)):>7} ms"
+              f"   p99 {_ms(bucket_quantile(buckets, counts, 0.99)):>7} ms")
+    helpers = histogram_deltas(before, after, "neurorisk_db_seconds")
+    for series, (buckets, counts) in sorted(helpers.items()):
+        print(f"    {dict(series)['helper']:<26} {sum(counts):>6.0f} calls   "
+              f"p50 {_ms(bucket_quantile(buckets, counts, 0.5)):>7} ms   "
+              f"p99 {_ms(bucket_quantile(buckets, counts, 0.99)):>7} ms")
+    for error in sorted(set(rec.errors))[:5]:
+        print(f"  error: {error}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--app", default=str(ROOT / "app.py"))
+    parser.add_argument("--users", type=int, nargs="+", default=[1, 2, 4, 8],
+                        help="concurrency levels to run, one after another")
+    parser.add_argument("--sessions", type=int, default=None, help="sessions per level (default: 2 x users)")
+    parser.add_argument("--think", type=float, default=0.0, help="mean pause in seconds before each interaction")
+    parser.add_argument("--db", help="DB to load (default: a throw-away DB); sessions are saved into it")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--quick-ack", action="store_true",
+                        help="ACK immediately, removing the ~40 ms delayed-ACK wait from every rerun")
+    args = parser.parse_args()
+
+    levels = []
+    with tempfile.TemporaryDirectory() as tmp:
+        metrics_file = Path(tmp) / "load.prom"
+        env = {
+            "NEURORISK_DB": args.db or str(Path(tmp) / "load.db"),
+            "NEURORISK_METRICS_FILE": str(metrics_file),
+            "NEURORISK_METRICS_INTERVAL": "0.5",
+        }
+        with streamlit_server(args.app, env) as (url, _):
+            warmup = Recorder()
+            run_session(url, warmup, 0.0, random.Random(0), args.quick_ack)  # imports, DB init, caches
+            if warmup.errors:
+                sys.exit(f"warm-up session failed: {warmup.errors[0]}")
+            for users in args.users:
+                level = run_level(url, metrics_file, users, args.sessions or 2 * users, args.think, args.seed,
+                                  args.quick_ack)
+                report(level)
+                levels.append(level)
+
+    print("\nthroughput by concurrency:")
+    for level in levels:
+        rec = level["recorder"]
+        reruns = [ms for stage, samples in rec.samples.items() if stage != "fragment" for ms in samples]
+        print(f"  {level['users']:>3} users   {rec.completed / level['elapsed'] * 60:7.1f} sessions/min   "
+              f"full-rerun median {statistics.median(reruns) if reruns else 0:7.1f} ms")
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,89 @@
+"""Overhead of the timing instrumentation relative to a rerun, plus a sample of what it records.
+
+    python benchmarks/bench_metrics.py --reruns 20
+
+Times one clock read + Histogram.observe (what every timing point costs), counts how many
+observations one rerun of each stage records (AppTest, throw-away DB) and
+reports observations x cost as a share of the median rerun time.
+"""
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from bench_rerun import _check, step_simulation  # noqa: E402
+from neurorisk.metrics import REGISTRY, Histogram  # noqa: E402
+
+
+def per_call_seconds(fn, n: int = 200_000) -> float:
+    start = time.perf_counter()
+    for _ in range(n):
+        fn()
+    return (time.perf_counter() - start) / n
+
+
+def observations() -> int:
+    return sum(sum(sum(counts) for counts, _ in h.series().values()) for h in REGISTRY.histograms())
+
+
+def measure_stage(at, reruns: int):
+    before = observations()
+    samples = []
+    for _ in range(reruns):
+        start = time.perf_counter()
+        at.run()
+        samples.append(time.perf_counter() - start)
+        _check(at)
+    return statistics.median(samples), (observations() - before) / reruns
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--reruns", type=int, default=20)
+    args = parser.parse_args()
+
+    # What RunTimer.lap / Histogram.time do per call: one clock read plus one observe
+    scratch = Histogram("bench_seconds", "scratch", ("stage", "section"))
+    cost = per_call_seconds(lambda: scratch.observe(time.perf_counter(), "results", "1_biometrics"))
+
+    from streamlit.testing.v1 import AppTest
+
+    with tempfile.TemporaryDirectory() as tmp:
+        os.environ["NEURORISK_DB"] = str(Path(tmp) / "metrics.db")
+        os.environ["NEURORISK_METRICS_FILE"] = str(Path(tmp) / "metrics.prom")
+        os.chdir(ROOT)
+        at = AppTest.from_file(str(ROOT / "app.py"), default_timeout=120)
+        at.run()
+        _check(at)
+        stages = {"home": measure_stage(at, args.reruns)}
+        at.button(key="guest_start").click().run()
+        [b for b in at.button if "To Simulation" in str(b.label)][0].click().run()
+        while at.session_state.current_question_id is None:
+            step_simulation(at)
+        stages["simulation"] = measure_stage(at, args.reruns)
+        while at.session_state.stage == "simulation":
+            step_simulation(at)
+        at.run()
+        stages["results"] = measure_stage(at, args.reruns)
+
+    print(f"cost per observation: {cost * 1e6:.2f} us")
+    for stage, (rerun, n_obs) in stages.items():
+        share = n_obs * cost / rerun * 100
+        print(f"  {stage:<11} rerun {rerun * 1000:7.1f} ms   {n_obs:4.1f} observations   overhead {share:.4f}%")
+
+    print("\nrecorded (p50 / p95 / p99 ms):")
+    for histogram in REGISTRY.histograms():
+        for labels in sorted(histogram.series()):
+            q = [histogram.quantile(p, *labels) for p in (0.5, 0.95, 0.99)]
+            print(f"  {histogram.name:<26} {'/'.join(labels):<30} "
+                  + " / ".join(f"{v * 1000:7.2f}" for v in q))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,96 @@
+"""Training time, holdout accuracy and per-session inference latency of the What-if models.
+
+    python benchmarks/bench_models.py --sizes 100000 1000000
+
+For every population size (synthetic DBs shared with bench_suite.py) trains the
+panic-probability model and the crisis-stress forecast the way their CLIs do,
+reports holdout accuracy (AUC and log loss; RMSE and R² against predicting the
+mean) and times inference on freshly simulated sessions as the results page
+passes them in. The stress forecast is also timed on sessions cut off before
+the crisis phase, as the crisis phase intro shows it.
+"""
+import argparse
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from bench_suite import app_sessions, population_db  # noqa: E402
+from neurorisk import panic, stress  # noqa: E402
+from neurorisk.db import ConnectionManager  # noqa: E402
+from neurorisk.panic import save_model  # noqa: E402
+
+# name: (training module, model class)
+MODELS = {"panic": (panic, panic.PanicModel), "stress": (stress, stress.StressModel)}
+
+
+def _us(samples):
+    return f"p50 {statistics.median(samples) * 1e6:7.1f} µs   p99 {np.percentile(samples, 99) * 1e6:7.1f} µs"
+
+
+def _latencies(fn, items, rounds: int = 5):
+    samples = []
+    for _ in range(rounds):
+        for item in items:
+            start = time.perf_counter()
+            fn(item)
+            samples.append(time.perf_counter() - start)
+    return samples
+
+
+def run_size(db_path: Path, sessions, tmp: Path):
+    db = ConnectionManager(db_path)
+    trained = {}
+    with db.connection() as conn:
+        for name, (module, _) in MODELS.items():
+            start = time.perf_counter()
+            trained[name] = (module.train(conn), time.perf_counter() - start)
+    db.close_all()
+    if any(model is None for model, _ in trained.values()):
+        print(f"{db_path.name}: too few profiles to train")
+        return
+
+    # Round trip through the model files, as the app loads them
+    models = {}
+    for name, (model, _) in trained.items():
+        path = tmp / f"{db_path.stem}.{name}.json"
+        save_model(model, path)
+        models[name] = MODELS[name][1].load(path), path.stat().st_size
+    full = [r for _, r in sessions]
+    before_crisis = [[resp for resp in r if resp["phase"] != "crisis"] for r in full]
+
+    model, elapsed = trained["panic"]
+    holdout = model["holdout"]
+    print(f"{model['profiles']:>9,} profiles")
+    print(f"    panic      train {elapsed:6.2f} s   holdout AUC {holdout['auc']:.3f}  log loss {holdout['log_loss']:.3f}"
+          f"  (base rate {model['base_rate']:.1%}, {models['panic'][1]} B file)")
+    print(f"               predict {_us(_latencies(models['panic'][0].predict, full))}")
+    model, elapsed = trained["stress"]
+    holdout = model["holdout"]
+    print(f"    stress     train {elapsed:6.2f} s   holdout RMSE {holdout['rmse']:.3f}  R² {holdout['r2']:.3f}"
+          f"  (mean only: RMSE {holdout['baseline_rmse']:.3f}, {models['stress'][1]} B file)")
+    print(f"               forecast {_us(_latencies(models['stress'][0].forecast, full))}   "
+          f"before crisis {_us(_latencies(models['stress'][0].forecast, before_crisis))}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100_000, 1_000_000])
+    parser.add_argument("--data-dir", type=Path, default=Path(tempfile.gettempdir()) / "neurorisk-bench")
+    parser.add_argument("--sessions", type=int, default=200)
+    args = parser.parse_args()
+
+    sessions = app_sessions(args.sessions, seed=1)
+    with tempfile.TemporaryDirectory() as tmp:
+        for size in args.sizes:
+            run_size(population_db(args.data_dir, size), sessions, Path(tmp))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
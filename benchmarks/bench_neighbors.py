@@ -0,0 +1,78 @@
+"""Query latency and recall of the "investors like you" index against a full scan.
+
+    python benchmarks/bench_neighbors.py --sizes 100000 1000000 --k 100
+
+For every population size (synthetic DBs shared with bench_suite.py) builds a
+NeighborIndex the way the app does on first use, then times queries around
+randomly picked stored profiles (the index's LSH path and an exhaustive
+NumPy scan) and reports recall@k of the index against the scan.
+"""
+import argparse
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from bench_suite import population_db  # noqa: E402
+from neurorisk.db import ConnectionManager  # noqa: E402
+from neurorisk.neighbors import NeighborIndex  # noqa: E402
+from neurorisk.schema import init_schema  # noqa: E402
+
+
+def _ms(samples):
+    return f"p50 {statistics.median(samples) * 1000:7.2f} ms   p99 {np.percentile(samples, 99) * 1000:7.2f} ms"
+
+
+def run_size(db_path: Path, queries: int, k: int, seed: int):
+    index = NeighborIndex()
+    db = ConnectionManager(db_path)
+    with db.connection() as conn:
+        init_schema(conn)  # cached populations may predate the feature columns
+        start = time.perf_counter()
+        index.refresh(conn)
+        build = time.perf_counter() - start
+    db.close_all()
+
+    features, ids = index._features[:index.n], index._ids[:index.n]
+    rng = np.random.default_rng(seed)
+    # Stored profiles, slightly moved: a new session resembling an existing one
+    points = features[rng.integers(0, index.n, queries)]
+    points = points + rng.normal(0, 0.02, points.shape).astype(np.float32)
+
+    lsh, scan, recall = [], [], []
+    for point in points:
+        start = time.perf_counter()
+        found, _ = index.query(point, k)
+        lsh.append(time.perf_counter() - start)
+        start = time.perf_counter()
+        dist = ((features - point) ** 2).sum(axis=1)
+        exact = ids[np.argpartition(dist, k)[:k]]
+        scan.append(time.perf_counter() - start)
+        recall.append(len(np.intersect1d(found, exact)) / k)
+
+    print(f"{index.n:>9,} profiles   build {build:6.2f} s")
+    print(f"    index query   {_ms(lsh)}   recall@{k} mean {np.mean(recall):.3f}  min {np.min(recall):.2f}")
+    print(f"    full scan     {_ms(scan)}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100_000, 1_000_000])
+    parser.add_argument("--data-dir", type=Path, default=Path(tempfile.gettempdir()) / "neurorisk-bench")
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--k", type=int, default=100)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    for size in args.sizes:
+        run_size(population_db(args.data_dir, size), args.queries, args.k, args.seed)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,52 @@
+"""Throughput of the batch PDF export (PDFs per second) for different pool sizes.
+
+    python benchmarks/bench_pdf_export.py --profiles 500 --workers 1 2 4
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from bench_persistence import fresh_db, make_session  # noqa: E402
+from neurorisk.export_pdfs import export_pdfs  # noqa: E402
+from neurorisk.profiles import save_profiles_bulk  # noqa: E402
+from neurorisk.report import pdf_available  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--profiles", type=int, default=500)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, os.cpu_count() or 1])
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    if not pdf_available():
+        sys.exit("reportlab is not installed")
+
+    rng = random.Random(args.seed)
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        db = fresh_db(tmp, "bench.db")
+        with db.connection() as conn:
+            save_profiles_bulk(conn, (make_session(rng) for _ in range(args.profiles)))
+
+        print(f"{args.profiles} profiles")
+        for workers in args.workers:
+            zip_path = tmp / f"export_{workers}.zip"
+            with db.connection() as conn:
+                start = time.perf_counter()
+                stats = export_pdfs(conn, zip_path, workers=workers)
+                elapsed = time.perf_counter() - start
+            size = zip_path.stat().st_size / 1e6
+            print(f"  workers={workers:<3} {stats['written'] / elapsed:8,.1f} PDFs/s  "
+                  f"({elapsed:.2f}s, zip {size:.1f} MB, {stats['failed']} failed)")
+        db.close_all()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,120 @@
+"""Throughput of profile persistence: legacy per-row inserts vs. save_profile vs. bulk ingest.
+
+    python benchmarks/bench_persistence.py --sessions 5000
+"""
+import argparse
+import json
+import random
+import sqlite3
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from neurorisk.db import ConnectionManager  # noqa: E402
+from neurorisk.profiles import save_profile, save_profiles_bulk  # noqa: E402
+from neurorisk.schema import init_schema  # noqa: E402
+
+PHASES = ["calm", "boom", "crisis"]
+
+
+def make_session(rng: random.Random):
+    demographics = {
+        "age": rng.randint(18, 80),
+        "gender": rng.choice(["Female", "Male", "Diverse", "No Information"]),
+        "goal": rng.choice(["Wealth Accumulation", "Income/Dividends", "Capital Preservation/Security", "Speculation"]),
+        "experience": rng.choice(["None", "Little", "Medium", "A lot"]),
+        "horizon": "Long-term (> 10 years)",
+        "stated_risk_norm": rng.random(),
+    }
+    responses = [
+        {
+            "q_id": q + 1,
+            "phase": PHASES[q // 6],
+            "selected_label": "option",
+            "mu": None,
+            "sigma": None,
+            "x_risk_relative": rng.randint(0, 3) / 3.0,
+            "x_reaction_time": rng.uniform(2, 20),
+            "x_pulse": float(rng.randint(60, 120)),
+            "advisor_help_used": rng.randint(0, 1),
+            "switch_action": rng.randint(0, 1),
+        }
+        for q in range(18)
+    ]
+    scores = {
+        "risk_by_phase": {p: rng.random() for p in PHASES},
+        "stress_by_phase": {p: rng.gauss(0, 0.5) for p in PHASES},
+        "RCS": rng.uniform(0, 100), "SSS": rng.uniform(0, 100), "RGS": rng.uniform(0, 100),
+        "AdvisorNeedScore": rng.uniform(0, 100), "BR": rng.random(), "SS": rng.random(),
+    }
+    return "", demographics, responses, scores
+
+
+def legacy_save(db_file, username, demographics, responses, scores):
+    """The pre-refactor path: fresh connection, one execute per response row."""
+    conn = sqlite3.connect(db_file)
+    c = conn.cursor()
+    c.execute("INSERT INTO profiles (username, demographics, scores) VALUES (?, ?, ?)",
+              (username, json.dumps(demographics), json.dumps(scores)))
+    profile_id = c.lastrowid
+    for resp in responses:
+        c.execute(
+            "INSERT INTO responses (profile_id, q_id, phase, selected_label, mu, sigma, x_risk_relative, "
+            "x_reaction_time, x_pulse, advisor_help_used, switch_action) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            (profile_id, *[resp.get(k) for k in ("q_id", "phase", "selected_label", "mu", "sigma", "x_risk_relative",
+                                                  "x_reaction_time", "x_pulse", "advisor_help_used", "switch_action")]),
+        )
+    conn.commit()
+    conn.close()
+
+
+def fresh_db(tmp: Path, name: str) -> ConnectionManager:
+    db = ConnectionManager(tmp / name)
+    with db.connection() as conn:
+        init_schema(conn)
+    return db
+
+
+def report(label, n, elapsed):
+    print(f"{label:<28} {n:>8} sessions  {elapsed:8.2f}s  {n / elapsed:>10,.0f} sessions/s")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sessions", type=int, default=5000)
+    parser.add_argument("--batch-size", type=int, default=1000)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    sessions = [make_session(rng) for _ in range(args.sessions)]
+    n_single = min(args.sessions, 1000)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+
+        db = fresh_db(tmp, "legacy.db")
+        start = time.perf_counter()
+        for s in sessions[:n_single]:
+            legacy_save(db.db_file, *s)
+        report("legacy per-row", n_single, time.perf_counter() - start)
+
+        db = fresh_db(tmp, "single.db")
+        start = time.perf_counter()
+        for s in sessions[:n_single]:
+            with db.connection() as conn:
+                save_profile(conn, *s)
+        report("save_profile", n_single, time.perf_counter() - start)
+
+        db = fresh_db(tmp, "bulk.db")
+        start = time.perf_counter()
+        with db.connection() as conn:
+            save_profiles_bulk(conn, sessions, args.batch_size)
+        report(f"bulk (batch={args.batch_size})", len(sessions), time.perf_counter() - start)
+
+
+if __name__ == "__main__":
+    main()
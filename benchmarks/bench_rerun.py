@@ -0,0 +1,95 @@
+"""Per-rerun script execution time of app.py, per stage (Streamlit AppTest, no browser).
+
+    python benchmarks/bench_rerun.py --reruns 20
+
+Drives one guest session through home → simulation → results and times plain
+reruns (what every widget interaction costs) at each stage.
+"""
+import argparse
+import os
+import statistics
+import sys
+import time
+from pathlib import Path
+
+from streamlit.testing.v1 import AppTest
+
+ROOT = Path(__file__).resolve().parent.parent
+
+
+def _check(at):
+    if at.exception:
+        raise RuntimeError([e.value for e in at.exception])
+
+
+def answer_question(at, reaction_ms: float = 1500.0, run: bool = True):
+    """Submit the current question as the browser's reaction-timer button would."""
+    q_id = at.session_state.current_question_id
+    at.session_state[f"next_{q_id}"] = {
+        "question_id": q_id, "shown_ms": 0.0, "answered_ms": reaction_ms, "reaction_ms": reaction_ms,
+    }
+    if run:
+        at.run()
+
+
+def queue_step(at, reaction_ms: float = 1500.0):
+    """Click a phase intro's button or fill in the current answer, without running."""
+    intro = [b for b in at.button if b.label.startswith("Continue to first")]
+    if intro:
+        intro[0].click()
+    else:
+        answer_question(at, reaction_ms, run=False)
+
+
+def step_simulation(at):
+    """Pass a phase intro or answer one question."""
+    queue_step(at)
+    at.run()
+    _check(at)
+
+
+def time_reruns(at, reruns: int) -> list:
+    samples = []
+    for _ in range(reruns):
+        start = time.perf_counter()
+        at.run()
+        samples.append((time.perf_counter() - start) * 1000)
+        _check(at)
+    return samples
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--app", default=str(ROOT / "app.py"))
+    parser.add_argument("--reruns", type=int, default=20)
+    args = parser.parse_args()
+
+    os.chdir(ROOT)
+    at = AppTest.from_file(args.app, default_timeout=120)
+    start = time.perf_counter()
+    at.run()
+    cold = (time.perf_counter() - start) * 1000
+    _check(at)
+
+    results = {"home": time_reruns(at, args.reruns)}
+
+    at.button(key="guest_start").click().run()
+    [b for b in at.button if "To Simulation" in str(b.label)][0].click().run()
+    # past the phase intro, onto the first question
+    while at.session_state.current_question_id is None:
+        step_simulation(at)
+    results["simulation"] = time_reruns(at, args.reruns)
+
+    while at.session_state.stage == "simulation":
+        step_simulation(at)
+    at.run()
+    results["results"] = time_reruns(at, args.reruns)
+
+    print(f"cold first run: {cold:8.1f} ms")
+    for stage, samples in results.items():
+        print(f"{stage:<12} median {statistics.median(samples):8.1f} ms   "
+              f"min {min(samples):8.1f} ms   ({len(samples)} reruns)")
+
+
+if __name__ == "__main__":
+    sys.exit(main())
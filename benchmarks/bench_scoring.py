@@ -0,0 +1,62 @@
+"""Single-session compute_scores vs. the vectorized batch scorer (and a bit-exactness check).
+
+    python benchmarks/bench_scoring.py --sessions 5000
+"""
+import argparse
+import math
+import random
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from bench_persistence import make_session  # noqa: E402
+from neurorisk.batch_scoring import SessionBatch, batch_score_dicts, score_batch  # noqa: E402
+from neurorisk.scoring import compute_scores  # noqa: E402
+
+
+def _same(a, b) -> bool:
+    if isinstance(a, dict):
+        return a.keys() == b.keys() and all(_same(a[k], b[k]) for k in a)
+    if isinstance(a, float) and isinstance(b, float):
+        return a == b or (math.isnan(a) and math.isnan(b))
+    return a == b
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sessions", type=int, default=5000)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    sessions = [make_session(rng)[1:3] for _ in range(args.sessions)]
+
+    start = time.perf_counter()
+    single = [compute_scores(demo, responses) for demo, responses in sessions]
+    t_single = time.perf_counter() - start
+
+    start = time.perf_counter()
+    batch = SessionBatch.from_sessions(sessions)
+    t_build = time.perf_counter() - start
+    start = time.perf_counter()
+    scores = score_batch(batch)
+    t_score = time.perf_counter() - start
+    batched = batch_score_dicts(scores)
+
+    mismatches = sum(
+        not _same({k: (v.to_dict() if hasattr(v, "to_dict") else v) for k, v in ref.items()}, got)
+        for ref, got in zip(single, batched)
+    )
+    n = args.sessions
+    print(f"{n} sessions")
+    print(f"  compute_scores   {n / t_single:12,.0f} sessions/s")
+    print(f"  score_batch      {n / t_score:12,.0f} sessions/s  (+ {t_build:.3f}s building arrays)")
+    print(f"  mismatches       {mismatches}")
+    if mismatches:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
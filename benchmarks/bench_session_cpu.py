@@ -0,0 +1,196 @@
+"""Server CPU time per completed 18-question simulation, measured against a real server.
+
+    python benchmarks/bench_session_cpu.py --sessions 3
+
+Starts ``streamlit run app.py`` on a throw-away DB and speaks the browser's
+websocket protocol to it. Every question is answered the way a user would:
+pick an option, tick "advisor help", move the pulse slider, then "Continue ▶"
+(the reaction-timer component, answered with the value the browser would send).
+Widget changes are sent as fragment reruns when the widget was rendered inside
+a fragment (as the browser does), otherwise as full reruns. The server's CPU
+time (utime + stime from /proc) is sampled from the first question until the
+last answer is submitted; the transition into the results page is excluded.
+"""
+import argparse
+import json
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.request
+from contextlib import contextmanager
+from pathlib import Path
+
+from streamlit.proto.BackMsg_pb2 import BackMsg
+from streamlit.proto.ForwardMsg_pb2 import ForwardMsg
+from websockets.sync.client import connect
+
+ROOT = Path(__file__).resolve().parent.parent
+REACTION_TIMER = "neurorisk.components.reaction_timer"
+_DONE = {ForwardMsg.FINISHED_SUCCESSFULLY, ForwardMsg.FINISHED_FRAGMENT_RUN_SUCCESSFULLY,
+         ForwardMsg.FINISHED_WITH_COMPILE_ERROR}
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def cpu_seconds(pid: int) -> float:
+    fields = Path(f"/proc/{pid}/stat").read_text().rsplit(")", 1)[1].split()
+    return (int(fields[11]) + int(fields[12])) / os.sysconf("SC_CLK_TCK")
+
+
+class Session:
+    """Minimal browser stand-in: tracks rendered widgets and sends rerun requests."""
+
+    def __init__(self, ws):
+        self.ws = ws
+        self.page_hash = ""
+        self.widgets = {}  # id -> (type, label, fragment_id, options)
+        self.values = {}  # id -> WidgetState kwargs the "user" has set
+        self.exceptions = []  # messages of st.exception elements the app rendered
+        self.rerun()
+
+    def rerun(self, trigger=None, fragment_id=""):
+        msg = BackMsg()
+        client = msg.rerun_script
+        client.page_script_hash = self.page_hash
+        client.fragment_id = fragment_id
+        for wid, value in self.values.items():
+            if wid in self.widgets:
+                state = client.widget_states.widgets.add(id=wid)
+                field, val = value
+                if field == "double_array_value":
+                    state.double_array_value.data.extend(val)
+                else:
+                    setattr(state, field, val)
+        if trigger:
+            client.widget_states.widgets.add(id=trigger, trigger_value=True)
+        self.ws.send(msg.SerializeToString())
+        self._receive()
+
+    def _receive(self):
+        seen = {}
+        while True:
+            fwd = ForwardMsg()
+            fwd.ParseFromString(self.ws.recv(timeout=120))
+            kind = fwd.WhichOneof("type")
+            if kind == "new_session":
+                self.page_hash = fwd.new_session.page_script_hash
+                if not fwd.new_session.fragment_ids_this_run:
+                    seen = {}  # full run: the widget tree is rebuilt
+            elif kind == "delta" and fwd.delta.WhichOneof("type") == "new_element":
+                element = fwd.delta.new_element
+                etype = element.WhichOneof("type")
+                if etype == "exception":
+                    self.exceptions.append(f"{element.exception.type}: {element.exception.message}")
+                    continue
+                widget = getattr(element, etype)
+                label = getattr(widget, "label", None) or getattr(widget, "component_name", None)
+                if getattr(widget, "id", None) and label:
+                    options = list(getattr(widget, "options", []))
+                    seen[widget.id] = (etype, label, fwd.delta.fragment_id, options)
+            elif kind == "script_finished" and fwd.script_finished in _DONE:
+                if fwd.script_finished == ForwardMsg.FINISHED_FRAGMENT_RUN_SUCCESSFULLY:
+                    self.widgets.update(seen)
+                else:
+                    self.widgets = seen
+                return
+
+    def find(self, etype: str, label: str = ""):
+        for wid, (kind, wlabel, fragment_id, options) in self.widgets.items():
+            if kind == etype and wlabel.startswith(label):
+                return wid, fragment_id, options
+        return None
+
+    def click(self, label: str):
+        wid, _, _ = self.find("button", label)
+        self.rerun(trigger=wid)  # button clicks in the app always continue the page flow
+
+    def change(self, etype: str, label: str, field: str, value):
+        wid, fragment_id, options = self.find(etype, label)
+        if etype == "radio":
+            value = options[value]  # radios report the formatted option, not its index
+        self.values[wid] = (field, value)
+        self.rerun(fragment_id=fragment_id)
+
+
+def run_session(url: str, pid: int) -> dict:
+    with connect(url, subprotocols=["streamlit"], max_size=None) as ws:
+        return _answer_all(Session(ws), pid)
+
+
+def _answer_all(session: Session, pid: int) -> dict:
+    session.click("Start Simulation as Guest")
+    session.click("To Simulation")
+    cpu, questions = 0.0, 0
+    while True:
+        if session.find("button", "Continue to first"):
+            session.click("Continue to first")  # phase intro
+            continue
+        if not session.find("component_instance", REACTION_TIMER):
+            break
+        questions += 1
+        start = cpu_seconds(pid)
+        session.change("radio", "Choose an option", "string_value", 1)
+        session.change("checkbox", "I would like help", "bool_value", True)
+        session.change("slider", "If you look at your smartwatch", "double_array_value", [92.0])
+        # "Continue ▶" is the reaction-timer component; it reports its browser timings
+        timing = {"question_id": questions, "shown_ms": 0.0, "answered_ms": 1500.0, "reaction_ms": 1500.0}
+        if questions < 18:
+            session.change("component_instance", REACTION_TIMER, "json_value", json.dumps(timing))
+            cpu += cpu_seconds(pid) - start
+        else:
+            cpu += cpu_seconds(pid) - start
+            session.change("component_instance", REACTION_TIMER, "json_value", json.dumps(timing))
+            break
+    return {"questions": questions, "cpu_s": cpu}
+
+
+@contextmanager
+def streamlit_server(app: str, env: dict):
+    """Run ``streamlit run app`` headless on a free port; yields (websocket URL, server pid)."""
+    port = _free_port()
+    server = subprocess.Popen(
+        [sys.executable, "-m", "streamlit", "run", app, "--server.headless", "true",
+         "--server.port", str(port), "--browser.gatherUsageStats", "false"],
+        cwd=ROOT, env=dict(os.environ, **env), stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    try:
+        for _ in range(300):
+            try:
+                urllib.request.urlopen(f"http://127.0.0.1:{port}/_stcore/health", timeout=1)
+                break
+            except OSError:
+                time.sleep(0.1)
+        yield f"ws://127.0.0.1:{port}/_stcore/stream", server.pid
+    finally:
+        server.terminate()
+        server.wait()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--app", default=str(ROOT / "app.py"))
+    parser.add_argument("--sessions", type=int, default=3)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        with streamlit_server(args.app, {"NEURORISK_DB": str(Path(tmp) / "bench.db")}) as (url, pid):
+            run_session(url, pid)  # warm-up: imports, caches, DB
+            samples = [run_session(url, pid) for _ in range(args.sessions)]
+
+    cpu = [s["cpu_s"] for s in samples]
+    print(f"{samples[0]['questions']} questions x 4 interactions, {args.sessions} sessions")
+    print(f"  server CPU per session  median {statistics.median(cpu) * 1000:8.1f} ms   "
+          f"min {min(cpu) * 1000:8.1f} ms")
+    print(f"  per interaction         {statistics.median(cpu) * 1000 / (samples[0]['questions'] * 4):8.1f} ms")
+
+
+if __name__ == "__main__":
+    sys.exit(main())
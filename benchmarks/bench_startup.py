@@ -0,0 +1,117 @@
+"""Cold-start import cost of the app and which heavy dependencies each stage loads.
+
+    python benchmarks/bench_startup.py --repeat 5
+    python benchmarks/bench_startup.py --json >> startup_history.jsonl
+
+Import times come from ``python -X importtime`` in a fresh interpreter per
+sample (median reported): the module-level imports of app.py (what every new
+server worker pays), plus what the results stage and the PDF export add on top.
+The stage check then drives one guest session through AppTest against a
+throw-away DB and records which of pandas / altair / reportlab are loaded.
+"""
+import argparse
+import ast
+import json
+import os
+import re
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+HEAVY = ("pandas", "altair", "reportlab")
+
+_LINE = re.compile(r"import time:\s+(\d+) \|\s+(\d+) \| (\s*)(\S+)")
+
+
+def app_imports(app: Path) -> str:
+    """The module-level import statements of app.py, as source."""
+    tree = ast.parse(app.read_text(encoding="utf-8"))
+    return "\n".join(ast.unparse(node) for node in tree.body if isinstance(node, (ast.Import, ast.ImportFrom)))
+
+
+def importtime(code: str, repeat: int) -> dict:
+    """Median total import time (ms) of ``code`` and its slowest top-level packages."""
+    totals, packages = [], {}
+    for _ in range(repeat):
+        proc = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", code],
+            cwd=ROOT, capture_output=True, text=True, check=True,
+        )
+        total = 0
+        for match in _LINE.finditer(proc.stderr):
+            _, cumulative, indent, name = match.groups()
+            if not indent:  # top level: cumulative already includes its children
+                total += int(cumulative)
+                packages.setdefault(name.split(".")[0], []).append(int(cumulative))
+        totals.append(total / 1000)
+    top = sorted(((sum(v) / repeat / 1000, k) for k, v in packages.items()), reverse=True)[:5]
+    return {"ms": statistics.median(totals), "top": [(name, round(ms, 1)) for ms, name in top]}
+
+
+def stage_modules(app: Path) -> dict:
+    """Heavy modules loaded after each stage of one guest session (runs in this process)."""
+    from streamlit.testing.v1 import AppTest
+
+    from bench_rerun import step_simulation
+
+    def loaded():
+        return sorted(m for m in HEAVY if m in sys.modules)
+
+    out = {}
+    at = AppTest.from_file(str(app), default_timeout=120)
+    start = time.perf_counter()
+    at.run()
+    out["cold_run_ms"] = round((time.perf_counter() - start) * 1000, 1)
+    out["home"] = loaded()
+    at.button(key="guest_start").click().run()
+    out["demographics"] = loaded()
+    [b for b in at.button if "To Simulation" in str(b.label)][0].click().run()
+    while at.session_state.stage == "simulation":
+        step_simulation(at)
+        out.setdefault("simulation", loaded())
+    at.run()
+    out["results"] = loaded()
+    return out
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--app", default=str(ROOT / "app.py"))
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--json", action="store_true", help="print one JSON line (for tracking over time)")
+    args = parser.parse_args()
+
+    app = Path(args.app)
+    base = app_imports(app)
+    report = {
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "import_ms": {
+            "app": importtime(base, args.repeat),
+            "results_stage": importtime(base + "\nimport altair, pandas, neurorisk.results", args.repeat),
+            "pdf_export": importtime(base + "\nimport neurorisk.results, reportlab.pdfgen.canvas", args.repeat),
+        },
+    }
+    with tempfile.TemporaryDirectory() as tmp:
+        os.environ["NEURORISK_DB"] = str(Path(tmp) / "startup.db")
+        os.chdir(ROOT)
+        report["stages"] = stage_modules(app)
+
+    if args.json:
+        print(json.dumps(report))
+        return
+    print(f"import time (median of {args.repeat}, -X importtime)")
+    for name, result in report["import_ms"].items():
+        top = ", ".join(f"{pkg} {ms:.0f}" for pkg, ms in result["top"])
+        print(f"  {name:<14} {result['ms']:8.1f} ms   slowest: {top}")
+    stages = report["stages"]
+    print(f"cold first run (AppTest): {stages.pop('cold_run_ms'):.1f} ms")
+    for stage, modules in stages.items():
+        print(f"  {stage:<14} loaded: {', '.join(modules) or '-'}")
+
+
+if __name__ == "__main__":
+    sys.exit(main())
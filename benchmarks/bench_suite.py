@@ -0,0 +1,336 @@
+"""Regression suite for the app's hot paths, with JSON results and a baseline check.
+
+    python benchmarks/bench_suite.py --save baseline.json
+    python benchmarks/bench_suite.py --baseline baseline.json --threshold 0.25
+    python benchmarks/bench_suite.py --sizes 1000 --filter peers
+
+Cases (median seconds per call over repeated rounds):
+
+* scoring / report: ``compute_scores``, ``compute_bias_messages`` and
+  ``generate_results_pdf`` on synthetic sessions;
+* at every population size (default 1k / 100k / 1M profiles):
+  ``save_user_profile`` / ``save_guest_profile`` (the call the page makes, and
+  until the background writer committed), ``load_user_profile``, and the peer
+  comparison path ``get_peer_stats`` → ``filter_peer_data`` →
+  ``calculate_aggregate_scores`` / ``calculate_percentiles`` for a guest (peer
+  cube) and for a signed-in user (columnar peer store), and the 100 nearest
+  profiles from ``get_similar_profiles``.
+
+Populations come from ``neurorisk.synthetic`` and are kept in ``--data-dir``
+between runs (a 1M-profile DB takes a few minutes to build); rows added by the
+save cases are removed again afterwards. The DB cases run in a child process
+per size because ``neurorisk.services`` binds NEURORISK_DB at import, as the
+app does.
+
+With ``--baseline`` every case present in both runs is compared by median; the
+script exits with status 1 if any is slower than baseline × (1 + threshold).
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+SIZES = [1_000, 100_000, 1_000_000]
+SEED = 7
+BENCH_USER = "bench_user"
+
+# Filters of section 9 as a user would pick them
+AGE_BUCKETS = [(26, 35), (36, 45)]
+GOALS = ["Wealth Accumulation", "Speculation"]
+GENDERS = ["Female", "Male"]
+# "You" for the percentile ranks
+OWN_VALUES = {
+    "RCS": 62.0, "SSS": 48.0, "RGS": 35.0, "AdvisorNeedScore": 40.0,
+    "risk_calm": 0.45, "risk_boom": 0.6, "risk_crisis": 0.3,
+    "stress_calm": -0.4, "stress_boom": 0.1, "stress_crisis": 0.7,
+}
+
+
+# ---------------------------------------------------------
+# Timing
+# ---------------------------------------------------------
+def measure(fn, min_time: float = 0.5, min_rounds: int = 5, max_rounds: int = 1000) -> dict:
+    """Per-call statistics of ``fn()``; fast calls are looped so a round lasts >= 1 ms."""
+    start = time.perf_counter()
+    fn()
+    first = time.perf_counter() - start
+    calls = max(1, int(0.001 / first)) if first > 0 else 1000
+
+    samples, deadline = [], time.perf_counter() + min_time
+    while len(samples) < max_rounds and (len(samples) < min_rounds or time.perf_counter() < deadline):
+        start = time.perf_counter()
+        for _ in range(calls):
+            fn()
+        samples.append((time.perf_counter() - start) / calls)
+    return {
+        "median": statistics.median(samples),
+        "min": min(samples),
+        "mean": statistics.fmean(samples),
+        "stddev": statistics.stdev(samples) if len(samples) > 1 else 0.0,
+        "rounds": len(samples),
+        "calls": calls,
+    }
+
+
+def app_sessions(n: int, seed: int = SEED) -> list:
+    """(demographics, responses) as the simulation hands them to the results page."""
+    from neurorisk.questions import response_metadata
+    from neurorisk.synthetic import make_block
+
+    out = []
+    for _, demographics, responses, _ in make_block(seed, 0, n):
+        full = [dict(r, **response_metadata(r["q_id"], r["selected_label"])) for r in responses]
+        out.append((demographics, full))
+    return out
+
+
+# ---------------------------------------------------------
+# Cases without a database
+# ---------------------------------------------------------
+def run_cpu_cases(selected) -> dict:
+    from neurorisk.profiles import clean_scores
+    from neurorisk.report import (
+        biometrics_frame,
+        compute_bias_messages,
+        generate_results_pdf,
+        pdf_available,
+        report_args,
+    )
+    from neurorisk.scoring import compute_scores
+
+    sessions = app_sessions(200)
+    scores = [clean_scores(compute_scores(demo, responses)) for demo, responses in sessions]
+    it = iter(range(1 << 62))
+
+    def pick(items):
+        return items[next(it) % len(items)]
+
+    results = {}
+    if selected("scoring.compute_scores"):
+        results["scoring.compute_scores"] = measure(lambda: compute_scores(*pick(sessions)))
+    if selected("report.compute_bias_messages"):
+        results["report.compute_bias_messages"] = measure(lambda: compute_bias_messages(pick(scores)))
+    if selected("report.generate_results_pdf") and pdf_available():
+        demo, responses = sessions[0]
+        args = report_args(demo, biometrics_frame(responses), scores[0])
+        results["report.generate_results_pdf"] = measure(lambda: generate_results_pdf(*args), min_time=2.0)
+    return results
+
+
+# ---------------------------------------------------------
+# Cases against a population DB (child process, NEURORISK_DB set)
+# ---------------------------------------------------------
+def run_db_cases(size: int, selected) -> dict:
+    from neurorisk.peers import (
+        PEER_SELECT,
+        add_to_cube,
+        calculate_aggregate_scores,
+        calculate_percentiles,
+        filter_peer_data,
+        row_from_columns,
+    )
+    from neurorisk.profiles import clean_scores, save_profile
+    from neurorisk.scoring import compute_scores
+    from neurorisk.services import (
+        create_user,
+        get_db,
+        get_peer_stats,
+        get_profile_writer,
+        get_similar_profiles,
+        init_db,
+        load_user_profile,
+        save_guest_profile,
+        save_user_profile,
+        user_exists,
+    )
+
+    init_db()
+    with get_db().connection() as conn:
+        high_water = conn.execute("SELECT MAX(id) FROM profiles").fetchone()[0] or 0
+    had_user = user_exists(BENCH_USER)
+    if not had_user:
+        create_user(BENCH_USER, "bench")
+
+    sessions = app_sessions(50)
+    scored = [(demo, responses, clean_scores(compute_scores(demo, responses))) for demo, responses in sessions]
+    it = iter(range(1 << 62))
+
+    def pick():
+        return scored[next(it) % len(scored)]
+
+    results = {}
+
+    def case(name, fn, **kwargs):
+        if selected(name):
+            results[f"{name}[{size}]"] = measure(fn, **kwargs)
+
+    try:
+        case("persist.save_user_profile", lambda: save_user_profile(BENCH_USER, *pick()), max_rounds=200)
+        case("persist.save_guest_profile", lambda: save_guest_profile(*pick()), max_rounds=200)
+        case("persist.save_guest_profile.committed", lambda: save_guest_profile(*pick()).result(), max_rounds=50)
+        get_profile_writer().close()  # flush everything queued before reading back
+
+        with get_db().connection() as conn:
+            own_id = save_profile(conn, BENCH_USER, *pick())
+        case("persist.load_user_profile", lambda: load_user_profile(BENCH_USER))
+
+        cube = get_peer_stats(exclude_profile_id=own_id)
+        case("peers.get_peer_stats", lambda: get_peer_stats(exclude_profile_id=own_id))
+        case("peers.filter_peer_data", lambda: filter_peer_data(cube, AGE_BUCKETS, GOALS, GENDERS))
+        filtered = filter_peer_data(cube, AGE_BUCKETS, GOALS, GENDERS)
+        case("peers.calculate_aggregate_scores", lambda: calculate_aggregate_scores(filtered))
+        case("peers.calculate_percentiles", lambda: calculate_percentiles(filtered, OWN_VALUES))
+        own_scores = pick()[2]
+        get_similar_profiles(own_scores, 100, exclude_profile_id=own_id)  # first call builds the index
+        case("peers.get_similar_profiles", lambda: get_similar_profiles(own_scores, 100, exclude_profile_id=own_id))
+
+        view = get_peer_stats(exclude_username=BENCH_USER)  # first call loads the whole store
+        case("peers.get_peer_stats.exclude_user", lambda: get_peer_stats(exclude_username=BENCH_USER))
+        case("peers.filter_peer_data.store", lambda: filter_peer_data(view, AGE_BUCKETS, GOALS, GENDERS))
+        filtered = filter_peer_data(view, AGE_BUCKETS, GOALS, GENDERS)
+        case("peers.calculate_aggregate_scores.store", lambda: calculate_aggregate_scores(filtered))
+        case("peers.calculate_percentiles.store", lambda: calculate_percentiles(filtered, OWN_VALUES))
+    finally:
+        # Leave the cached population as it was built
+        get_profile_writer().close()
+        with get_db().connection() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            added = conn.execute(f"SELECT {PEER_SELECT} FROM profiles WHERE id > ?", (high_water,)).fetchall()
+            add_to_cube(conn, [row_from_columns(r) for r in added], sign=-1)
+            conn.execute("DELETE FROM responses WHERE profile_id > ?", (high_water,))
+            conn.execute("DELETE FROM profiles WHERE id > ?", (high_water,))
+            if not had_user:
+                conn.execute("DELETE FROM users WHERE username = ?", (BENCH_USER,))
+            conn.commit()
+    return results
+
+
+def population_db(data_dir: Path, size: int, seed: int = SEED) -> Path:
+    """Path of a synthetic population DB of ``size`` profiles, built on first use."""
+    from neurorisk.db import ConnectionManager
+    from neurorisk.schema import init_schema
+    from neurorisk.synthetic import populate
+
+    path = data_dir / f"population_{size}_seed{seed}.db"
+    if path.exists():
+        return path
+    data_dir.mkdir(parents=True, exist_ok=True)
+    partial = path.with_name(path.name + ".partial")
+    for stale in data_dir.glob(partial.name + "*"):
+        stale.unlink()
+    print(f"building {size:,}-profile population in {path} ...", file=sys.stderr)
+    db = ConnectionManager(partial)
+    with db.connection() as conn:
+        init_schema(conn)
+        populate(conn, size, seed)
+        conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+    db.close_all()
+    partial.rename(path)
+    return path
+
+
+def run_size(size: int, db_path: Path, filters) -> dict:
+    cmd = [sys.executable, __file__, "--child", str(size)]
+    for f in filters:
+        cmd += ["--filter", f]
+    with tempfile.TemporaryDirectory() as tmp:
+        env = dict(os.environ, NEURORISK_DB=str(db_path), NEURORISK_METRICS_FILE=str(Path(tmp) / "bench.prom"))
+        proc = subprocess.run(cmd, cwd=ROOT, env=env, capture_output=True, text=True)
+    if proc.returncode:
+        sys.stderr.write(proc.stderr)
+        raise RuntimeError(f"DB cases for {size} profiles failed")
+    return json.loads(proc.stdout.strip().splitlines()[-1])
+
+
+# ---------------------------------------------------------
+# Baseline comparison
+# ---------------------------------------------------------
+def compare(current: dict, baseline: dict, threshold: float) -> list:
+    """Print a comparison table; returns the names of the regressed cases."""
+    base = baseline["benchmarks"]
+    regressions = []
+    print(f"\n{'case':<52} {'baseline':>11} {'current':>11} {'change':>8}")
+    for name, result in current["benchmarks"].items():
+        if name not in base:
+            print(f"  {name:<50} {'-':>11} {_fmt(result['median']):>11}      new")
+            continue
+        change = result["median"] / base[name]["median"] - 1
+        flag = ""
+        if change > threshold:
+            regressions.append(name)
+            flag = "  REGRESSION"
+        print(f"  {name:<50} {_fmt(base[name]['median']):>11} {_fmt(result['median']):>11} {change:+8.1%}{flag}")
+    return regressions
+
+
+def _fmt(seconds: float) -> str:
+    for unit, scale in (("s", 1), ("ms", 1e-3), ("us", 1e-6)):
+        if seconds >= scale:
+            return f"{seconds / scale:.2f} {unit}"
+    return f"{seconds * 1e9:.0f} ns"
+
+
+def _git_commit():
+    proc = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True, text=True)
+    return proc.stdout.strip() or None
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="*", default=SIZES,
+                        help="population sizes for the DB cases (none: scoring/report cases only)")
+    parser.add_argument("--data-dir", default=str(Path(tempfile.gettempdir()) / "neurorisk-bench"),
+                        help="where population DBs are kept between runs")
+    parser.add_argument("--filter", action="append", default=[], help="only cases whose name contains this")
+    parser.add_argument("--save", help="write the results as JSON to this file")
+    parser.add_argument("--baseline", help="JSON results of an earlier run to compare against")
+    parser.add_argument("--threshold", type=float, default=0.2,
+                        help="allowed slowdown of the median vs. the baseline (0.2 = 20%%)")
+    parser.add_argument("--child", type=int, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    def selected(name):
+        return not args.filter or any(f in name for f in args.filter)
+
+    if args.child is not None:
+        print(json.dumps(run_db_cases(args.child, selected)))
+        return 0
+
+    report = {
+        "meta": {
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "commit": _git_commit(),
+            "python": platform.python_version(),
+            "machine": platform.machine(),
+            "cpus": os.cpu_count(),
+        },
+        "benchmarks": run_cpu_cases(selected),
+    }
+    for size in args.sizes:
+        db_path = population_db(Path(args.data_dir), size)
+        report["benchmarks"].update(run_size(size, db_path, args.filter))
+
+    for name, result in report["benchmarks"].items():
+        print(f"{name:<52} {_fmt(result['median']):>11}  (min {_fmt(result['min'])}, {result['rounds']} rounds)")
+    if args.save:
+        Path(args.save).write_text(json.dumps(report, indent=2) + "\n", encoding="utf-8")
+    if args.baseline:
+        baseline = json.loads(Path(args.baseline).read_text(encoding="utf-8"))
+        regressions = compare(report, baseline, args.threshold)
+        if regressions:
+            print(f"\n{len(regressions)} case(s) slower than baseline by more than {args.threshold:.0%}")
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1 @@
+"""NeuroRisk AI – importable building blocks used by app.py and the offline tools."""
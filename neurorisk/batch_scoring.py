@@ -0,0 +1,301 @@
+"""Vectorized scoring of many sessions at once.
+
+``score_batch`` computes the same scores as ``neurorisk.scoring.compute_scores``
+for N sessions that share one question layout, using (N, Q) matrices instead of
+one DataFrame per session. The reductions are arranged to round exactly like
+the pandas code path, so results are bit-identical:
+
+* per-phase means use the Kahan-compensated running sum of pandas' groupby
+  mean, applied column by column in question order;
+* plain means and standard deviations sum each contiguous row with NumPy's
+  pairwise summation, as ``Series.mean`` / ``ndarray.std`` do for one session.
+
+``score_sessions`` takes (demographics, responses) pairs in any mix of layouts
+and returns JSON-ready score dicts in the format stored in ``profiles.scores``.
+"""
+import numpy as np
+
+from neurorisk.scoring import (
+    ANS_WEIGHTS,
+    DISPOSITION_Q,
+    HINDSIGHT_Q,
+    PHASE_ORDER,
+    RECENCY_Q,
+    STRESS_RANGE_MAX,
+    STRESS_WEIGHT_PULSE,
+    STRESS_WEIGHT_RT,
+    classify_disposition,
+    classify_hindsight,
+    classify_recency,
+)
+
+PHASE_CODES = {p: i for i, p in enumerate(PHASE_ORDER)}
+
+# Bias questions: output key, q_id, label classifier
+BIAS_QUESTIONS = [
+    ("disposition", DISPOSITION_Q, classify_disposition),
+    ("recency", RECENCY_Q, classify_recency),
+    ("hindsight", HINDSIGHT_Q, classify_hindsight),
+]
+
+
+class SessionBatch:
+    """N sessions over the same Q questions, as dense arrays.
+
+    Per question (length Q): ``q_ids``, ``phase`` (index into PHASE_ORDER, -1
+    for anything else), ``risk_relevant`` and ``herd`` (herding majority
+    question) flags. Per session and question (N, Q) floats: ``risk``,
+    ``reaction_time``, ``pulse``, ``help``, ``switch``, ``follow_crowd``; NaN
+    marks a missing value. ``help``/``switch`` may be None if the sessions
+    never recorded them. ``stated_risk`` has length N. ``labels`` maps each bias
+    q_id in the layout to (codes of length N, list of distinct answer labels).
+    """
+
+    def __init__(self, q_ids, phase, risk_relevant, herd, risk, reaction_time, pulse,
+                 help, switch, follow_crowd, stated_risk, labels=None):
+        self.q_ids = np.asarray(q_ids, dtype=np.int64)
+        self.phase = np.asarray(phase, dtype=np.int64)
+        self.risk_relevant = np.asarray(risk_relevant, dtype=bool)
+        self.herd = np.asarray(herd, dtype=bool)
+        self.risk = np.asarray(risk, dtype=np.float64)
+        self.reaction_time = np.asarray(reaction_time, dtype=np.float64)
+        self.pulse = np.asarray(pulse, dtype=np.float64)
+        self.help = None if help is None else np.asarray(help, dtype=np.float64)
+        self.switch = None if switch is None else np.asarray(switch, dtype=np.float64)
+        self.follow_crowd = np.asarray(follow_crowd, dtype=np.float64)
+        self.stated_risk = np.asarray(stated_risk, dtype=np.float64)
+        self.labels = labels or {}
+
+    def __len__(self):
+        return len(self.stated_risk)
+
+    @classmethod
+    def from_sessions(cls, sessions) -> "SessionBatch":
+        """Build from (demographics, responses) pairs that share one layout."""
+        sessions = list(sessions)
+        layouts = {session_layout(responses) for _, responses in sessions}
+        if len(layouts) != 1:
+            raise ValueError("sessions do not share one question layout; use group_by_layout")
+        q_ids, phases, risk_relevant, herd, has_help, has_switch = layouts.pop()
+
+        def matrix(key, default=np.nan):
+            return np.array(
+                [[_float(r.get(key, default)) for r in responses] for _, responses in sessions],
+                dtype=np.float64,
+            ).reshape(len(sessions), len(q_ids))
+
+        labels = {}
+        for _, q_id, _ in BIAS_QUESTIONS:
+            if q_id in q_ids:
+                pos = q_ids.index(q_id)
+                vocab, codes = {}, []
+                for _, responses in sessions:
+                    codes.append(vocab.setdefault(responses[pos]["selected_label"], len(vocab)))
+                labels[q_id] = (np.array(codes, dtype=np.int64), list(vocab))
+
+        return cls(
+            q_ids=q_ids,
+            phase=[PHASE_CODES.get(p, -1) for p in phases],
+            risk_relevant=risk_relevant,
+            herd=herd,
+            risk=matrix("x_risk_relative"),
+            reaction_time=matrix("x_reaction_time"),
+            pulse=matrix("x_pulse"),
+            help=matrix("advisor_help_used") if has_help else None,
+            switch=matrix("switch_action") if has_switch else None,
+            follow_crowd=matrix("follow_crowd", 0),
+            stated_risk=[_float(demo.get("stated_risk_norm", 0.5)) for demo, _ in sessions],
+            labels=labels,
+        )
+
+
+def _float(val) -> float:
+    return np.nan if val is None else float(val)
+
+
+def session_layout(responses) -> tuple:
+    """Hashable description of the question layout of one session."""
+    q_ids = tuple(r["q_id"] for r in responses)
+    phases = tuple(r.get("phase") for r in responses)
+    if any("risk_relevant" in r for r in responses):
+        risk_relevant = tuple(r.get("risk_relevant") == True for r in responses)  # noqa: E712
+    else:
+        risk_relevant = (True,) * len(responses)
+    if not any(risk_relevant):
+        risk_relevant = (True,) * len(responses)  # same fallback as compute_scores
+    herd = tuple(r.get("herd_majority_flag") == 1 for r in responses)
+    has_help = any("advisor_help_used" in r for r in responses)
+    has_switch = any("switch_action" in r for r in responses)
+    return q_ids, phases, risk_relevant, herd, has_help, has_switch
+
+
+def group_by_layout(sessions) -> dict:
+    """Indices of ``sessions`` grouped by question layout."""
+    groups = {}
+    for i, (_, responses) in enumerate(sessions):
+        groups.setdefault(session_layout(responses), []).append(i)
+    return groups
+
+
+# ---------------------------------------------------------
+# Reductions matching the pandas / NumPy single-session path
+# ---------------------------------------------------------
+def _row_nanmean(values):
+    """Series.mean() per row: NaN skipped, pairwise row sum / count."""
+    mask = np.isnan(values)
+    if mask.any():
+        values = np.where(mask, 0.0, values)
+    count = values.shape[1] - mask.sum(axis=1)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return np.ascontiguousarray(values).sum(axis=1) / count
+
+
+def _row_zscore(values):
+    """zscore() of compute_scores per row (population std, zeros if constant)."""
+    n = values.shape[1]
+    mean = values.sum(axis=1, keepdims=True) / n
+    dev = values - mean
+    std = np.sqrt((dev * dev).sum(axis=1, keepdims=True) / n)
+    ok = (std > 0) if n > 1 else np.zeros_like(std, dtype=bool)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        z = (values - mean) / std
+    return np.where(ok, z, 0.0)
+
+
+def _phase_means(values, phase):
+    """groupby("phase").mean().reindex(PHASE_ORDER) per row, Kahan-summed like pandas."""
+    n = values.shape[0]
+    out = np.full((n, len(PHASE_ORDER)), np.nan)
+    for k in range(len(PHASE_ORDER)):
+        cols = np.flatnonzero(phase == k)
+        if not len(cols):
+            continue
+        total = np.zeros(n)
+        comp = np.zeros(n)
+        nobs = np.zeros(n)
+        for j in cols:
+            val = values[:, j]
+            ok = ~np.isnan(val)
+            y = val - comp
+            t = total + y
+            c = t - total - y
+            c[np.isnan(c)] = 0.0  # pandas resets the compensation after +/-inf
+            total = np.where(ok, t, total)
+            comp = np.where(ok, c, comp)
+            nobs += ok
+        with np.errstate(invalid="ignore", divide="ignore"):
+            out[:, k] = np.where(nobs > 0, total / nobs, np.nan)
+    return out
+
+
+def _row_nanmax(values):
+    all_nan = np.isnan(values).all(axis=1)
+    out = np.where(np.isnan(values), -np.inf, values).max(axis=1)
+    return np.where(all_nan, np.nan, out)
+
+
+def _row_nanmin(values):
+    all_nan = np.isnan(values).all(axis=1)
+    out = np.where(np.isnan(values), np.inf, values).min(axis=1)
+    return np.where(all_nan, np.nan, out)
+
+
+def _clamp01(values):
+    """min(max(x, 0.0), 1.0) with Python's NaN behaviour (NaN -> 0.0)."""
+    values = np.where(values > 0.0, values, 0.0)
+    return np.where(1.0 < values, 1.0, values)
+
+
+def score_batch(batch: SessionBatch) -> dict:
+    """Scores for every session in ``batch``: arrays of length N (by-phase values N x 3)."""
+    n = len(batch)
+
+    # ---------- Risk: risk-relevant questions only ----------
+    risk_cols = np.flatnonzero(batch.risk_relevant)
+    risk = batch.risk[:, risk_cols]
+    risk_by_phase = _phase_means(risk, batch.phase[risk_cols])
+    r_max, r_min = _row_nanmax(risk_by_phase), _row_nanmin(risk_by_phase)
+    delta_r = np.where(np.isnan(r_max) | np.isnan(r_min), 0.0, r_max - r_min)
+    rcs = 100 * (1 - _clamp01(delta_r))
+
+    # ---------- Stress: all questions ----------
+    stress = (STRESS_WEIGHT_RT * _row_zscore(batch.reaction_time)
+              + STRESS_WEIGHT_PULSE * _row_zscore(batch.pulse))
+    stress_by_phase = _phase_means(stress, batch.phase)
+    delta_s = _row_nanmax(stress_by_phase) - _row_nanmin(stress_by_phase)
+    delta_s = np.where(delta_s > 0.0, delta_s, 0.0)
+    sss = 100 * (1 - _clamp01(delta_s / STRESS_RANGE_MAX))
+
+    # ---------- Reality gap ----------
+    ss = batch.stated_risk
+    br = _row_nanmean(risk)
+    rgs = 100 * np.abs(ss - br)
+
+    # ---------- Advisor need ----------
+    help_rate = _row_nanmean(batch.help) if batch.help is not None else np.zeros(n)
+    switch_rate = _row_nanmean(batch.switch) if batch.switch is not None else np.zeros(n)
+    ans_raw = (
+        ANS_WEIGHTS["rcs"] * (1 - rcs / 100.0)
+        + ANS_WEIGHTS["sss"] * (1 - sss / 100.0)
+        + ANS_WEIGHTS["rgs"] * (rgs / 100.0)
+        + ANS_WEIGHTS["help"] * help_rate
+        + ANS_WEIGHTS["switch"] * switch_rate
+    )
+
+    # ---------- Bias proxies ----------
+    herd_cols = np.flatnonzero(batch.herd)
+    if len(herd_cols):
+        herding = np.ascontiguousarray(batch.follow_crowd[:, herd_cols]).sum(axis=1) / len(herd_cols)
+    else:
+        herding = np.zeros(n)
+
+    out = {
+        "risk_by_phase": risk_by_phase,
+        "stress_by_phase": stress_by_phase,
+        "RCS": rcs,
+        "SSS": sss,
+        "RGS": rgs,
+        "AdvisorNeedScore": 100 * ans_raw,
+        "BR": br,
+        "SS": ss,
+        "loss_aversion_proxy": risk_by_phase[:, PHASE_CODES["boom"]] - risk_by_phase[:, PHASE_CODES["crisis"]],
+        "herding_score": herding * 100,
+    }
+    for key, q_id, classify in BIAS_QUESTIONS:
+        if q_id in batch.labels:
+            codes, vocab = batch.labels[q_id]
+            out[key] = np.array([classify(label) for label in vocab], dtype=object)[codes]
+        else:
+            out[key] = np.full(n, None, dtype=object)
+    out["OverconfidenceScore"] = 100 * (ss * (1 - rcs / 100.0) * (1 - sss / 100.0))
+    return out
+
+
+def batch_score_dicts(scores: dict) -> list:
+    """Split ``score_batch`` output into per-session dicts (profiles.scores format)."""
+    n = len(scores["RCS"])
+    scalars = [k for k in scores if k not in ("risk_by_phase", "stress_by_phase")]
+    out = []
+    for i in range(n):
+        d = {
+            "risk_by_phase": dict(zip(PHASE_ORDER, scores["risk_by_phase"][i].tolist())),
+            "stress_by_phase": dict(zip(PHASE_ORDER, scores["stress_by_phase"][i].tolist())),
+        }
+        for k in scalars:
+            val = scores[k][i]
+            d[k] = val if val is None or isinstance(val, str) else float(val)
+        out.append(d)
+    return out
+
+
+def score_sessions(sessions) -> list:
+    """Score (demographics, responses) pairs of any layouts; returns one dict per session."""
+    sessions = list(sessions)
+    out = [{}] * len(sessions)  # compute_scores returns {} for sessions without responses
+    for layout, idx in group_by_layout(sessions).items():
+        if not layout[0]:
+            continue
+        batch = SessionBatch.from_sessions([sessions[i] for i in idx])
+        for i, scores in zip(idx, batch_score_dicts(score_batch(batch))):
+            out[i] = scores
+    return out
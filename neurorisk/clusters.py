@@ -0,0 +1,382 @@
+"""Risk characters: mini-batch k-means over the stored score vectors.
+
+Profiles are clustered in the feature space of the nearest-neighbour index
+(see neurorisk.neighbors). Training streams over ``profiles`` in chunks of
+``CHUNK_SIZE`` rows, so memory stays bounded however many profiles exist:
+
+1. k-means++ seeding on an evenly spaced sample of about ``INIT_SAMPLE`` rows;
+2. ``EPOCHS`` passes of mini-batch k-means (Sculley 2010): each batch moves
+   every centroid towards the mean of its assigned points with a learning
+   rate of 1 / (points the centroid has seen so far);
+3. one pass counting cluster sizes and the per-feature mean/std.
+
+Every run is stored as a new version in ``cluster_models``. The app keeps the
+newest model in memory (``ClusterService``) and assigns a new profile with a
+15 × 11 distance computation; a daemon thread picks up newer versions and
+retrains on a schedule in a child process, so sessions never wait for it.
+Only one app process trains at a time (a lease row in ``counters``), and a
+failed training is retried with exponential backoff::
+
+    python -m neurorisk.clusters --db neurorisk.db      # train and store a version now
+"""
+import argparse
+import json
+import logging
+import subprocess
+import sys
+import threading
+import time
+from pathlib import Path
+
+import numpy as np
+
+from neurorisk.neighbors import FEATURE_COLUMNS, feature_matrix
+
+log = logging.getLogger(__name__)
+
+ROOT = Path(__file__).resolve().parent.parent
+
+N_CLUSTERS = 15
+CHUNK_SIZE = 65_536
+BATCH_SIZE = 4096
+EPOCHS = 2
+INIT_SAMPLE = 20_000
+MIN_PROFILES = 20 * N_CLUSTERS    # fewer profiles: no characters yet
+
+# Wording for a character whose centroid is well above / below the population mean
+TRAITS = {
+    "risk_calm": ("risk-seeking in calm markets", "cautious in calm markets"),
+    "risk_boom": ("chases booms", "holds back in booms"),
+    "risk_crisis": ("buys into crises", "retreats in crises"),
+    "stress_calm": ("tense even in calm markets", "relaxed in calm markets"),
+    "stress_boom": ("excited by booms", "unmoved by booms"),
+    "stress_crisis": ("stressed by crises", "calm in crises"),
+    "rcs": ("consistent risk choices", "inconsistent risk choices"),
+    "sss": ("steady stress levels", "swinging stress levels"),
+    "rgs": ("says one thing, does another", "acts as stated"),
+    "loss_aversion": ("loss averse", "leans in after losses"),
+    "herding": ("follows the crowd", "independent of the crowd"),
+}
+TRAIT_THRESHOLD = 0.5             # |centroid - mean| in population standard deviations
+
+# counters row holding the unix time until which one app process may train (or all back off)
+LEASE_NAME = "cluster_training_until"
+LEASE_SECONDS = 3600              # longest a training run may hold the lease
+
+
+# ---------------------------------------------------------
+# Training
+# ---------------------------------------------------------
+def iter_feature_chunks(conn, high_water: int, chunk_size: int = CHUNK_SIZE):
+    """Scaled feature matrices of profiles with id <= high_water, in id order."""
+    last_id = 0
+    while True:
+        rows = conn.execute(
+            f"SELECT id, {', '.join(FEATURE_COLUMNS)} FROM profiles "
+            f"WHERE id > ? AND id <= ? ORDER BY id LIMIT ?",
+            (last_id, high_water, chunk_size),
+        ).fetchall()
+        if not rows:
+            return
+        last_id = rows[-1][0]
+        yield feature_matrix([tuple(r)[1:] for r in rows])
+
+
+def _sq_distances(x, centers):
+    """points × centers squared Euclidean distances."""
+    d = (x * x).sum(axis=1)[:, None] - 2 * x @ centers.T + (centers * centers).sum(axis=1)
+    return np.maximum(d, 0.0)
+
+
+def kmeans_plus_plus(x, k: int, rng):
+    """k-means++ seeding: each next center drawn proportionally to its squared distance."""
+    centers = [x[rng.integers(len(x))]]
+    d = ((x - centers[0]) ** 2).sum(axis=1)
+    for _ in range(1, k):
+        i = rng.choice(len(x), p=d / d.sum()) if d.sum() > 0 else rng.integers(len(x))
+        centers.append(x[i])
+        d = np.minimum(d, ((x - x[i]) ** 2).sum(axis=1))
+    return np.array(centers, dtype=np.float64)
+
+
+def _partial_fit(centers, counts, x):
+    """One mini-batch step, in place; equivalent to per-point updates with rate 1/count."""
+    assigned = _sq_distances(x, centers).argmin(axis=1)
+    k = len(centers)
+    m = np.bincount(assigned, minlength=k)
+    sums = (assigned[None, :] == np.arange(k)[:, None]).astype(np.float64) @ x
+    counts += m
+    hit = m > 0
+    centers[hit] += (sums[hit] - m[hit, None] * centers[hit]) / counts[hit, None]
+
+
+def train(conn, k: int = N_CLUSTERS, epochs: int = EPOCHS, seed: int = 0,
+          chunk_size: int = CHUNK_SIZE, batch_size: int = BATCH_SIZE):
+    """Fit k centroids to the stored profiles; returns the model dict or None if too few."""
+    high_water, n = conn.execute("SELECT COALESCE(MAX(id), 0), COUNT(*) FROM profiles").fetchone()
+    if n < max(k, MIN_PROFILES):
+        return None
+    rng = np.random.default_rng(seed)
+
+    stride = max(1, high_water // INIT_SAMPLE)
+    sample = feature_matrix([
+        tuple(r) for r in conn.execute(
+            f"SELECT {', '.join(FEATURE_COLUMNS)} FROM profiles WHERE id <= ? AND id % ? = 0",
+            (high_water, stride),
+        )
+    ]).astype(np.float64)
+    if len(sample) < k:
+        sample = np.concatenate(list(iter_feature_chunks(conn, high_water, chunk_size))).astype(np.float64)
+    centers = kmeans_plus_plus(sample, k, rng)
+    counts = np.zeros(k, dtype=np.int64)
+
+    for _ in range(epochs):
+        for chunk in iter_feature_chunks(conn, high_water, chunk_size):
+            chunk = chunk[rng.permutation(len(chunk))].astype(np.float64)
+            for start in range(0, len(chunk), batch_size):
+                _partial_fit(centers, counts, chunk[start:start + batch_size])
+        # A center nobody was assigned to restarts at a random sample point
+        dead = counts == 0
+        if dead.any():
+            centers[dead] = sample[rng.integers(len(sample), size=int(dead.sum()))]
+
+    sizes = np.zeros(k, dtype=np.int64)
+    total, total_sq, inertia = np.zeros(centers.shape[1]), np.zeros(centers.shape[1]), 0.0
+    for chunk in iter_feature_chunks(conn, high_water, chunk_size):
+        chunk = chunk.astype(np.float64)
+        d = _sq_distances(chunk, centers)
+        sizes += np.bincount(d.argmin(axis=1), minlength=k)
+        inertia += float(d.min(axis=1).sum())
+        total += chunk.sum(axis=0)
+        total_sq += (chunk * chunk).sum(axis=0)
+    mean = total / n
+    std = np.sqrt(np.maximum(total_sq / n - mean * mean, 0.0))
+
+    # Number characters from the most cautious to the most risk-seeking
+    risk = centers[:, [FEATURE_COLUMNS.index(f"risk_{p}") for p in ("calm", "boom", "crisis")]].sum(axis=1)
+    order = np.argsort(risk, kind="stable")
+    return {
+        "features": FEATURE_COLUMNS,
+        "centroids": centers[order].tolist(),
+        "sizes": sizes[order].tolist(),
+        "mean": mean.tolist(),
+        "std": std.tolist(),
+        "inertia": inertia,
+        "profiles": int(n),
+        "high_water": int(high_water),
+    }
+
+
+# ---------------------------------------------------------
+# Versioned models
+# ---------------------------------------------------------
+class ClusterModel:
+    """One stored k-means model; ``assign`` maps a scaled feature row to a character."""
+
+    def __init__(self, version: int, trained_at: float, model: dict):
+        self.version = version
+        self.trained_at = trained_at
+        self.profiles = model["profiles"]
+        self.high_water = model["high_water"]
+        self.centroids = np.array(model["centroids"], dtype=np.float32)
+        self.sizes = np.array(model["sizes"], dtype=np.int64)
+        self.mean = np.array(model["mean"])
+        self.std = np.array(model["std"])
+
+    def __len__(self):
+        return len(self.centroids)
+
+    def assign(self, point) -> int:
+        return int(((self.centroids - point) ** 2).sum(axis=1).argmin())
+
+    def character(self, cluster: int) -> dict:
+        """Display data of one cluster: number, name, traits, population share."""
+        z = (self.centroids[cluster] - self.mean) / np.where(self.std > 0, self.std, 1.0)
+        traits = [
+            TRAITS[FEATURE_COLUMNS[i]][0 if z[i] > 0 else 1]
+            for i in np.argsort(-np.abs(z), kind="stable")
+            if abs(z[i]) >= TRAIT_THRESHOLD
+        ][:3]
+        name = " · ".join(t[0].upper() + t[1:] for t in traits[:2]) or "Balanced middle"
+        return {
+            "number": cluster + 1,
+            "name": name,
+            "traits": traits,
+            "share": float(self.sizes[cluster] / max(self.sizes.sum(), 1)),
+        }
+
+
+def store_model(conn, model: dict) -> int:
+    """Insert a trained model as the next version and commit; returns the version."""
+    cur = conn.execute(
+        "INSERT INTO cluster_models (trained_at, profiles, high_water, model) VALUES (?, ?, ?, ?)",
+        (time.time(), model["profiles"], model["high_water"], json.dumps(model)),
+    )
+    conn.commit()
+    return cur.lastrowid
+
+
+def latest_version(conn) -> int:
+    return conn.execute("SELECT COALESCE(MAX(version), 0) FROM cluster_models").fetchone()[0]
+
+
+def load_model(conn, version: int = None):
+    """The given (default: newest) model, or None if none fits the current features."""
+    if version is None:
+        version = latest_version(conn)
+    row = conn.execute(
+        "SELECT version, trained_at, model FROM cluster_models WHERE version = ?", (version,)
+    ).fetchone()
+    if row is None:
+        return None
+    model = json.loads(row["model"])
+    if model.get("features") != FEATURE_COLUMNS:
+        log.warning("cluster model %s was trained on other features; retrain", row["version"])
+        return None
+    return ClusterModel(row["version"], row["trained_at"], model)
+
+
+# ---------------------------------------------------------
+# In-app service
+# ---------------------------------------------------------
+class ClusterService:
+    """Current model for all sessions, kept fresh by a daemon thread.
+
+    Every ``check_every`` seconds the thread loads a newer stored version (e.g.
+    one trained by another app process or the CLI) and, once the model is
+    older than ``interval`` seconds and new profiles arrived, retrains in a
+    child process. Without any model it trains right away. After a failed
+    training the next attempt waits ``check_every`` seconds, doubling per
+    failure up to ``interval``; the wait is stored in the training lease, so
+    every app process backs off.
+    """
+
+    def __init__(self, db, db_file, interval: float = 6 * 3600, check_every: float = 60.0):
+        self.db = db                          # ConnectionManager
+        self.db_file = str(db_file)
+        self.interval = interval
+        self.check_every = check_every
+        self.model = None
+        self.training = False
+        self.stats = {"trainings": 0, "failures": 0, "last_training_seconds": 0.0}
+        self.last_failure = None              # unix time of the last failed training
+        self._failures_in_a_row = 0
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self) -> "ClusterService":
+        with self.db.connection() as conn:
+            self.model = load_model(conn)
+        self._thread = threading.Thread(target=self._run, name="cluster-trainer", daemon=True)
+        self._thread.start()
+        return self
+
+    def close(self, timeout: float = 10.0):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                self.check()
+            except Exception:
+                log.exception("cluster model refresh failed")
+            self._stop.wait(self.check_every)
+
+    def check(self):
+        """Load a newer stored model; train a new one if due."""
+        with self.db.connection() as conn:
+            version = latest_version(conn)
+            if version and (self.model is None or version > self.model.version):
+                self.model = load_model(conn, version) or self.model
+            high_water, n = conn.execute("SELECT COALESCE(MAX(id), 0), COUNT(*) FROM profiles").fetchone()
+        model = self.model
+        due = n >= MIN_PROFILES and (model is None or (
+            time.time() - model.trained_at >= self.interval and high_water > model.high_water
+        ))
+        if due and self._take_lease(time.time() + LEASE_SECONDS):
+            self.retrain()
+
+    def _take_lease(self, until) -> bool:
+        """Hold the DB-wide training lease until ``until``, unless it is taken or backing off."""
+        now = time.time()
+        with self.db.connection() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            row = conn.execute("SELECT value FROM counters WHERE name = ?", (LEASE_NAME,)).fetchone()
+            if row is not None and row[0] > now:
+                conn.rollback()
+                return False
+            self._set_lease(conn, until)
+        return True
+
+    def _set_lease(self, conn, until):
+        conn.execute(
+            "INSERT INTO counters (name, value) VALUES (?, ?) "
+            "ON CONFLICT (name) DO UPDATE SET value = excluded.value",
+            (LEASE_NAME, int(until)),
+        )
+
+    def retrain(self):
+        """Run the training CLI in a child process (no GIL contention with sessions), then load its model.
+
+        The caller holds the training lease; it is released on success and
+        extended by the backoff delay on failure.
+        """
+        self.training = True
+        start = time.perf_counter()
+        try:
+            proc = subprocess.run(
+                [sys.executable, "-m", "neurorisk.clusters", "--db", self.db_file],
+                cwd=ROOT, capture_output=True, text=True,
+            )
+        finally:
+            self.training = False
+            self.stats["last_training_seconds"] = time.perf_counter() - start
+        if proc.returncode != 0:
+            self.stats["failures"] += 1
+            self.last_failure = time.time()
+            self._failures_in_a_row += 1
+            delay = min(self.interval, self.check_every * 2 ** self._failures_in_a_row)
+            log.warning("cluster training failed, next attempt in %.0fs: %s", delay, proc.stderr.strip()[-2000:])
+            with self.db.connection() as conn:
+                self._set_lease(conn, self.last_failure + delay)
+            return
+        self.stats["trainings"] += 1
+        self._failures_in_a_row = 0
+        with self.db.connection() as conn:
+            self._set_lease(conn, 0)
+            self.model = load_model(conn) or self.model
+
+
+def main(argv=None):
+    from neurorisk.db import DEFAULT_DB_FILE, ConnectionManager
+    from neurorisk.schema import init_schema
+
+    parser = argparse.ArgumentParser(description="Train the risk-character clusters and store a new model version.")
+    parser.add_argument("--db", default=str(DEFAULT_DB_FILE))
+    parser.add_argument("--clusters", type=int, default=N_CLUSTERS)
+    parser.add_argument("--epochs", type=int, default=EPOCHS)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    db = ConnectionManager(args.db)
+    start = time.perf_counter()
+    with db.connection() as conn:
+        init_schema(conn)
+        model = train(conn, args.clusters, args.epochs, args.seed)
+        if model is None:
+            sys.exit(f"need at least {MIN_PROFILES} profiles to train")
+        version = store_model(conn, model)
+        stored = load_model(conn, version)
+    elapsed = time.perf_counter() - start
+    print(f"trained version {version} on {model['profiles']} profiles in {elapsed:.2f}s "
+          f"(inertia {model['inertia']:.1f})", file=sys.stderr)
+    for i in range(len(stored)):
+        c = stored.character(i)
+        print(f"  {c['number']:>2}. {c['share']:6.1%}  {c['name']}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,418 @@
+"""Reusable Streamlit render helpers (cards, badges, stepper, phase intros, question card)."""
+import math
+import time
+from pathlib import Path
+
+import streamlit as st
+import streamlit.components.v1 as components
+
+from neurorisk.metrics import QUESTION_LATENCY_SECONDS, QUESTION_REACTION_SECONDS, SECTION_SECONDS
+from neurorisk.questions import response_metadata
+from neurorisk.theme import PRIMARY_COLOR, SECONDARY_COLOR, TEXT_BUTTON
+
+
+# ---------------------------------------------------------
+# HELPER: Render Stepper Progress
+# ---------------------------------------------------------
+def render_stepper(current_phase: str):
+    """Render a visual phase stepper (Calm → Boom → Crisis)"""
+    phases = ["calm", "boom", "crisis"]
+    labels = {"calm": "Calm", "boom": "Boom", "crisis": "Crisis"}
+    icons = {"calm": "🌊", "boom": "📈", "crisis": "⚡"}
+    
+    current_idx = phases.index(current_phase) if current_phase in phases else 0
+    
+    steps_html = ""
+    for i, phase in enumerate(phases):
+        if i < current_idx:
+            dot_class = "completed"
+            label_class = ""
+            connector_class = "completed" if i < len(phases) - 1 else ""
+        elif i == current_idx:
+            dot_class = "active"
+            label_class = "active"
+            connector_class = ""
+        else:
+            dot_class = "inactive"
+            label_class = ""
+            connector_class = ""
+        
+        check_or_num = "✓" if dot_class == "completed" else icons[phase]
+        
+        steps_html += f'''
+            <div class="neuro-step">
+                <div class="neuro-step-dot {dot_class}">{check_or_num}</div>
+                <span class="neuro-step-label {label_class}">{labels[phase]}</span>
+            </div>
+        '''
+        
+        if i < len(phases) - 1:
+            steps_html += f'<div class="neuro-step-connector {connector_class}"></div>'
+    
+    st.markdown(f'<div class="neuro-stepper">{steps_html}</div>', unsafe_allow_html=True)
+
+# ---------------------------------------------------------
+# HELPER: Render Metric Card
+# ---------------------------------------------------------
+def render_metric_card(label: str, value, delta=None, delta_type="neutral", suffix=""):
+    """Render a styled metric card"""
+    delta_html = ""
+    if delta is not None:
+        delta_class = delta_type
+        delta_symbol = "↑" if delta_type == "positive" else ("↓" if delta_type == "negative" else "")
+        delta_html = f'<div class="neuro-metric-delta {delta_class}">{delta_symbol} {delta}</div>'
+    
+    st.markdown(f'''
+        <div class="neuro-metric">
+            <div class="neuro-metric-value">{value}{suffix}</div>
+            <div class="neuro-metric-label">{label}</div>
+            {delta_html}
+        </div>
+    ''', unsafe_allow_html=True)
+
+# ---------------------------------------------------------
+# HELPER: Render Feature Tile
+# ---------------------------------------------------------
+def render_feature_tile(icon: str, title: str, description: str):
+    """Render a feature highlight tile"""
+    st.markdown(f'''
+        <div class="neuro-feature">
+            <div class="neuro-feature-icon">{icon}</div>
+            <h4>{title}</h4>
+            <p>{description}</p>
+        </div>
+    ''', unsafe_allow_html=True)
+
+def render_coming_soon_card(title: str, description: str = "Coming soon"):
+    """Unified pink coming-soon card."""
+    st.markdown(
+        f"""
+        <div class="neuro-card" style="border-left: 6px solid #EC4899; background:#fff;">
+          <strong>{title}</strong><br>
+          <span style="color:#EC4899;">{description}</span>
+        </div>
+        """,
+        unsafe_allow_html=True,
+    )
+
+def render_phase_badge(phase: str):
+    """Render a colored phase badge"""
+    labels = {"calm": "Calm Phase", "boom": "Boom Phase", "crisis": "Crisis Phase"}
+    st.markdown(f'<span class="neuro-badge {phase}">{labels.get(phase, phase)}</span>', unsafe_allow_html=True)
+
+# ---------------------------------------------------------
+# HELPER: Render Info Box
+# ---------------------------------------------------------
+def render_info_box(text: str):
+    """Render an info callout box"""
+    st.markdown(f'''
+        <div class="neuro-info">
+            <p>ℹ️ {text}</p>
+        </div>
+    ''', unsafe_allow_html=True)
+
+# ---------------------------------------------------------
+# HELPER: Render Footer
+# ---------------------------------------------------------
+def render_footer():
+    """Render the app footer"""
+    st.markdown('''
+        <div class="neuro-footer">
+            <p><strong>NeuroRisk AI</strong> – Behavioral Risk Profiling</p>
+            <p>Turning emotion into data and compliance into confidence.</p>
+            <p style="margin-top: 1rem;">
+                <a href="#">Privacy</a> · 
+                <a href="#">Imprint</a> · 
+                <a href="#">Contact</a>
+            </p>
+            <p style="font-size: 0.75rem; margin-top: 1rem; color: #9CA3AF;">
+                © 2025 NeuroRisk AI. All rights reserved.
+            </p>
+        </div>
+    ''', unsafe_allow_html=True)
+
+# ---------------------------------------------------------
+# Phase intro texts
+# ---------------------------------------------------------
+def render_phase_intro(phase: str, note: str = None):
+    """Intro card of a market phase; ``note`` (markdown) is shown as an info box below the text."""
+    invest_amount = st.session_state.demographics.get("invest_amount", 10_000)
+
+    if phase == "calm":
+        title = "Phase 1 – Calm Market"
+        text = (
+            f"The economy is growing moderately, unemployment is low, and markets fluctuate only slightly. "
+            f"You have approx. {invest_amount:,.0f} CHF that you want to invest. "
+            "In the following questions, you will make decisions in a <b>calm, stable market environment</b>."
+        )
+    elif phase == "boom":
+        title = "Phase 2 – Boom / Euphoria"
+        text = (
+            "Stock indices are at or near all-time highs, media reports of a 'super rally'. "
+            "Your portfolio is in profit, the environment feels optimistic. "
+            "In the following questions, you decide in the context of an <b>overheated, euphoric market</b>."
+        )
+    else:
+        title = "Phase 3 – Crisis / Crash"
+        text = (
+            "Markets have fallen sharply, negative headlines dominate. "
+            "Your invested amount has lost significant value. "
+            "In the following questions, you decide in a <b>stressful crisis environment</b>."
+        )
+
+    st.subheader(title)
+    st.markdown(f'<div class="neuro-phase-intro">{text}</div>', unsafe_allow_html=True)
+    if note:
+        st.info(note)
+    st.write("When you're ready, start the questions for this market phase.")
+    if st.button("Continue to first question in this phase ▶"):
+        st.session_state.seen_phase_intros.add(phase)
+        st.session_state.scroll_top = True
+        st.rerun()
+
+# ---------------------------------------------------------
+# HELPER: Score cards (results section 4)
+# ---------------------------------------------------------
+def score_color_and_label(name, value, better_high=True):
+    """Return HTML color and short interpretation for score."""
+    val = float(value)
+    if better_high:
+        # high is good → green
+        if val >= 75:
+            color = "#16a34a"  # green
+            label = "good — consistent/robust"
+        elif val >= 50:
+            color = "#2563eb"  # blue (instead of orange)
+            label = "moderate — partially variable"
+        else:
+            color = "#f59e0b"  # orange (instead of red)
+            label = "low — increased variability"
+    else:
+        # low is good → green
+        if val <= 25:
+            color = "#16a34a"  # green
+            label = "good — low problem"
+        elif val <= 50:
+            color = "#2563eb"  # blue (instead of orange)
+            label = "moderate — observable"
+        else:
+            color = "#f59e0b"  # orange (instead of red)
+            label = "high — possible need for action"
+    return color, label
+
+def render_score_card(title, score_val, desc, better_high=True):
+    color, short = score_color_and_label(title, score_val, better_high)
+    html = f"""
+    <div style="border:1px solid #e5e7eb;border-left:6px solid {color};padding:10px;border-radius:8px;margin-bottom:8px;background:#fff;">
+        <div style="font-weight:700;color:#06436D;">{title}</div>
+        <div style="font-size:20px;margin-top:6px;">{int(score_val)} / 100</div>
+        <div style="color:{color};font-weight:600;margin-top:6px;">{short}</div>
+        <div style="margin-top:6px;color:#374151;">{desc}</div>
+    </div>
+    """
+    st.markdown(html, unsafe_allow_html=True)
+
+
+# ---------------------------------------------------------
+# HELPER: Continue Button with Browser-side Reaction Time
+# ---------------------------------------------------------
+_reaction_timer = components.declare_component(
+    "reaction_timer", path=Path(__file__).parent / "frontend" / "reaction_timer"
+)
+
+def continue_button(q_id: int):
+    """"Continue ▶" rendered in the browser. Returns None until clicked, then
+    {"question_id", "shown_ms", "answered_ms", "reaction_ms"} from
+    performance.now(), i.e. without network round trips and rerun queueing."""
+    return _reaction_timer(
+        question_id=q_id,
+        label="Continue ▶",
+        primary_color=PRIMARY_COLOR,
+        secondary_color=SECONDARY_COLOR,
+        text_color=TEXT_BUTTON,
+        key=f"next_{q_id}",
+        default=None,
+    )
+
+def client_reaction_time(timing, q_id: int):
+    """Seconds from the component's timing dict, or None if it is missing or implausible."""
+    if not isinstance(timing, dict) or timing.get("question_id") != q_id:
+        return None
+    try:
+        ms = float(timing["reaction_ms"])
+    except (KeyError, TypeError, ValueError):
+        return None
+    return ms / 1000.0 if math.isfinite(ms) and ms >= 0 else None
+
+
+# ---------------------------------------------------------
+# HELPER: Simulation Question Card
+# ---------------------------------------------------------
+@st.fragment
+def render_question_card(q: dict, idx: int, total: int):
+    """One simulation question. Runs as a fragment: the radio, checkbox and
+    slider only rerun this card; "Continue ▶" (continue_button) records the
+    answer and reruns the whole page."""
+    with SECTION_SECONDS.time("simulation", "question_card"):
+        _question_card(q, idx, total)
+
+def _question_card(q: dict, idx: int, total: int):
+    phase_label = {
+        "calm": "Calm Market",
+        "boom": "Boom / Euphoria",
+        "crisis": "Crisis / Crash"
+    }.get(q["phase"], q["phase"])
+
+    st.markdown(f"**Question {idx + 1} of {total}**")
+    st.markdown(f"**Market situation:** {phase_label}")
+
+    invest_amount = st.session_state.demographics.get("invest_amount", 10_000.0)
+
+    # Dynamic question text for Q1 & Q2
+    if q["id"] == 1:
+        q_text = (
+            f"Markets are stable, the economy is growing moderately. "
+            f"You have **approx. {invest_amount:,.0f} CHF** available to invest. "
+            "How would you invest it now?"
+        )
+    elif q["id"] == 2:
+        bonus = 0.10 * invest_amount
+
+        q_text = (
+            f"You receive a **bonus of approx. {bonus:,.0f} CHF** in addition to your original amount "
+            f"of approx. {invest_amount:,.0f} CHF. How much of this bonus would you invest in stocks?"
+        )
+    else:
+        q_text = q["question"]
+
+    st.write(q_text)
+
+    # Option labels with absolute values (return + volatility)
+    def format_option_label(opt):
+        base = opt["label"]
+        mu = opt.get("mu")
+        sigma = opt.get("sigma")
+
+        if mu is None or sigma is None:
+            return base
+
+        try:
+            ret_amt = invest_amount * mu / 100.0
+            vol_amt = invest_amount * sigma / 100.0
+
+            # +/- for return depending on sign
+            if mu > 0:
+                ret_str = f"≈ +{ret_amt:,.0f} CHF p.a."
+            elif mu < 0:
+                ret_str = f"≈ {ret_amt:,.0f} CHF p.a."
+            else:
+                ret_str = "≈ 0 CHF p.a."
+
+            base = (
+                f"{base} "
+                f"({ret_str}; "
+                f"Volatility approx. ±{sigma:.0f}% ≈ ±{vol_amt:,.0f} CHF)"
+            )
+        except Exception:
+            # Fallback: only base text
+            pass
+
+        return base
+
+    # Display plain labels only; risk ranks remain hidden
+    display_labels = [format_option_label(opt) for opt in q["options"]]
+
+    selected_index = st.radio(
+        "Choose an option:",
+        options=list(range(len(display_labels))),
+        format_func=lambda i: display_labels[i],
+        index=0
+    )
+
+    advisor_help_used = st.checkbox(
+        "I would like help from an advisor here.",
+        key=f"help_{q['id']}"
+    )
+
+    # Pulse slider at end of question, below answers
+    pulse_value = st.slider(
+        "If you look at your smartwatch: What is your current pulse (bpm)?",
+        min_value=40,
+        max_value=180,
+        value=75,
+        key=f"pulse_{q['id']}"
+    )
+
+    timing = continue_button(q["id"])
+
+    if timing:
+        # Server time includes round trips and reruns; prefer the browser's measurement
+        server_reaction_time = time.time() - st.session_state.question_start_time
+        client_rt = client_reaction_time(timing, q["id"])
+        reaction_time = client_rt if client_rt is not None else server_reaction_time
+        QUESTION_REACTION_SECONDS.observe(server_reaction_time, "server")
+        if client_rt is not None:
+            QUESTION_REACTION_SECONDS.observe(client_rt, "client")
+            QUESTION_LATENCY_SECONDS.observe(max(server_reaction_time - client_rt, 0.0))
+
+        chosen_opt = q["options"][selected_index]
+
+        # Compute risk from explicit risk_level (1..4); fallback to sigma rank if not provided
+        chosen_opt_risk_level = q["options"][selected_index].get("risk_level")
+        if isinstance(chosen_opt_risk_level, (int, float)):
+            # Normalize to [0,1] with 4 options
+            x_risk_relative = (float(chosen_opt_risk_level) - 1.0) / 3.0
+        else:
+            # Fallback: per-question ranking by sigma ascending
+            sigmas_with_index = [(opt.get("sigma", 0), idx) for idx, opt in enumerate(q["options"])]
+            sorted_by_sigma = sorted(sigmas_with_index, key=lambda t: t[0])
+            rank_map = {idx: (pos + 1) for pos, (_, idx) in enumerate(sorted_by_sigma)}
+            n_opts = len(q["options"]) 
+            denom = max(n_opts - 1, 1)
+            chosen_rank = rank_map.get(selected_index, 1)
+            x_risk_relative = (float(chosen_rank) - 1.0) / float(denom)
+
+        prev_risk = (
+            st.session_state.responses[-1]["x_risk_relative"]
+            if st.session_state.responses else x_risk_relative
+        )
+        switch_action = 1 if abs(x_risk_relative - prev_risk) > 0.5 else 0
+
+        # Risk relevance and herding flags (same derivation as for re-scoring from the DB)
+        meta = response_metadata(q["id"], chosen_opt["label"])
+
+        mu_val = chosen_opt.get("mu")
+        sigma_val = chosen_opt.get("sigma")
+
+        resp = {
+            "q_id": q["id"],
+            "phase": q["phase"],
+            "question": q["question"],
+            "selected_label": chosen_opt["label"],
+            "mu": mu_val,
+            "sigma": sigma_val,
+            "risk_level": chosen_opt.get("risk_level"),
+            "risk_relevant": meta["risk_relevant"],
+            "x_objective_risk_mean": mu_val,
+            "x_objective_risk_std": sigma_val,
+            "x_risk_relative": x_risk_relative,
+            "x_reaction_time": reaction_time,
+            "client_reaction_time": client_rt,
+            "server_reaction_time": server_reaction_time,
+            "x_pulse": float(pulse_value),
+            "x_eyes": 0.0,
+            "x_mimic": 0.0,
+            "advisor_help_used": int(advisor_help_used),
+            "switch_action": switch_action,
+            "bias_tag": meta["bias_tag"],
+            "follow_crowd": meta["follow_crowd"],
+            "herd_majority_flag": meta["herd_majority_flag"],  # Flag for actual herding questions
+        }
+
+        st.session_state.responses.append(resp)
+        st.session_state.current_q_index += 1
+        st.session_state.current_question_id = None
+        st.session_state.question_start_time = None
+        st.session_state.rerun_needed = True
+        st.session_state.scroll_top = True
+        st.rerun()
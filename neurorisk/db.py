@@ -0,0 +1,137 @@
+"""SQLite connection layer shared by all DB helpers.
+
+One ConnectionManager lives per process (app.py keeps it in st.cache_resource).
+Connections are opened once, tuned with pragmas and handed out through
+``with manager.connection() as conn:``; on exit they go back to the pool instead
+of being closed.
+"""
+import queue
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+
+DEFAULT_DB_FILE = Path(__file__).resolve().parent.parent / "neurorisk.db"
+
+# Pragmas applied to every new connection
+PRAGMAS = {
+    "journal_mode": "WAL",        # readers don't block the writer
+    "synchronous": "NORMAL",      # safe with WAL, far fewer fsyncs
+    "cache_size": -16000,         # ~16 MB page cache per connection
+    "mmap_size": 268435456,       # 256 MB memory-mapped I/O
+    "busy_timeout": 5000,         # ms to wait for a lock before failing
+    "temp_store": "MEMORY",
+}
+
+
+class ConnectionManager:
+    """Pool of tuned SQLite connections for one database file.
+
+    Streamlit runs every rerun in a fresh script thread, so plain thread-local
+    connections would never be reused. Instead each thread checks out a
+    connection for the duration of a ``with`` block (exclusive per thread while
+    held) and returns it to the pool afterwards.
+    """
+
+    def __init__(self, db_file=DEFAULT_DB_FILE, max_idle: int = 8, pragmas: dict = None):
+        self.db_file = str(db_file)
+        self.max_idle = max_idle
+        self.pragmas = dict(PRAGMAS if pragmas is None else pragmas)
+        self._idle = queue.LifoQueue()
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._counters = {"opened": 0, "reused": 0, "closed": 0, "checkouts": 0}
+
+    # ---------- internals ----------
+    def _open(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.db_file, check_same_thread=False)
+        conn.row_factory = sqlite3.Row
+        for name, value in self.pragmas.items():
+            conn.execute(f"PRAGMA {name} = {value}")
+        with self._lock:
+            self._counters["opened"] += 1
+        return conn
+
+    def _acquire(self) -> sqlite3.Connection:
+        try:
+            conn = self._idle.get_nowait()
+            reused = True
+        except queue.Empty:
+            conn = self._open()
+            reused = False
+        with self._lock:
+            self._counters["checkouts"] += 1
+            if reused:
+                self._counters["reused"] += 1
+        return conn
+
+    def _release(self, conn: sqlite3.Connection):
+        if self._idle.qsize() < self.max_idle:
+            self._idle.put(conn)
+            return
+        conn.close()
+        with self._lock:
+            self._counters["closed"] += 1
+
+    # ---------- public API ----------
+    @contextmanager
+    def connection(self):
+        """Yield a pooled connection; commit on success, roll back on error.
+
+        Nested use in the same thread reuses the outer connection (and leaves
+        commit/rollback to the outer block).
+        """
+        outer = getattr(self._local, "conn", None)
+        if outer is not None:
+            yield outer
+            return
+
+        conn = self._acquire()
+        self._local.conn = conn
+        try:
+            yield conn
+            if conn.in_transaction:
+                conn.commit()
+        except BaseException:
+            if conn.in_transaction:
+                conn.rollback()
+            raise
+        finally:
+            self._local.conn = None
+            self._release(conn)
+
+    def stats(self) -> dict:
+        """Counters: connections opened / reused / closed, checkouts, idle pool size."""
+        with self._lock:
+            out = dict(self._counters)
+        out["idle"] = self._idle.qsize()
+        return out
+
+    def close_all(self):
+        """Close every idle connection (e.g. before deleting the DB file)."""
+        while True:
+            try:
+                conn = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            conn.close()
+            with self._lock:
+                self._counters["closed"] += 1
+
+
+def begin_immediate(conn, timeout: float = 600.0):
+    """BEGIN IMMEDIATE, retrying past busy_timeout for up to ``timeout`` seconds.
+
+    For one-off work another process may be doing at the same time, such as
+    schema migrations with a long backfill; regular writes should fail fast.
+    """
+    deadline = time.monotonic() + timeout
+    while True:
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            return
+        except sqlite3.OperationalError as e:
+            if "locked" not in str(e) or time.monotonic() >= deadline:
+                raise
+            time.sleep(0.1)
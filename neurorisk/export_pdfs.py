@@ -0,0 +1,182 @@
+"""Batch export of results reports for advisors.
+
+Streams profiles from the DB (optionally restricted to usernames and a
+timestamp range), renders ``generate_results_pdf`` for each one across a
+process pool and writes the PDFs into a single ZIP as they finish::
+
+    python -m neurorisk.export_pdfs reports.zip --since 2025-01-01 --until 2025-03-31
+    python -m neurorisk.export_pdfs advisor.zip --username alice --username bob --workers 8
+
+Only a bounded window of profiles is in flight at any time, so memory stays flat
+regardless of how many reports are exported. Scores are taken from the stored
+profile by default; ``--rescore`` recomputes them from the saved responses.
+"""
+import argparse
+import json
+import sys
+import time
+import zipfile
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+from neurorisk.profiles import RESPONSE_COLUMNS, stored_response
+
+FETCH_CHUNK = 200
+
+
+def _where(usernames=None, since=None, until=None):
+    clauses, params = [], []
+    if usernames:
+        clauses.append(f"username IN ({', '.join('?' * len(usernames))})")
+        params += list(usernames)
+    if since:
+        clauses.append("timestamp >= ?")
+        params.append(since)
+    if until:
+        clauses.append("timestamp < date(?, '+1 day')")  # inclusive end date
+        params.append(until)
+    return (" WHERE " + " AND ".join(clauses) if clauses else ""), params
+
+
+def count_profiles(conn, usernames=None, since=None, until=None) -> int:
+    where, params = _where(usernames, since, until)
+    return conn.execute(f"SELECT COUNT(*) FROM profiles{where}", params).fetchone()[0]
+
+
+def iter_profiles(conn, usernames=None, since=None, until=None, chunk_size: int = FETCH_CHUNK):
+    """Yield export tasks (dicts with the profile and its responses), keyset-paginated by id."""
+    where, params = _where(usernames, since, until)
+    where += " AND id > ?" if where else " WHERE id > ?"
+    last_id = 0
+    while True:
+        rows = conn.execute(
+            f"SELECT id, username, timestamp, demographics, scores FROM profiles{where} ORDER BY id LIMIT ?",
+            params + [last_id, chunk_size],
+        ).fetchall()
+        if not rows:
+            return
+        ids = [r["id"] for r in rows]
+        responses = {pid: [] for pid in ids}
+        for r in conn.execute(
+            f"SELECT profile_id, {', '.join(RESPONSE_COLUMNS)} FROM responses "
+            f"WHERE profile_id IN ({', '.join('?' * len(ids))}) ORDER BY id",
+            ids,
+        ):
+            responses[r["profile_id"]].append(stored_response(tuple(r)[1:]))
+        for r in rows:
+            yield {
+                "id": r["id"],
+                "username": r["username"],
+                "timestamp": r["timestamp"],
+                "demographics": r["demographics"],
+                "scores": r["scores"],
+                "responses": responses[r["id"]],
+            }
+        last_id = ids[-1]
+
+
+def pdf_name(task) -> str:
+    who = task["username"] or "guest"
+    return f"{task['id']:07d}_{who}.pdf"
+
+
+def render_task(task, rescore: bool = False):
+    """Worker: render one profile; returns (archive name, PDF bytes or None, error or None)."""
+    from neurorisk.report import biometrics_frame, generate_results_pdf, report_args
+    from neurorisk.scoring import compute_scores
+
+    try:
+        demographics = json.loads(task["demographics"])
+        responses = task["responses"]
+        # Without stored responses there is nothing to re-score from: keep the stored scores
+        scores = compute_scores(demographics, responses) if rescore and responses else json.loads(task["scores"])
+        biometrics = biometrics_frame(responses) if responses else None
+        pdf_bytes = generate_results_pdf(*report_args(demographics, biometrics, scores))
+    except Exception as e:
+        return pdf_name(task), None, f"{type(e).__name__}: {e}"
+    return pdf_name(task), pdf_bytes, None
+
+
+def export_pdfs(conn, zip_path, usernames=None, since=None, until=None, workers: int = None,
+                rescore: bool = False, progress=None) -> dict:
+    """Render all matching profiles into ``zip_path``; returns counters."""
+    total = count_profiles(conn, usernames, since, until)
+    window = max(2, (workers or 4) * 4)
+    stats = {"total": total, "written": 0, "failed": 0, "bytes": 0, "seconds": 0.0}
+    start = time.perf_counter()
+
+    with ProcessPoolExecutor(max_workers=workers) as pool, \
+            zipfile.ZipFile(zip_path, "w", compression=zipfile.ZIP_DEFLATED) as zf:
+        in_flight = set()
+
+        def drain(block_until):
+            nonlocal in_flight
+            done, in_flight = wait(in_flight, return_when=block_until)
+            for future in done:
+                name, pdf_bytes, error = future.result()
+                if pdf_bytes is None:
+                    stats["failed"] += 1
+                    print(f"{name}: {error or 'reportlab not installed'}", file=sys.stderr)
+                    continue
+                zf.writestr(name, pdf_bytes)
+                stats["written"] += 1
+                stats["bytes"] += len(pdf_bytes)
+            if progress:
+                stats["seconds"] = time.perf_counter() - start
+                progress(stats)
+
+        for task in iter_profiles(conn, usernames, since, until):
+            in_flight.add(pool.submit(render_task, task, rescore))
+            if len(in_flight) >= window:
+                drain(FIRST_COMPLETED)
+        while in_flight:
+            drain(FIRST_COMPLETED)
+
+    stats["seconds"] = time.perf_counter() - start
+    return stats
+
+
+class _Progress:
+    """Prints a progress line at most every ``interval`` seconds."""
+
+    def __init__(self, interval: float = 1.0):
+        self.interval = interval
+        self._last = 0.0
+
+    def __call__(self, stats):
+        done = stats["written"] + stats["failed"]
+        now = time.perf_counter()
+        if now - self._last < self.interval and done < stats["total"]:
+            return
+        self._last = now
+        rate = done / stats["seconds"] if stats["seconds"] > 0 else 0.0
+        print(f"\r{done}/{stats['total']} PDFs ({rate:,.1f}/s)", end="", file=sys.stderr, flush=True)
+
+
+def main(argv=None):
+    from neurorisk.db import DEFAULT_DB_FILE, ConnectionManager
+    from neurorisk.report import pdf_available
+
+    parser = argparse.ArgumentParser(description="Export results PDFs for many profiles into one ZIP.")
+    parser.add_argument("zip", help="output ZIP file")
+    parser.add_argument("--db", default=str(DEFAULT_DB_FILE))
+    parser.add_argument("--username", action="append", help="only this user (repeatable)")
+    parser.add_argument("--since", help="first day, YYYY-MM-DD")
+    parser.add_argument("--until", help="last day (inclusive), YYYY-MM-DD")
+    parser.add_argument("--workers", type=int, default=None, help="processes (default: CPU count)")
+    parser.add_argument("--rescore", action="store_true", help="recompute scores from the stored responses")
+    args = parser.parse_args(argv)
+
+    if not pdf_available():
+        parser.error("PDF export requires the Python package reportlab.")
+
+    db = ConnectionManager(args.db)
+    with db.connection() as conn:
+        stats = export_pdfs(conn, args.zip, args.username, args.since, args.until,
+                            args.workers, args.rescore, progress=_Progress())
+    rate = stats["written"] / stats["seconds"] if stats["seconds"] > 0 else 0.0
+    print(f"\nwrote {stats['written']} PDFs ({stats['bytes'] / 1e6:.1f} MB) to {args.zip} "
+          f"in {stats['seconds']:.2f}s ({rate:,.1f} PDFs/s), {stats['failed']} failed", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,236 @@
+"""Process-wide timing histograms exported in the Prometheus text format.
+
+Observations go into fixed-bucket histograms (one series per label set) kept
+in ``REGISTRY``. ``render()`` produces the text exposition format; the app
+writes it to a ``.prom`` file every few seconds (``start_textfile_exporter``)
+for a local scraper, e.g. node_exporter's textfile collector::
+
+    neurorisk_stage_seconds_bucket{stage="results",le="0.25"} 41
+
+Counters that already live elsewhere (results cache, PDF service) are added
+at render time through collectors. No Streamlit or third-party imports, so the
+CLIs can record into the same registry.
+"""
+import bisect
+import functools
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+
+log = logging.getLogger(__name__)
+
+# Upper bounds in seconds (+Inf is implicit)
+BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+class Histogram:
+    """Cumulative-bucket histogram with one series per tuple of label values."""
+
+    def __init__(self, name: str, help: str, label_names=(), buckets=BUCKETS):
+        self.name = name
+        self.help = help
+        self.label_names = tuple(label_names)
+        self.buckets = tuple(buckets)
+        self._series = {}  # label values -> [bucket counts..., +Inf count, sum]
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, *label_values):
+        i = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(label_values)
+            if series is None:
+                series = self._series[label_values] = [0] * (len(self.buckets) + 1) + [0.0]
+            series[i] += 1
+            series[-1] += value
+
+    @contextmanager
+    def time(self, *label_values):
+        """Observe the duration of the block (also when it exits via an exception)."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, *label_values)
+
+    def series(self) -> dict:
+        """{label values: (per-bucket counts incl. +Inf, sum)} snapshot."""
+        with self._lock:
+            return {labels: (list(s[:-1]), s[-1]) for labels, s in self._series.items()}
+
+    def quantile(self, q: float, *label_values):
+        """Estimate the q-quantile of one series; None without observations."""
+        snapshot = self.series().get(label_values)
+        if snapshot is None:
+            return None
+        return bucket_quantile(self.buckets, snapshot[0], q)
+
+    def render(self) -> list:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        for labels, (counts, total) in sorted(self.series().items()):
+            base = dict(zip(self.label_names, labels))
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += count
+                lines.append(f"{self.name}_bucket{_labels(base, le=_le(bound))} {cumulative}")
+            lines.append(f"{self.name}_sum{_labels(base)} {total:.6f}")
+            lines.append(f"{self.name}_count{_labels(base)} {cumulative}")
+        return lines
+
+
+class Registry:
+    """Named histograms plus collectors for values owned by other objects."""
+
+    def __init__(self):
+        self._histograms = {}
+        self._collectors = {}
+        self._lock = threading.Lock()
+
+    def histogram(self, name: str, help: str, label_names=(), buckets=BUCKETS) -> Histogram:
+        with self._lock:
+            if name not in self._histograms:
+                self._histograms[name] = Histogram(name, help, label_names, buckets)
+            return self._histograms[name]
+
+    def add_collector(self, key: str, collect):
+        """``collect()`` returns [(name, type, help, value)]; re-adding a key replaces it."""
+        with self._lock:
+            self._collectors[key] = collect
+
+    def histograms(self) -> list:
+        with self._lock:
+            return list(self._histograms.values())
+
+    def render(self) -> str:
+        """All metrics in the Prometheus text exposition format."""
+        with self._lock:
+            histograms = list(self._histograms.values())
+            collectors = list(self._collectors.items())
+        lines = []
+        for histogram in sorted(histograms, key=lambda h: h.name):
+            lines += histogram.render()
+        for key, collect in sorted(collectors):
+            try:
+                samples = collect()
+            except Exception:
+                log.exception("metrics collector %s failed", key)
+                continue
+            for name, kind, help, value in samples:
+                lines += [f"# HELP {name} {help}", f"# TYPE {name} {kind}", f"{name} {float(value):g}"]
+        return "\n".join(lines) + "\n"
+
+
+def bucket_quantile(buckets, counts, q: float):
+    """q-quantile from per-bucket counts (incl. +Inf) by linear interpolation
+    inside the bucket, as Prometheus' histogram_quantile does; None if empty.
+    Works on differences of two ``series()`` snapshots as well."""
+    total = sum(counts)
+    if not total:
+        return None
+    rank, seen = q * total, 0
+    for i, count in enumerate(counts):
+        if seen + count >= rank and count:
+            if i == len(buckets):
+                return buckets[-1]  # in +Inf: best lower bound
+            lower = buckets[i - 1] if i else 0.0
+            return lower + (buckets[i] - lower) * (rank - seen) / count
+        seen += count
+    return buckets[-1]
+
+
+def _le(bound: float) -> str:
+    return "+Inf" if bound == float("inf") else f"{bound:g}"
+
+
+def _labels(base: dict, **extra) -> str:
+    items = {**base, **extra}
+    if not items:
+        return ""
+    escaped = (str(v).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n") for v in items.values())
+    return "{" + ",".join(f'{k}="{v}"' for k, v in zip(items, escaped)) + "}"
+
+
+REGISTRY = Registry()
+
+STAGE_SECONDS = REGISTRY.histogram(
+    "neurorisk_stage_seconds", "Script run time per app stage", ("stage",))
+SECTION_SECONDS = REGISTRY.histogram(
+    "neurorisk_section_seconds", "Render time per page section", ("stage", "section"))
+DB_SECONDS = REGISTRY.histogram(
+    "neurorisk_db_seconds", "Time spent in DB helpers", ("helper",))
+DB_LOCK_WAIT_SECONDS = REGISTRY.histogram(
+    "neurorisk_db_lock_wait_seconds", "Wait for the SQLite write lock (BEGIN IMMEDIATE)")
+
+# Answering a question takes seconds, not milliseconds
+REACTION_BUCKETS = (0.5, 1.0, 2.0, 3.0, 5.0, 7.5, 10.0, 15.0, 20.0, 30.0, 60.0, 120.0)
+QUESTION_REACTION_SECONDS = REGISTRY.histogram(
+    "neurorisk_question_reaction_seconds", "Reaction time per answered question (browser or server clock)",
+    ("source",), buckets=REACTION_BUCKETS)
+QUESTION_LATENCY_SECONDS = REGISTRY.histogram(
+    "neurorisk_question_latency_seconds",
+    "Server minus browser reaction time per question (round trips, rerun queueing)")
+
+
+def db_timed(fn):
+    """Decorator: record the helper's duration in neurorisk_db_seconds."""
+    @functools.wraps(fn)
+    def wrapper(*args, **kwargs):
+        with DB_SECONDS.time(fn.__name__):
+            return fn(*args, **kwargs)
+    return wrapper
+
+
+class RunTimer:
+    """Lap timer for one script run of a stage.
+
+    ``lap(section)`` closes the running section and starts the next one;
+    ``finish()`` closes the last section and records the stage total. A run cut
+    short by st.rerun() before ``finish`` only keeps its completed laps.
+    """
+
+    def __init__(self, stage: str):
+        self.stage = stage
+        self.start = self._mark = time.perf_counter()
+        self._section = None
+        self.finished = False
+
+    def lap(self, section: str):
+        now = time.perf_counter()
+        if self._section is not None:
+            SECTION_SECONDS.observe(now - self._mark, self.stage, self._section)
+        self._section, self._mark = section, now
+
+    def finish(self):
+        if self.finished:
+            return
+        self.lap(None)
+        STAGE_SECONDS.observe(self._mark - self.start, self.stage)
+        self.finished = True
+
+
+# ---------------------------------------------------------
+# Export
+# ---------------------------------------------------------
+def write_textfile(path, registry: Registry = REGISTRY):
+    """Atomically replace ``path`` with the current metrics (scrapers never see half a file)."""
+    path = Path(path)
+    tmp = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    tmp.write_text(registry.render(), encoding="utf-8")
+    os.replace(tmp, path)
+
+
+def start_textfile_exporter(path, interval: float = 10.0, registry: Registry = REGISTRY) -> threading.Thread:
+    """Daemon thread rewriting ``path`` every ``interval`` seconds."""
+    def loop():
+        while True:
+            try:
+                write_textfile(path, registry)
+            except Exception:
+                log.exception("writing metrics to %s failed", path)
+            time.sleep(interval)
+
+    thread = threading.Thread(target=loop, name="metrics-exporter", daemon=True)
+    thread.start()
+    return thread
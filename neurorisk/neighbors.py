@@ -0,0 +1,219 @@
+"""Nearest-neighbour index over score vectors ("investors like you").
+
+Every profile is a point in an 11-dimensional feature space: per-phase risk
+and stress, RCS, SSS, RGS, loss aversion and herding, each divided by a fixed
+scale so all features span about one unit. Distances are Euclidean.
+
+Small populations are scanned exhaustively. Larger ones go through a
+random-projection LSH (p-stable, as in E2LSH): every table hashes a point to
+the cell of a grid of random projections, and a query only measures the
+distance to points sharing a cell with it in at least one table. Each table
+keeps its keys sorted (so a cell is a binary search away) plus an unsorted
+tail for profiles added since the last sort; the tail is merged in once it
+grows past a fraction of the index. Like the PeerStore, a NeighborIndex
+loads the profiles table once and afterwards only pulls rows above its
+high-water mark on ``profiles.id``.
+"""
+import threading
+
+import numpy as np
+
+from neurorisk.peers import PEER_SELECT, PHASES, PeerTable, peer_generation, row_from_columns
+
+# Feature: (profiles column, scores key, scale, fallback for missing values)
+FEATURES = (
+    [(f"risk_{p}", ("risk_by_phase", p), 1.0, 0.5) for p in PHASES]
+    + [(f"stress_{p}", ("stress_by_phase", p), 4.0, 0.0) for p in PHASES]
+    + [
+        ("rcs", "RCS", 100.0, 50.0),
+        ("sss", "SSS", 100.0, 50.0),
+        ("rgs", "RGS", 100.0, 50.0),
+        ("loss_aversion", "loss_aversion_proxy", 2.0, 0.0),
+        ("herding", "herding_score", 100.0, 0.0),
+    ]
+)
+FEATURE_COLUMNS = [col for col, _, _, _ in FEATURES]
+_SCALES = np.array([scale for _, _, scale, _ in FEATURES])
+_FALLBACKS = np.array([fallback for _, _, _, fallback in FEATURES])
+
+BRUTE_FORCE_MAX = 50_000    # below this a full scan is as fast as the hash lookups
+LSH_TABLES = 12
+LSH_PROJECTIONS = 8         # grid dimensions per table
+LSH_WIDTH = 0.4             # grid spacing in scaled feature units
+CANDIDATES_PER_NEIGHBOR = 80   # multi-probe until this many candidates per wanted neighbour
+HASH_CHUNK = 65_536         # rows hashed at once (bounds the temporaries while loading)
+
+
+def feature_matrix(values):
+    """Scale raw feature rows (None/NaN → fallback) into index space, float32."""
+    values = np.array(values, dtype=np.float64).reshape(-1, len(FEATURES))
+    values = np.where(np.isnan(values), _FALLBACKS, values)
+    return (values / _SCALES).astype(np.float32)
+
+
+def score_features(scores: dict):
+    """Feature row of a compute_scores result (pandas Series or dicts per phase)."""
+    row = []
+    for _, key, _, _ in FEATURES:
+        if isinstance(key, tuple):
+            by_phase = scores.get(key[0])
+            val = by_phase.get(key[1]) if by_phase is not None else None
+        else:
+            val = scores.get(key)
+        row.append(np.nan if val is None else float(val))
+    return feature_matrix([row])[0]
+
+
+class NeighborIndex:
+    """Incrementally built LSH index of all stored profiles; thread-safe."""
+
+    def __init__(self, tables: int = LSH_TABLES, projections: int = LSH_PROJECTIONS,
+                 width: float = LSH_WIDTH, seed: int = 0):
+        rng = np.random.default_rng(seed)
+        self.width = width
+        self._proj = rng.standard_normal((tables, len(FEATURES), projections)).astype(np.float32)
+        self._offset = rng.uniform(0, width, (tables, projections)).astype(np.float32)
+        # Odd multipliers fold the grid coordinates of one table into a single key
+        self._mix = rng.integers(1, 1 << 31, projections, dtype=np.int64) | 1
+        self._lock = threading.Lock()
+        self._refresh_lock = threading.Lock()   # one refresh at a time; queries only wait for appends
+        self._reset()
+
+    def _reset(self):
+        self.n = 0
+        self.high_water = 0
+        self.generation = 0
+        self._ids = np.zeros(1024, dtype=np.int64)
+        self._features = np.zeros((1024, len(FEATURES)), dtype=np.float32)
+        tables = len(self._proj)
+        self._sorted_keys = np.zeros((tables, 0), dtype=np.int64)
+        self._order = np.zeros((tables, 0), dtype=np.int32)
+        self._tail_keys = np.zeros((tables, 0), dtype=np.int64)
+
+    def __len__(self):
+        return self.n
+
+    def _keys(self, features):
+        """tables × rows bucket keys."""
+        cells = np.floor((features @ self._proj + self._offset[:, None, :]) / self.width).astype(np.int64)
+        return cells @ self._mix
+
+    # ---------------------------------------------------------
+    # Building
+    # ---------------------------------------------------------
+    def add(self, ids, features):
+        """Append profiles (ids ascending, features already scaled)."""
+        k = len(ids)
+        if not k:
+            return
+        keys = np.concatenate(
+            [self._keys(features[i:i + HASH_CHUNK]) for i in range(0, k, HASH_CHUNK)], axis=1)
+        with self._lock:
+            if self.n + k > len(self._ids):
+                # Amortized doubling; snapshots taken by running queries keep the old arrays
+                capacity = len(self._ids)
+                while capacity < self.n + k:
+                    capacity *= 2
+                self._ids = np.resize(self._ids, capacity)
+                self._features = np.resize(self._features, (capacity, len(FEATURES)))
+            self._ids[self.n:self.n + k] = ids
+            self._features[self.n:self.n + k] = features
+            self.n += k
+            self._tail_keys = np.concatenate([self._tail_keys, keys], axis=1)
+            if self._tail_keys.shape[1] > max(4096, self._sorted_keys.shape[1] // 8):
+                self._merge_tail()
+
+    def _merge_tail(self):
+        keys = np.concatenate([self._sorted_keys, self._tail_keys], axis=1)
+        rows = np.concatenate([self._order, np.tile(
+            np.arange(self._order.shape[1], self.n, dtype=np.int32), (len(keys), 1))], axis=1)
+        order = np.argsort(keys, axis=1, kind="stable")
+        self._sorted_keys = np.take_along_axis(keys, order, axis=1)
+        self._order = np.take_along_axis(rows, order, axis=1)
+        self._tail_keys = self._tail_keys[:, :0]
+
+    def refresh(self, conn) -> int:
+        """Index profiles inserted since the last refresh; returns the number of new rows."""
+        with self._refresh_lock:
+            generation = peer_generation(conn)
+            if generation != self.generation:
+                # Stored scores were rewritten (see neurorisk.rescore): rebuild
+                with self._lock:
+                    self._reset()
+                    self.generation = generation
+            rows = conn.execute(
+                f"SELECT id, {', '.join(FEATURE_COLUMNS)} FROM profiles WHERE id > ? ORDER BY id",
+                (self.high_water,),
+            ).fetchall()
+            if not rows:
+                return 0
+            ids = [r[0] for r in rows]
+            self.add(ids, feature_matrix([tuple(r)[1:] for r in rows]))
+            self.high_water = ids[-1]
+            return len(rows)
+
+    # ---------------------------------------------------------
+    # Queries
+    # ---------------------------------------------------------
+    def query(self, point, k: int, exclude_id=None):
+        """(profile ids, distances) of the k nearest profiles, closest first."""
+        with self._lock:
+            n = self.n
+            features, ids = self._features[:n], self._ids[:n]
+            candidates = None
+            if n > BRUTE_FORCE_MAX:
+                candidates = self._candidates(point, CANDIDATES_PER_NEIGHBOR * k)
+                if len(candidates) <= k:
+                    candidates = None   # sparse region: fall back to a full scan
+        rows = features if candidates is None else features[candidates]
+        dist = np.sqrt(((rows - point) ** 2).sum(axis=1))
+        found = ids if candidates is None else ids[candidates]
+        if exclude_id is not None:
+            keep = found != exclude_id
+            dist, found = dist[keep], found[keep]
+        top = np.argpartition(dist, k)[:k] if len(dist) > k else np.arange(len(dist))
+        top = top[np.argsort(dist[top], kind="stable")]
+        return found[top], dist[top]
+
+    def _candidates(self, point, wanted: int):
+        """Rows sharing an LSH cell with ``point`` in any table.
+
+        Multi-probe: while fewer than ``wanted`` rows were found, the cells next
+        to the query's are looked up as well, nearest cell boundary first. A
+        key is linear in the cell coordinates, so a neighbour cell's key is the
+        query's plus or minus one multiplier.
+        """
+        pos = (point @ self._proj + self._offset) / self.width        # tables × projections
+        cells = np.floor(pos)
+        keys = cells.astype(np.int64) @ self._mix
+        frac = pos - cells
+        # (boundary distance, table, key) of every neighbour cell, nearest first
+        steps = np.concatenate([frac, 1 - frac], axis=1)
+        shifts = np.concatenate([-self._mix, self._mix])
+        order = np.argsort(steps, axis=None, kind="stable")
+        tables, which = np.unravel_index(order, steps.shape)
+        probes = list(enumerate(keys)) + list(zip(tables, keys[tables] + shifts[which]))
+
+        n_sorted = self._order.shape[1]
+        parts, found = [], 0
+        for i, (t, key) in enumerate(probes):
+            if i >= len(keys) and found >= wanted:
+                break
+            lo, hi = np.searchsorted(self._sorted_keys[t], [key, key + 1])
+            parts.append(self._order[t, lo:hi])
+            parts.append(np.flatnonzero(self._tail_keys[t] == key) + n_sorted)
+            found += hi - lo + len(parts[-1])
+        return np.unique(np.concatenate(parts))
+
+
+def neighbor_view(conn, ids) -> "PeerView":
+    """The given profiles as a PeerView, for calculate_aggregate_scores / calculate_percentiles."""
+    table = PeerTable(capacity=max(len(ids), 1))
+    if len(ids):
+        rows = conn.execute(
+            f"SELECT id, username, {PEER_SELECT} FROM profiles "
+            f"WHERE id IN ({', '.join('?' * len(ids))}) ORDER BY id",
+            [int(i) for i in ids],
+        ).fetchall()
+        table.append([r["id"] for r in rows], [r["username"] for r in rows], [row_from_columns(r) for r in rows])
+    return table.view()
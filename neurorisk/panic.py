@@ -0,0 +1,340 @@
+"""Panic probability: logistic regression over the stored responses.
+
+The label is a repeated sell-out in the crisis: the most defensive option
+(risk level 1, "sell everything and go to cash" and the like) on at least
+``PANIC_MIN_ANSWERS`` of the ``PANIC_QUESTIONS``.
+The features describe the rest of the session, with the label questions left
+out so the model never sees the answer it predicts:
+
+* how far risk taking drops from the calm and from the boom phase to the
+  remaining crisis questions;
+* crisis reaction times: mean within-session z-score and log mean in seconds;
+* crisis pulse: mean within-session z-score;
+* switch_action rate over the calm and boom answers.
+
+Training is a batch job. It streams ``responses`` in id order, ``CHUNK_ROWS``
+rows at a time, and reduces each chunk to one feature row per profile with
+NumPy group sums, so only the feature rows stay in memory. The regression is
+fitted by Newton's method (IRLS) with a small L2 penalty. Profiles with
+``id % HOLDOUT_EVERY == 0`` are held out for the AUC and log loss stored with
+the model. The result is a small JSON file of coefficients, read once per app
+process::
+
+    python -m neurorisk.panic --db neurorisk.db     # writes neurorisk.panic.json
+"""
+import argparse
+import json
+import logging
+import os
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+from neurorisk.peers import PHASES
+from neurorisk.questions import SCENARIO_QUESTIONS
+
+log = logging.getLogger(__name__)
+
+MODEL_FORMAT = 1
+PANIC_QUESTIONS = (13, 15, 16)     # crisis questions whose level-1 option sells out
+PANIC_MIN_ANSWERS = 2              # sell-outs needed for the label
+CHUNK_ROWS = 200_000               # responses per streamed chunk
+HOLDOUT_EVERY = 5
+L2 = 1.0
+MAX_ITERATIONS = 25
+MIN_PROFILES = 300
+
+# Feature: (name, wording when high, wording when low)
+FEATURES = (
+    ("risk_drop_calm", "cuts risk sharply from calm to crisis", "keeps risk up from calm to crisis"),
+    ("risk_drop_boom", "cuts risk sharply after the boom", "keeps risk up after the boom"),
+    ("crisis_rt_z", "slows down in the crisis", "decides quickly in the crisis"),
+    ("crisis_rt_log", "long crisis decisions", "short crisis decisions"),
+    ("crisis_pulse_z", "pulse rises in the crisis", "pulse stays calm in the crisis"),
+    ("switch_rate", "switches strategy often", "sticks to a strategy"),
+)
+FEATURE_NAMES = [name for name, _, _ in FEATURES]
+DRIVER_MIN_LOGIT = 0.15            # contributions below this are not worth naming
+
+# Same codes as neurorisk.batch_scoring, which would pull the scoring stack (pandas) into app startup
+PHASE_CODES = {p: i for i, p in enumerate(PHASES)}
+_RISK_RELEVANT = [q["id"] for q in SCENARIO_QUESTIONS if q.get("risk_relevant", True)]
+_CALM, _BOOM, _CRISIS = PHASE_CODES["calm"], PHASE_CODES["boom"], PHASE_CODES["crisis"]
+
+_RESPONSE_SELECT = (
+    "SELECT id, profile_id, q_id, "
+    + "CASE phase " + " ".join(f"WHEN '{p}' THEN {c}" for p, c in PHASE_CODES.items()) + " ELSE -1 END, "
+    + "x_risk_relative, x_reaction_time, x_pulse, switch_action FROM responses WHERE id > ? ORDER BY id LIMIT ?"
+)
+
+
+# ---------------------------------------------------------
+# Features
+# ---------------------------------------------------------
+def group_mean(group, n, values, mask):
+    """Per-session mean of ``values[mask]``; NaN for sessions without such rows."""
+    mask = mask & np.isfinite(values)
+    total = np.bincount(group[mask], values[mask], minlength=n)
+    count = np.bincount(group[mask], minlength=n)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return total / count
+
+
+def group_zscore(group, n, values, mask):
+    """Per-row z-score against the row's session (population std, as compute_scores); 0 without spread."""
+    mean = group_mean(group, n, values, mask)
+    std = np.sqrt(np.maximum(group_mean(group, n, values ** 2, mask) - mean ** 2, 0.0))
+    std = std[group]
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return np.where(std > 1e-9, (values - mean[group]) / std, 0.0)
+
+
+def session_features(group, n, q_id, phase, risk, reaction_time, pulse, switch):
+    """(n × features matrix, labels, has_label) from flat response arrays.
+
+    ``group`` is the session index 0..n-1 of every row; missing values are NaN.
+    ``labels`` is True where at least ``PANIC_MIN_ANSWERS`` label questions were
+    answered with the sell-out option.
+    """
+    asked = np.isin(q_id, PANIC_QUESTIONS)
+    has_label = np.bincount(group[asked], minlength=n) > 0
+    labels = np.bincount(group[asked & (risk <= 0.0)], minlength=n) >= PANIC_MIN_ANSWERS
+
+    rest = ~asked
+    risky = rest & np.isin(q_id, _RISK_RELEVANT)
+    crisis = rest & (phase == _CRISIS)
+    risk_calm = group_mean(group, n, risk, risky & (phase == _CALM))
+    risk_boom = group_mean(group, n, risk, risky & (phase == _BOOM))
+    risk_crisis = group_mean(group, n, risk, risky & (phase == _CRISIS))
+    with np.errstate(divide="ignore", invalid="ignore"):
+        crisis_rt_log = np.log(group_mean(group, n, reaction_time, crisis))
+    features = np.column_stack([
+        risk_calm - risk_crisis,
+        risk_boom - risk_crisis,
+        group_mean(group, n, group_zscore(group, n, reaction_time, rest), crisis),
+        crisis_rt_log,
+        group_mean(group, n, group_zscore(group, n, pulse, rest), crisis),
+        group_mean(group, n, switch, rest & ((phase == _CALM) | (phase == _BOOM))),
+    ])
+    features[~np.isfinite(features)] = np.nan
+    return features, labels, has_label
+
+
+def response_features(responses):
+    """Feature row of one session's response dicts (as the simulation stores them)."""
+    columns = ("q_id", "phase", "x_risk_relative", "x_reaction_time", "x_pulse", "switch_action")
+    rows = [
+        tuple(np.nan if r.get(c) is None else (PHASE_CODES.get(r[c], -1) if c == "phase" else r[c])
+              for c in columns)
+        for r in responses
+    ]
+    arrays = np.array(rows, dtype=np.float64).reshape(-1, len(columns)).T
+    q_id, phase = arrays[0].astype(np.int64), arrays[1].astype(np.int64)
+    features, _, _ = session_features(np.zeros(len(rows), dtype=np.int64), 1, q_id, phase, *arrays[2:])
+    return features[0]
+
+
+def iter_response_arrays(conn, chunk_rows: int = CHUNK_ROWS):
+    """Stream ``responses`` in id order as flat arrays, one tuple per chunk.
+
+    Yields (profile ids, group, q_id, phase code, risk, reaction time, pulse,
+    switch), where ``group`` is every row's index into the profile ids.
+
+    A profile's responses are inserted in one transaction, so they are
+    contiguous in id order; the last profile of a chunk is held back until
+    the next one, so every chunk holds complete sessions.
+    """
+    last_id, carry = 0, np.empty((0, 8))
+    while True:
+        cur = conn.cursor()
+        cur.row_factory = None   # plain tuples convert to an array much faster
+        rows = cur.execute(_RESPONSE_SELECT, (last_id, chunk_rows)).fetchall()
+        data = np.concatenate([carry, np.array(rows, dtype=np.float64).reshape(-1, 8)])
+        del rows
+        if len(data) == len(carry):
+            break
+        last_id = int(data[-1, 0])
+        others = np.flatnonzero(data[:, 1] != data[-1, 1])
+        cut = others[-1] + 1 if len(others) else 0
+        data, carry = data[:cut], data[cut:]
+        if len(data):
+            yield _arrays(data)
+    if len(carry):
+        yield _arrays(carry)
+
+
+def _arrays(data):
+    ids, group = np.unique(data[:, 1].astype(np.int64), return_inverse=True)
+    return (ids, group, data[:, 2].astype(np.int64), data[:, 3].astype(np.int64), *data[:, 4:].T)
+
+
+def iter_feature_chunks(conn, chunk_rows: int = CHUNK_ROWS):
+    """(profile ids, features, labels) per chunk, only profiles that answered a label question."""
+    for ids, group, *columns in iter_response_arrays(conn, chunk_rows):
+        features, labels, has_label = session_features(group, len(ids), *columns)
+        yield ids[has_label], features[has_label], labels[has_label]
+
+
+# ---------------------------------------------------------
+# Training
+# ---------------------------------------------------------
+def _sigmoid(z):
+    return 1.0 / (1.0 + np.exp(-np.clip(z, -30, 30)))
+
+
+def fit_logistic(x, y, l2: float = L2, max_iterations: int = MAX_ITERATIONS, tol: float = 1e-8):
+    """(coefficients, intercept) by Newton's method; the intercept is not penalized."""
+    x1 = np.column_stack([x, np.ones(len(x))])
+    penalty = np.full(x1.shape[1], l2)
+    penalty[-1] = 0.0
+    w = np.zeros(x1.shape[1])
+    for _ in range(max_iterations):
+        p = _sigmoid(x1 @ w)
+        grad = x1.T @ (p - y) + penalty * w
+        hess = (x1 * (p * (1 - p))[:, None]).T @ x1 + np.diag(penalty)
+        step = np.linalg.solve(hess, grad)
+        w -= step
+        if np.abs(step).max() < tol:
+            break
+    return w[:-1], float(w[-1])
+
+
+def auc(y, p) -> float:
+    """Area under the ROC curve (Mann-Whitney, ties averaged)."""
+    order = np.argsort(p, kind="stable")
+    ranks = np.empty(len(p))
+    ranks[order] = np.arange(1, len(p) + 1)
+    _, inverse, counts = np.unique(p, return_inverse=True, return_counts=True)
+    if len(counts) < len(p):   # average ranks of tied predictions
+        ranks = (np.bincount(inverse, ranks) / counts)[inverse]
+    pos = y.sum()
+    neg = len(y) - pos
+    if not pos or not neg:
+        return float("nan")
+    return float((ranks[y].sum() - pos * (pos + 1) / 2) / (pos * neg))
+
+
+def train(conn, chunk_rows: int = CHUNK_ROWS, holdout_every: int = HOLDOUT_EVERY, l2: float = L2):
+    """Fit the model on all stored sessions; None with too few profiles or only one class."""
+    parts = list(iter_feature_chunks(conn, chunk_rows))
+    if not parts:
+        return None
+    ids = np.concatenate([p[0] for p in parts])
+    x = np.concatenate([p[1] for p in parts])
+    y = np.concatenate([p[2] for p in parts])
+    del parts
+    test = ids % holdout_every == 0
+    if len(y) < MIN_PROFILES or y[~test].all() or not y[~test].any():
+        return None
+
+    mean = np.nanmean(x[~test], axis=0)
+    scale = np.nanstd(x[~test], axis=0)
+    mean, scale = np.nan_to_num(mean), np.where(scale > 0, np.nan_to_num(scale, nan=1.0), 1.0)
+    z = np.nan_to_num((x - mean) / scale)   # missing features sit at the mean
+    coef, intercept = fit_logistic(z[~test], y[~test], l2)
+
+    p = _sigmoid(z[test] @ coef + intercept)
+    eps = 1e-12
+    log_loss = -np.mean(np.where(y[test], np.log(p + eps), np.log(1 - p + eps))) if test.any() else float("nan")
+    return {
+        "format": MODEL_FORMAT,
+        "features": FEATURE_NAMES,
+        "panic_questions": list(PANIC_QUESTIONS),
+        "trained_at": time.time(),
+        "profiles": int(len(y)),
+        "high_water": int(ids[-1]),
+        "base_rate": float(y.mean()),
+        "mean": mean.tolist(),
+        "scale": scale.tolist(),
+        "coef": coef.tolist(),
+        "intercept": intercept,
+        "holdout": {
+            "profiles": int(test.sum()),
+            "auc": auc(y[test], p) if test.any() else float("nan"),
+            "log_loss": float(log_loss),
+        },
+    }
+
+
+def save_model(model: dict, path):
+    """Atomically replace ``path`` with the model (running apps never read half a file)."""
+    path = Path(path)
+    tmp = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    tmp.write_text(json.dumps(model, indent=1), encoding="utf-8")
+    os.replace(tmp, path)
+
+
+# ---------------------------------------------------------
+# Inference
+# ---------------------------------------------------------
+class PanicModel:
+    """Fitted coefficients; ``predict`` scores one session's responses."""
+
+    def __init__(self, model: dict):
+        self.trained_at = model["trained_at"]
+        self.profiles = model["profiles"]
+        self.base_rate = model["base_rate"]
+        self.holdout = model["holdout"]
+        self.mean = np.array(model["mean"])
+        self.scale = np.array(model["scale"])
+        self.coef = np.array(model["coef"])
+        self.intercept = model["intercept"]
+
+    @classmethod
+    def load(cls, path):
+        """The model stored at ``path``, or None if there is none (yet) or it does not fit this code."""
+        try:
+            model = json.loads(Path(path).read_text(encoding="utf-8"))
+        except FileNotFoundError:
+            return None
+        if model.get("format") != MODEL_FORMAT or model.get("features") != FEATURE_NAMES:
+            log.warning("panic model %s was trained on other features; retrain", path)
+            return None
+        try:
+            return cls(model)
+        except KeyError as e:
+            log.warning("panic model %s lacks %s; retrain", path, e)
+            return None
+
+    def predict(self, responses) -> dict:
+        """Panic probability of a session plus the features raising it most, strongest first."""
+        z = np.nan_to_num((response_features(responses) - self.mean) / self.scale)
+        contributions = self.coef * z
+        probability = float(_sigmoid(contributions.sum() + self.intercept))
+        drivers = [
+            FEATURES[i][1 if z[i] > 0 else 2]
+            for i in np.argsort(-contributions, kind="stable")
+            if contributions[i] >= DRIVER_MIN_LOGIT
+        ][:2]
+        return {"probability": probability, "base_rate": self.base_rate, "drivers": drivers}
+
+
+def main(argv=None):
+    from neurorisk.db import DEFAULT_DB_FILE, ConnectionManager
+
+    parser = argparse.ArgumentParser(description="Train the panic-probability model and write its coefficient file.")
+    parser.add_argument("--db", default=str(DEFAULT_DB_FILE))
+    parser.add_argument("--out", help="coefficient file (default: the DB path with suffix .panic.json)")
+    parser.add_argument("--chunk-rows", type=int, default=CHUNK_ROWS)
+    args = parser.parse_args(argv)
+
+    out = Path(args.out or Path(args.db).with_suffix(".panic.json"))
+    db = ConnectionManager(args.db)
+    start = time.perf_counter()
+    with db.connection() as conn:
+        model = train(conn, args.chunk_rows)
+    if model is None:
+        sys.exit(f"need at least {MIN_PROFILES} profiles with both outcomes to train")
+    save_model(model, out)
+    holdout = model["holdout"]
+    print(f"trained on {model['profiles']} profiles in {time.perf_counter() - start:.2f}s "
+          f"(panic rate {model['base_rate']:.1%}), holdout AUC {holdout['auc']:.3f} "
+          f"log loss {holdout['log_loss']:.3f} → {out}", file=sys.stderr)
+    for name, coef in zip(FEATURE_NAMES, model["coef"]):
+        print(f"  {name:<16} {coef:+.3f}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,653 @@
+"""Peer-comparison data kept in memory and refreshed incrementally.
+
+The profiles table is append-only, so a PeerStore loads it once and afterwards
+only pulls rows above its high-water mark on ``profiles.id``. Profiles are held
+column-wise in NumPy arrays (categorical codes for gender/goal/region, one float
+column per score) so filters become boolean masks and aggregates single
+vectorized reductions.
+"""
+import threading
+
+import numpy as np
+
+PHASES = ["calm", "boom", "crisis"]
+
+# Float columns compared in section 9, with the fallback used when a profile lacks them
+SCORE_DEFAULTS = {"RCS": 50.0, "SSS": 50.0, "RGS": 50.0, "AdvisorNeedScore": 50.0}
+PHASE_METRICS = [f"risk_{p}" for p in PHASES] + [f"stress_{p}" for p in PHASES]
+METRICS = list(SCORE_DEFAULTS) + PHASE_METRICS
+METRIC_INDEX = {m: i for i, m in enumerate(METRICS)}
+
+
+class Categories:
+    """Maps categorical values (gender, goal, ...) to small integer codes."""
+
+    def __init__(self):
+        self.values = []
+        self._codes = {}
+
+    def encode(self, value) -> int:
+        code = self._codes.get(value)
+        if code is None:
+            code = len(self.values)
+            self._codes[value] = code
+            self.values.append(value)
+        return code
+
+    def codes_for(self, values) -> list:
+        """Codes of the given values; values never seen are simply skipped."""
+        return [self._codes[v] for v in values if v in self._codes]
+
+    def frozen(self) -> "FrozenCategories":
+        """The codes assigned so far; values encoded later do not show up in it."""
+        return FrozenCategories(self._codes, len(self.values))
+
+
+class FrozenCategories:
+    """Read-only prefix of an (append-only) Categories, for snapshots."""
+
+    def __init__(self, codes: dict, size: int):
+        self._codes = codes
+        self.size = size
+
+    def codes_for(self, values) -> list:
+        codes = (self._codes.get(v) for v in values)
+        return [c for c in codes if c is not None and c < self.size]
+
+
+# Typed profiles columns read for peer comparisons (see neurorisk.schema)
+PEER_SELECT = (
+    "age, gender, goal, rcs, sss, rgs, ans, "
+    "risk_calm, risk_boom, risk_crisis, stress_calm, stress_boom, stress_crisis"
+)
+
+
+def row_from_columns(r) -> dict:
+    """Flatten a profiles row selected with PEER_SELECT into PeerTable column values.
+
+    Also accepts the dict returned by neurorisk.schema.profile_columns.
+    """
+    values = []
+    for col, default in zip(("rcs", "sss", "rgs", "ans"), SCORE_DEFAULTS.values()):
+        values.append(r[col] if r[col] is not None else default)
+    for col in PHASE_METRICS:
+        values.append(r[col] if r[col] is not None else np.nan)
+    return {
+        "age": r["age"] if r["age"] is not None else 0,
+        "gender": r["gender"],
+        "goal": r["goal"],
+        "region": None,
+        "values": values,
+    }
+
+
+def isin_codes(column, codes):
+    """np.isin for a handful of codes – OR of equality masks is much faster here."""
+    mask = np.zeros(len(column), dtype=bool)
+    for code in codes:
+        mask |= column == code
+    return mask
+
+
+class PeerTable:
+    """Growable columnar table of profiles (amortized doubling on append).
+
+    Not thread-safe for writers; appends must be serialized (see PeerStore).
+    A view taken under the same lock stays valid while later appends run:
+    rows below its n are never rewritten, and growing swaps in new arrays only
+    after the old rows were copied into them.
+    """
+
+    # 1-D columns; ``values``/``present`` are (metric × row) matrices
+    COLUMNS = ("id", "age", "gender", "goal", "region", "user")
+
+    def __init__(self, capacity: int = 1024):
+        self.n = 0
+        self.genders = Categories()
+        self.goals = Categories()
+        self.regions = Categories()
+        self.users = Categories()
+        self.capacity = capacity
+        (self.id, self.age, self.gender, self.goal, self.region, self.user,
+         self.values, self.present) = self._alloc(capacity)
+
+    @staticmethod
+    def _alloc(capacity):
+        return (
+            np.zeros(capacity, dtype=np.int64),     # id
+            np.zeros(capacity, dtype=np.int32),     # age
+            np.zeros(capacity, dtype=np.int16),     # gender
+            np.zeros(capacity, dtype=np.int16),     # goal
+            np.zeros(capacity, dtype=np.int16),     # region
+            np.zeros(capacity, dtype=np.int32),     # user
+            # one row per metric; missing values are stored as 0 with present=0, so
+            # masked sums and counts are both a single matrix-vector product
+            np.zeros((len(METRICS), capacity), dtype=np.float64),
+            np.zeros((len(METRICS), capacity), dtype=np.float32),
+        )
+
+    def _grow(self, needed):
+        capacity = self.capacity
+        while capacity < needed:
+            capacity *= 2
+        n = self.n
+        old = (self.id, self.age, self.gender, self.goal, self.region, self.user, self.values, self.present)
+        new = self._alloc(capacity)
+        for arr, prev in zip(new, old):
+            arr[..., :n] = prev[..., :n]
+        # Only complete copies become visible; views keep the arrays they captured
+        (self.id, self.age, self.gender, self.goal, self.region, self.user,
+         self.values, self.present) = new
+        self.capacity = capacity
+
+    def append(self, ids, usernames, rows):
+        """Append profiles; ``rows`` are dicts as returned by row_from_columns."""
+        k = len(rows)
+        if not k:
+            return
+        if self.n + k > self.capacity:
+            self._grow(self.n + k)
+        sl = slice(self.n, self.n + k)
+        self.id[sl] = ids
+        self.user[sl] = [self.users.encode(u) for u in usernames]
+        self.age[sl] = [int(r["age"] or 0) for r in rows]
+        self.gender[sl] = [self.genders.encode(r["gender"]) for r in rows]
+        self.goal[sl] = [self.goals.encode(r["goal"]) for r in rows]
+        self.region[sl] = [self.regions.encode(r["region"]) for r in rows]
+        vals = np.array([r["values"] for r in rows], dtype=np.float64).T
+        present = ~np.isnan(vals)
+        self.values[:, sl] = np.where(present, vals, 0.0)
+        self.present[:, sl] = present
+        self.n += k
+
+    def view(self, mask=None) -> "PeerView":
+        """Snapshot of the first n rows; later appends never change it."""
+        n = self.n
+        columns = {name: getattr(self, name)[:n] for name in self.COLUMNS}
+        columns["values"] = self.values[:, :n]
+        columns["present"] = self.present[:, :n]
+        categories = {
+            "gender": self.genders.frozen(),
+            "goal": self.goals.frozen(),
+            "region": self.regions.frozen(),
+            "user": self.users.frozen(),
+        }
+        return PeerView(columns, categories, n, mask)
+
+
+class PeerView:
+    """Read-only slice of a PeerTable plus an optional row mask.
+
+    Holds the column arrays and category codes captured when the view was
+    taken, never the table itself.
+    """
+
+    def __init__(self, columns: dict, categories: dict, n: int, mask=None):
+        self.columns = columns
+        self.categories = categories
+        self.n = n
+        self.mask = mask
+
+    def __len__(self):
+        if self.mask is None:
+            return self.n
+        return int(np.count_nonzero(self.mask))
+
+    def column(self, name):
+        return self.columns[name]
+
+    def _combine(self, mask):
+        if self.mask is None:
+            return mask
+        return self.mask & mask
+
+    def _with_mask(self, mask) -> "PeerView":
+        return PeerView(self.columns, self.categories, self.n, mask)
+
+    def without_profile(self, profile_id) -> "PeerView":
+        ids = self.column("id")
+        i = int(np.searchsorted(ids, profile_id))
+        if i >= self.n or ids[i] != profile_id:
+            return self
+        mask = np.ones(self.n, dtype=bool)
+        mask[i] = False
+        return self._with_mask(self._combine(mask))
+
+    def without_user(self, username) -> "PeerView":
+        # Same semantics as "username != ?" in SQL (NULL never matches)
+        mask = ~isin_codes(self.column("user"), self.categories["user"].codes_for([username, None]))
+        return self._with_mask(self._combine(mask))
+
+    def filter(self, age_buckets=None, goals=None, genders=None, regions=None) -> "PeerView":
+        mask = np.ones(self.n, dtype=bool) if self.mask is None else self.mask.copy()
+        if age_buckets:
+            age = self.column("age")
+            in_bucket = np.zeros(self.n, dtype=bool)
+            for a, b in age_buckets:
+                in_bucket |= (age >= a) & (age <= b)
+            mask &= in_bucket
+        for values, name in ((goals, "goal"), (genders, "gender"), (regions, "region")):
+            if values:
+                mask &= isin_codes(self.column(name), self.categories[name].codes_for(values))
+        return self._with_mask(mask)
+
+    def aggregate(self):
+        """Per-metric (sum, count) over the selected rows as two arrays."""
+        values = self.columns["values"]
+        present = self.columns["present"]
+        if self.mask is None:
+            return values.sum(axis=1), present.sum(axis=1, dtype=np.float64)
+        weights = self.mask.astype(np.float64)
+        return values @ weights, present @ weights.astype(np.float32)
+
+    def sketch(self) -> "QuantileSketch":
+        """Quantile sketch of the selected rows, binned like the peer cube's."""
+        values = self.columns["values"]
+        present = self.columns["present"].astype(bool)
+        if self.mask is not None:
+            values, present = values[:, self.mask], present[:, self.mask]
+        bins = sketch_bins(np.where(present, values, np.nan))
+        return QuantileSketch(np.stack([
+            np.bincount(b[b >= 0], minlength=SKETCH_BINS) for b in bins
+        ]))
+
+
+def peer_generation(conn) -> int:
+    """Bumped whenever stored scores are rewritten (see neurorisk.rescore)."""
+    row = conn.execute("SELECT value FROM counters WHERE name = 'peer_generation'").fetchone()
+    return row[0] if row else 0
+
+
+def bump_peer_generation(conn):
+    conn.execute(
+        "INSERT INTO counters (name, value) VALUES ('peer_generation', 1) "
+        "ON CONFLICT (name) DO UPDATE SET value = value + 1"
+    )
+
+
+class PeerStore:
+    """Process-wide columnar cache of all stored profiles.
+
+    Rows are only appended; if stored scores were rewritten (the peer
+    generation changed) the next refresh reloads everything.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.table = PeerTable()
+        self.high_water = 0    # largest profiles.id seen so far
+        self.generation = 0
+
+    def refresh(self, conn) -> int:
+        """Append profiles inserted since the last refresh; returns the number of new rows."""
+        with self._lock:
+            generation = peer_generation(conn)
+            if generation != self.generation:
+                # Existing snapshots keep the old table; new ones see the reload
+                self.table = PeerTable()
+                self.high_water = 0
+                self.generation = generation
+            rows = conn.execute(
+                f"SELECT id, username, {PEER_SELECT} FROM profiles WHERE id > ? ORDER BY id",
+                (self.high_water,),
+            ).fetchall()
+            if not rows:
+                return 0
+            self.high_water = rows[-1]["id"]
+            self.table.append(
+                [r["id"] for r in rows],
+                [r["username"] for r in rows],
+                [row_from_columns(r) for r in rows],
+            )
+            return len(rows)
+
+    def snapshot(self, exclude_profile_id=None, exclude_username=None) -> PeerView:
+        """All cached profiles, optionally without one profile id or one user."""
+        with self._lock:
+            view = self.table.view()
+        if exclude_profile_id:
+            return view.without_profile(exclude_profile_id)
+        if exclude_username:
+            return view.without_user(exclude_username)
+        return view
+
+    def __len__(self):
+        return self.table.n
+
+
+# ---------------------------------------------------------
+# Pre-aggregated peer cube (age class × gender × goal)
+# ---------------------------------------------------------
+# Age classes are disjoint and line up with the section-9 buckets; 65 is its
+# own class because the "56-65" and "65+" buckets overlap on it.
+AGE_CLASSES = [
+    ("18-25", 18, 25),
+    ("26-35", 26, 35),
+    ("36-45", 36, 45),
+    ("46-55", 46, 55),
+    ("56-64", 56, 64),
+    ("65", 65, 65),
+    ("66+", 66, 120),
+]
+AGE_OTHER = "other"
+
+# SQL column stem per metric
+METRIC_COLUMNS = {
+    "RCS": "rcs", "SSS": "sss", "RGS": "rgs", "AdvisorNeedScore": "ans",
+    **{m: m for m in PHASE_METRICS},
+}
+_STAT_COLUMNS = ["n"] + [
+    f"{stat}_{METRIC_COLUMNS[m]}" for m in METRICS for stat in ("cnt", "sum", "sq")
+]
+
+
+def age_class(age) -> str:
+    try:
+        age = int(age)
+    except (TypeError, ValueError):
+        return AGE_OTHER
+    for name, lo, hi in AGE_CLASSES:
+        if lo <= age <= hi:
+            return name
+    return AGE_OTHER
+
+
+def cube_key(row: dict) -> tuple:
+    """Cell key of a flattened profile (see row_from_columns)."""
+    return (age_class(row["age"]), row["gender"] or "", row["goal"] or "")
+
+
+def cube_stats(row: dict) -> list:
+    """Contribution of one flattened profile to its cell, in _STAT_COLUMNS order."""
+    out = [1.0]
+    for val in row["values"]:
+        if val is None or np.isnan(val):
+            out += [0.0, 0.0, 0.0]
+        else:
+            out += [1.0, val, val * val]
+    return out
+
+
+def _cube_columns(conn) -> set:
+    return {r[1] for r in conn.execute("PRAGMA table_info(peer_cube)")}
+
+
+def init_cube(conn):
+    """Create the peer_cube table (or add its sketches) and backfill it from existing profiles once."""
+    if "sketch" in _cube_columns(conn):
+        return
+    # Create + backfill atomically so no concurrent insert is counted twice
+    if not conn.in_transaction:
+        conn.execute("BEGIN IMMEDIATE")
+    columns = _cube_columns(conn)
+    if "sketch" in columns:
+        return
+    if columns:
+        # Cube from before the sketches: only they need the backfill
+        conn.execute("ALTER TABLE peer_cube ADD COLUMN sketch BLOB")
+        add = _add_to_sketches
+    else:
+        stat_cols = ", ".join(f"{c} REAL NOT NULL DEFAULT 0" for c in _STAT_COLUMNS)
+        conn.execute(
+            "CREATE TABLE peer_cube (age_class TEXT NOT NULL, gender TEXT NOT NULL, goal TEXT NOT NULL, "
+            f"{stat_cols}, sketch BLOB, PRIMARY KEY (age_class, gender, goal))"
+        )
+        add = add_to_cube
+    cursor = conn.execute(f"SELECT {PEER_SELECT} FROM profiles")
+    while True:
+        rows = cursor.fetchmany(50_000)
+        if not rows:
+            return
+        add(conn, [row_from_columns(r) for r in rows])
+
+
+def add_to_cube(conn, rows, sign: int = 1):
+    """Add flattened profiles to their cells (runs inside the caller's transaction).
+
+    ``sign=-1`` removes them again, e.g. the old values of re-scored profiles.
+    """
+    rows = list(rows)
+    deltas = {}
+    for row in rows:
+        stats = cube_stats(row)
+        if sign != 1:
+            stats = [sign * v for v in stats]
+        key = cube_key(row)
+        if key in deltas:
+            deltas[key] = [a + b for a, b in zip(deltas[key], stats)]
+        else:
+            deltas[key] = stats
+    if not deltas:
+        return
+    cols = ", ".join(_STAT_COLUMNS)
+    marks = ", ".join("?" * len(_STAT_COLUMNS))
+    updates = ", ".join(f"{c} = {c} + excluded.{c}" for c in _STAT_COLUMNS)
+    conn.executemany(
+        f"INSERT INTO peer_cube (age_class, gender, goal, {cols}) VALUES (?, ?, ?, {marks}) "
+        f"ON CONFLICT (age_class, gender, goal) DO UPDATE SET {updates}",
+        [key + tuple(stats) for key, stats in deltas.items()],
+    )
+    _add_to_sketches(conn, rows, sign)
+
+
+def _add_to_sketches(conn, rows, sign: int = 1):
+    """Read-modify-write the sketch blob of every touched cell (cells already exist)."""
+    for key, delta in sketch_deltas(rows, sign).items():
+        blob = conn.execute(
+            "SELECT sketch FROM peer_cube WHERE age_class = ? AND gender = ? AND goal = ?", key
+        ).fetchone()[0]
+        conn.execute(
+            "UPDATE peer_cube SET sketch = ? WHERE age_class = ? AND gender = ? AND goal = ?",
+            (pack_sketch(unpack_sketch(blob) + delta),) + key,
+        )
+
+
+class PeerCube:
+    """In-memory copy of peer_cube; supports the PeerView filter/aggregate interface.
+
+    Every filter combination is a sum over at most a few dozen cells, so the
+    cost does not depend on how many profiles exist.
+    """
+
+    def __init__(self, keys, stats, sketches):
+        self.keys = keys                    # [(age_class, gender, goal), ...]
+        self.stats = stats                  # cells × _STAT_COLUMNS
+        self.sketches = sketches            # cells × metrics × SKETCH_BINS
+        self.mask = np.ones(len(keys), dtype=bool)
+
+    @classmethod
+    def load(cls, conn, exclude_profile_id=None) -> "PeerCube":
+        rows = conn.execute(
+            f"SELECT age_class, gender, goal, {', '.join(_STAT_COLUMNS)}, sketch FROM peer_cube"
+        ).fetchall()
+        keys = [tuple(r[:3]) for r in rows]
+        stats = np.array([tuple(r[3:-1]) for r in rows], dtype=np.float64).reshape(len(rows), len(_STAT_COLUMNS))
+        sketches = np.array([unpack_sketch(r[-1]) for r in rows], dtype=np.int64)
+        cube = cls(keys, stats, sketches.reshape(len(rows), len(METRICS), SKETCH_BINS))
+        if exclude_profile_id:
+            own = conn.execute(
+                f"SELECT {PEER_SELECT} FROM profiles WHERE id = ?", (exclude_profile_id,)
+            ).fetchone()
+            if own:
+                cube._subtract(row_from_columns(own))
+        return cube
+
+    def _subtract(self, row):
+        key = cube_key(row)
+        if key in self.keys:
+            i = self.keys.index(key)
+            self.stats[i] -= np.array(cube_stats(row))
+            self.sketches[i] -= sketch_deltas([row])[key]
+
+    def __len__(self):
+        return int(self.stats[self.mask, 0].sum())
+
+    def filter(self, age_buckets=None, goals=None, genders=None, regions=None) -> "PeerCube":
+        if regions:
+            raise ValueError("peer_cube has no region dimension – use PeerStore for region filters")
+        classes = None
+        if age_buckets:
+            classes = {
+                name for name, lo, hi in AGE_CLASSES
+                if any(a <= lo and hi <= b for a, b in age_buckets)
+            }
+        mask = self.mask.copy()
+        for i, (age, gender, goal) in enumerate(self.keys):
+            if classes is not None and age not in classes:
+                mask[i] = False
+            elif goals and goal not in goals:
+                mask[i] = False
+            elif genders and gender not in genders:
+                mask[i] = False
+        out = PeerCube(self.keys, self.stats, self.sketches)
+        out.mask = mask
+        return out
+
+    def aggregate(self):
+        """Per-metric (sum, count) over the selected cells, like PeerView.aggregate."""
+        total = self.stats[self.mask].sum(axis=0)
+        counts = total[1::3]
+        sums = total[2::3]
+        return sums, counts
+
+    def sum_of_squares(self):
+        """Per-metric sum of squares over the selected cells (for variances)."""
+        return self.stats[self.mask].sum(axis=0)[3::3]
+
+    def sketch(self) -> "QuantileSketch":
+        """Merged quantile sketch of the selected cells."""
+        return QuantileSketch(self.sketches[self.mask].sum(axis=0))
+
+
+# ---------------------------------------------------------
+# Quantile sketches per cube cell
+# ---------------------------------------------------------
+# Each cell keeps, per metric, counts over SKETCH_BINS equal-width bins of a
+# fixed range (values outside land in the edge bins). Unlike KLL or t-digest,
+# such counts can be subtracted as well as merged, which the cube needs for
+# re-scoring and for leaving out your own profile. Quantiles interpolate
+# inside a bin, so the error stays below one bin width (1% of the range).
+SKETCH_BINS = 100
+SKETCH_RANGES = {
+    **{m: (0.0, 100.0) for m in SCORE_DEFAULTS},
+    **{f"risk_{p}": (0.0, 1.0) for p in PHASES},
+    **{f"stress_{p}": (-4.0, 4.0) for p in PHASES},   # z-scores
+}
+_SKETCH_LOW = np.array([SKETCH_RANGES[m][0] for m in METRICS])
+_SKETCH_WIDTH = np.array([(SKETCH_RANGES[m][1] - SKETCH_RANGES[m][0]) / SKETCH_BINS for m in METRICS])
+
+
+def sketch_bins(values):
+    """Bin index per value of a metrics × rows array; -1 where the value is missing."""
+    pos = np.floor((values - _SKETCH_LOW[:, None]) / _SKETCH_WIDTH[:, None])
+    bins = np.clip(pos, 0, SKETCH_BINS - 1)
+    return np.where(np.isnan(values), -1, bins).astype(np.int64)
+
+
+def sketch_deltas(rows, sign: int = 1) -> dict:
+    """{cell key: metrics × SKETCH_BINS counts} of flattened profiles."""
+    codes, cells, values = {}, [], []
+    for row in rows:
+        cells.append(codes.setdefault(cube_key(row), len(codes)))
+        values.append(row["values"])
+    if not cells:
+        return {}
+    bins = sketch_bins(np.array(values, dtype=np.float64).T)
+    cells = np.asarray(cells) * SKETCH_BINS
+    counts = np.empty((len(codes), len(METRICS), SKETCH_BINS), dtype=np.int64)
+    for i, b in enumerate(bins):
+        ok = b >= 0
+        counts[:, i, :] = np.bincount(cells[ok] + b[ok], minlength=len(codes) * SKETCH_BINS).reshape(-1, SKETCH_BINS)
+    if sign != 1:
+        counts *= sign
+    return {key: counts[code] for key, code in codes.items()}
+
+
+def pack_sketch(counts) -> bytes:
+    return np.asarray(counts, dtype="<i4").tobytes()
+
+
+def unpack_sketch(blob):
+    """metrics × SKETCH_BINS int64 counts; zeros for a cell without a sketch yet."""
+    if blob is None:
+        return np.zeros((len(METRICS), SKETCH_BINS), dtype=np.int64)
+    return np.frombuffer(blob, dtype="<i4").astype(np.int64).reshape(len(METRICS), SKETCH_BINS)
+
+
+class QuantileSketch:
+    """Merged per-metric bin counts of a comparison group."""
+
+    def __init__(self, counts):
+        self.counts = counts                # metrics × SKETCH_BINS
+
+    def quantile(self, metric: str, q: float):
+        """Estimated q-quantile of the group; None without values."""
+        i = METRIC_INDEX[metric]
+        counts = self.counts[i]
+        total = counts.sum()
+        if total <= 0:
+            return None
+        cumulative = np.cumsum(counts)
+        rank = q * total
+        b = min(int(np.searchsorted(cumulative, rank)), SKETCH_BINS - 1)
+        inside = (rank - (cumulative[b] - counts[b])) / counts[b] if counts[b] > 0 else 0.0
+        return float(_SKETCH_LOW[i] + (b + inside) * _SKETCH_WIDTH[i])
+
+    def rank(self, metric: str, value):
+        """Share of the group (0-100) below ``value``; None without values."""
+        i = METRIC_INDEX[metric]
+        counts = self.counts[i]
+        total = counts.sum()
+        if total <= 0 or value is None or np.isnan(value):
+            return None
+        pos = min(max((value - _SKETCH_LOW[i]) / _SKETCH_WIDTH[i], 0.0), float(SKETCH_BINS))
+        b = min(int(pos), SKETCH_BINS - 1)
+        below = counts[:b].sum() + counts[b] * (pos - b)
+        return float(100 * below / total)
+
+
+def filter_peer_data(all_data, age_buckets=None, goals=None, genders=None, regions=None):
+    """Filter peer data by criteria (multiple selection supported)."""
+    if not all_data:
+        return None
+    return all_data.filter(age_buckets, goals, genders, regions)
+
+
+def calculate_aggregate_scores(filtered_data):
+    """Calculate average values and phase averages for comparison group."""
+    if not filtered_data:
+        return None
+
+    sums, counts = filtered_data.aggregate()
+
+    def avg(metric, default=0.0):
+        i = METRIC_INDEX[metric]
+        return float(sums[i] / counts[i]) if counts[i] else default
+
+    return {
+        "count": len(filtered_data),
+        "rcs_avg": avg("RCS", 50),
+        "SSS_avg": avg("SSS", 50),
+        "rgs_avg": avg("RGS", 50),
+        "ans_avg": avg("AdvisorNeedScore", 50),
+        "risk_by_phase": {ph: avg(f"risk_{ph}", 0.5) for ph in PHASES},
+        "stress_by_phase": {ph: avg(f"stress_{ph}", 0.0) for ph in PHASES},
+    }
+
+
+def calculate_percentiles(filtered_data, own_values: dict):
+    """Percentile rank of your value and the group's p10/p50/p90 per metric.
+
+    ``own_values`` maps METRICS names to your values; metrics the group has no
+    values for are left out.
+    """
+    if not filtered_data:
+        return None
+    sketch = filtered_data.sketch()
+    out = {}
+    for metric in METRICS:
+        p10, p50, p90 = (sketch.quantile(metric, q) for q in (0.1, 0.5, 0.9))
+        if p50 is None:
+            continue
+        out[metric] = {"rank": sketch.rank(metric, own_values.get(metric)), "p10": p10, "p50": p50, "p90": p90}
+    return out
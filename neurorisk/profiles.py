@@ -0,0 +1,162 @@
+"""Profile persistence: one routine for user and guest saves, plus bulk ingest.
+
+A profile row and its responses are written in one explicit transaction with
+``executemany``. ``save_profiles_bulk`` runs the same code over many sessions
+per transaction, e.g. to ingest completed sessions exported by another branch
+office::
+
+    python -m neurorisk.profiles sessions.jsonl --db neurorisk.db
+"""
+import argparse
+import json
+import sys
+import time
+
+from neurorisk.peers import add_to_cube, row_from_columns
+from neurorisk.questions import response_metadata
+from neurorisk.schema import PROFILE_COLUMN_NAMES, profile_columns
+from neurorisk.scoring import SCORE_VERSION
+
+RESPONSE_COLUMNS = [
+    "q_id", "phase", "selected_label", "mu", "sigma", "x_risk_relative",
+    "x_reaction_time", "x_pulse", "advisor_help_used", "switch_action",
+    "client_reaction_time", "server_reaction_time",
+]
+
+_PROFILE_INSERT = (
+    f"INSERT INTO profiles (id, username, demographics, scores, score_version, {', '.join(PROFILE_COLUMN_NAMES)}) "
+    f"VALUES ({', '.join('?' * (5 + len(PROFILE_COLUMN_NAMES)))})"
+)
+_RESPONSE_INSERT = (
+    f"INSERT INTO responses (profile_id, {', '.join(RESPONSE_COLUMNS)}) "
+    f"VALUES ({', '.join('?' * (1 + len(RESPONSE_COLUMNS)))})"
+)
+
+
+def stored_response(row) -> dict:
+    """Response dict as the app built it, from a ``responses`` row in RESPONSE_COLUMNS order.
+
+    Question metadata (``risk_relevant``, herding flags) is not stored with the
+    responses, so it is restored from the question catalogue before scoring.
+    """
+    resp = dict(zip(RESPONSE_COLUMNS, row))
+    resp.update(response_metadata(resp["q_id"], resp["selected_label"]))
+    return resp
+
+
+def clean_scores(scores: dict) -> dict:
+    """Make a compute_scores result JSON-serializable (pandas Series → dict)."""
+    scores_clean = {}
+    for key, val in scores.items():
+        if hasattr(val, 'to_dict'):  # pandas Series
+            scores_clean[key] = val.to_dict()
+        elif isinstance(val, (int, float)):
+            scores_clean[key] = float(val)
+        elif isinstance(val, str):
+            scores_clean[key] = val
+        elif isinstance(val, dict):  # already cleaned (journal replay, imports)
+            scores_clean[key] = val
+        else:
+            scores_clean[key] = str(val)
+    return scores_clean
+
+
+def insert_profiles(conn, sessions, score_version=SCORE_VERSION) -> list:
+    """Insert (username, demographics, responses, scores) tuples; returns the new profile ids.
+
+    ``score_version`` records which scoring code produced ``scores``: sessions
+    scored just now get ``SCORE_VERSION``, imported ones whatever their source
+    says, or None so that ``neurorisk.rescore`` recomputes them. A session may
+    carry its own version as a fifth element.
+
+    Opens an IMMEDIATE transaction if none is active; committing is left to the
+    caller (the ConnectionManager context does it on exit). Ids are assigned
+    explicitly while holding the write lock, so profiles and responses can both
+    go through executemany.
+    """
+    sessions = list(sessions)
+    if not sessions:
+        return []
+    if not conn.in_transaction:
+        conn.execute("BEGIN IMMEDIATE")
+
+    seq = conn.execute("SELECT seq FROM sqlite_sequence WHERE name = 'profiles'").fetchone()
+    max_id = conn.execute("SELECT MAX(id) FROM profiles").fetchone()[0]
+    next_id = max(seq[0] if seq else 0, max_id or 0) + 1
+
+    profile_rows, response_rows, cube_rows, ids = [], [], [], []
+    for offset, (username, demographics, responses, scores, *version) in enumerate(sessions):
+        profile_id = next_id + offset
+        version = version[0] if version else score_version
+        scores_clean = clean_scores(scores)
+        typed = profile_columns(demographics, scores_clean)
+        profile_rows.append(
+            (profile_id, username, json.dumps(demographics), json.dumps(scores_clean), version)
+            + tuple(typed[name] for name in PROFILE_COLUMN_NAMES)
+        )
+        response_rows.extend((profile_id, *map(resp.get, RESPONSE_COLUMNS)) for resp in responses)
+        cube_rows.append(row_from_columns(typed))
+        ids.append(profile_id)
+
+    conn.executemany(_PROFILE_INSERT, profile_rows)
+    conn.executemany(_RESPONSE_INSERT, response_rows)
+    add_to_cube(conn, cube_rows)
+    return ids
+
+
+def save_profile(conn, username, demographics: dict, responses: list, scores: dict) -> int:
+    """Save one profile + all responses; returns the new profile id."""
+    return insert_profiles(conn, [(username, demographics, responses, scores)])[0]
+
+
+def save_profiles_bulk(conn, sessions, batch_size: int = 1000, score_version=SCORE_VERSION) -> list:
+    """Ingest many sessions, committing once per ``batch_size`` sessions."""
+    ids, batch = [], []
+    for session in sessions:
+        batch.append(session)
+        if len(batch) >= batch_size:
+            ids += insert_profiles(conn, batch, score_version)
+            conn.commit()
+            batch = []
+    if batch:
+        ids += insert_profiles(conn, batch, score_version)
+        conn.commit()
+    return ids
+
+
+def _read_sessions(path):
+    """JSONL with {"username", "demographics", "responses", "scores"[, "score_version"]} per line.
+
+    Scores of unknown provenance are stored with a NULL version, so the next
+    rescore run recomputes them from the responses.
+    """
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                rec = json.loads(line)
+                yield (rec.get("username", ""), rec["demographics"], rec["responses"], rec["scores"],
+                       rec.get("score_version"))
+
+
+def main(argv=None):
+    from neurorisk.db import DEFAULT_DB_FILE, ConnectionManager
+    from neurorisk.schema import init_schema
+
+    parser = argparse.ArgumentParser(description="Bulk-import completed sessions into the profiles DB.")
+    parser.add_argument("sessions", help="JSONL file, one session per line")
+    parser.add_argument("--db", default=str(DEFAULT_DB_FILE))
+    parser.add_argument("--batch-size", type=int, default=1000)
+    args = parser.parse_args(argv)
+
+    db = ConnectionManager(args.db)
+    start = time.perf_counter()
+    with db.connection() as conn:
+        init_schema(conn)
+        ids = save_profiles_bulk(conn, _read_sessions(args.sessions), args.batch_size)
+    elapsed = time.perf_counter() - start
+    rate = len(ids) / elapsed if elapsed > 0 else float("inf")
+    print(f"imported {len(ids)} sessions in {elapsed:.2f}s ({rate:,.0f} sessions/s)", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,602 @@
+"""Scenario questions of the simulation, in the order they are asked.
+
+Each question has an ``id`` (stored as ``responses.q_id``), its market
+``phase``, the answer ``options`` with a ``risk_level`` of 1 (cautious) to 4
+(risk-seeking), and the bias metadata used by the scoring.
+
+The answer options of the demographics form live here as well, so tools that
+fabricate participants (``neurorisk.synthetic``) draw from the same choices.
+"""
+
+SCENARIO_QUESTIONS = [
+    # ---------------- CALM MARKET ----------------
+    {
+        "id": 1,
+        "phase": "calm",
+        "question": (
+            "It is a calm market environment. The economy is growing moderately and markets "
+            "fluctuate only slightly. You have a substantial amount of long-term capital to "
+            "invest. How would you allocate it today?"
+        ),
+        "options": [
+            {
+                "label": "Very defensive: mostly cash or savings accounts, only a small equity fund position",
+                "risk_level": 1,
+            },
+            {
+                "label": "Defensive-balanced: a mix of bonds and broad equity funds",
+                "risk_level": 2,
+            },
+            {
+                "label": "Balanced: a clearly higher equity share than bonds or cash",
+                "risk_level": 3,
+            },
+            {
+                "label": "Dynamic: almost fully invested in equities or equity funds",
+                "risk_level": 4,
+            },
+        ],
+        "bias_tag": None,
+        "herd_majority": None,
+        "risk_relevant": True,
+    },
+    {
+        "id": 2,
+        "phase": "calm",
+        "question": (
+            "You receive an unexpected bonus on top of your regular income. "
+            "This bonus is free capital that you could invest. How much of this bonus "
+            "would you invest in equities?"
+        ),
+        "options": [
+            {
+                "label": "Nothing – keep the entire bonus in cash",
+                "risk_level": 1,
+            },
+            {
+                "label": "Invest about 25% in equities, keep 75% safe",
+                "risk_level": 2,
+            },
+            {
+                "label": "Invest about 50% in equities, 50% safe",
+                "risk_level": 3,
+            },
+            {
+                "label": "Invest about 75% or more in equities, only a small cash reserve",
+                "risk_level": 4,
+            },
+        ],
+        "bias_tag": None,
+        "herd_majority": None,
+        "risk_relevant": True,
+    },
+    {
+        # Disposition Effect in gains – Q3 (Strings wichtig für compute_scores)
+        "id": 3,
+        "phase": "calm",
+        "question": (
+            "Imagine you invested a sum of money 12 months ago in a broadly diversified portfolio. "
+            "Today, your portfolio shows a moderate gain. You are generally satisfied with the result. "
+            "What do you do now?"
+        ),
+        "options": [
+            {
+                "label": "Sell everything and go completely to cash",
+                "risk_level": 1,
+            },
+            {
+                "label": "Take profits, sell a larger part of the portfolio",
+                "risk_level": 2,
+            },
+            {
+                "label": "Partial sale, leave part invested",
+                "risk_level": 3,
+            },
+            {
+                "label": "Leave everything invested and think long-term",
+                "risk_level": 4,
+            },
+        ],
+        "bias_tag": "disposition_gain",
+        "herd_majority": None,
+        "risk_relevant": True,
+    },
+    {
+        # Grundrisikoprofil in ruhiger Phase
+        "id": 4,
+        "phase": "calm",
+        "question": (
+            "You are planning a new long-term investment for general wealth building. "
+            "In a calm market environment like now, which description best matches the "
+            "risk level you would choose for this new investment?"
+        ),
+        "options": [
+            {
+                "label": "Very low risk – strong focus on capital preservation, minimal fluctuations",
+                "risk_level": 1,
+            },
+            {
+                "label": "Rather low risk – some fluctuation is acceptable, capital preservation is important",
+                "risk_level": 2,
+            },
+            {
+                "label": "Medium risk – balanced between return and fluctuation",
+                "risk_level": 3,
+            },
+            {
+                "label": "High risk – focus on long-term return, strong fluctuation is acceptable",
+                "risk_level": 4,
+            },
+        ],
+        "bias_tag": "gain_frame",
+        "herd_majority": None,
+        "risk_relevant": True,
+    },
+    {
+        # Herding in calm phase
+        "id": 5,
+        "phase": "calm",
+        "question": (
+            "A survey among investors with a similar profile to you shows that around 80% of them "
+            "currently hold a high equity share in their portfolios. You yourself hold a more "
+            "defensive allocation. How do you react?"
+        ),
+        "options": [
+            {
+                "label": "I stick with my defensive strategy and do not increase equities",
+                "risk_level": 1,
+            },
+            {
+                "label": "I increase my equity allocation slightly",
+                "risk_level": 2,
+            },
+            {
+                "label": "I increase my equity allocation significantly",
+                "risk_level": 3,
+            },
+            {
+                "label": "I adapt strongly and go very aggressively into equities to align with the majority",
+                "risk_level": 4,
+            },
+        ],
+        "bias_tag": "herding",
+        "herd_majority": "I adapt strongly and go very aggressively into equities to align with the majority",
+        "risk_relevant": True,  # Herding UND Risiko
+    },
+    {
+        "id": 6,
+        "phase": "calm",
+        "question": (
+            "You win a medium-sized lottery prize that is financially meaningful but not life-changing. "
+            "You decide to invest this amount separately from your existing portfolio. How would you "
+            "invest this lottery money?"
+        ),
+        "options": [
+            {
+                "label": "Keep it entirely in cash or a savings account",
+                "risk_level": 1,
+            },
+            {
+                "label": "Invest mainly in low-risk funds or bonds",
+                "risk_level": 2,
+            },
+            {
+                "label": "Invest mostly in diversified equity funds",
+                "risk_level": 3,
+            },
+            {
+                "label": "Treat it as 'play money' and invest mainly in riskier themes or individual stocks",
+                "risk_level": 4,
+            },
+        ],
+        "bias_tag": None,  # Mental Accounting / Riskverhalten
+        "herd_majority": None,
+        "risk_relevant": True,
+    },
+
+    # ---------------- BOOM MARKET ----------------
+    {
+        "id": 7,
+        "phase": "boom",
+        "question": (
+            "Stock markets have risen strongly for several years, many indices are at or near all-time highs. "
+            "You receive a new annual bonus that you do not need for current expenses. How do you invest "
+            "this new money in the current boom phase?"
+        ),
+        "options": [
+            {
+                "label": "I keep the new money in cash and do not invest it for now",
+                "risk_level": 1,
+            },
+            {
+                "label": "I invest it mainly in broadly diversified equity funds",
+                "risk_level": 2,
+            },
+            {
+                "label": "I focus on more volatile growth or sector funds with higher return potential",
+                "risk_level": 3,
+            },
+            {
+                "label": "I invest in very concentrated or speculative themes to maximize upside",
+                "risk_level": 4,
+            },
+        ],
+        "bias_tag": None,
+        "herd_majority": None,
+        "risk_relevant": True,
+    },
+    {
+        # Overconfidence candidate – persönliche Outperformance
+        "id": 8,
+        "phase": "boom",
+        "question": (
+            "Over the last three years, your portfolio has clearly outperformed the overall market. "
+            "You attribute this partly to your good decisions. You are now considering adjusting your "
+            "strategy. What do you do?"
+        ),
+        "options": [
+            {
+                "label": "I reduce risk significantly and secure a large part of the gains",
+                "risk_level": 1,
+            },
+            {
+                "label": "I take some profits and slightly reduce risk",
+                "risk_level": 2,
+            },
+            {
+                "label": "I keep my current risk level unchanged",
+                "risk_level": 3,
+            },
+            {
+                "label": "I increase risk because I trust my ability to make good decisions",
+                "risk_level": 4,
+            },
+        ],
+        "bias_tag": "overconfidence_candidate",
+        "herd_majority": None,
+        "risk_relevant": True,
+    },
+    {
+        # Growth style choice in boom
+        "id": 9,
+        "phase": "boom",
+        "question": (
+            "You are about to set up a new equity investment in the current booming market. "
+            "Which type of equity strategy would you choose?"
+        ),
+        "options": [
+            {
+                "label": "Mainly large, established companies with relatively stable earnings",
+                "risk_level": 1,
+            },
+            {
+                "label": "A mix of large companies and selected growth stocks",
+                "risk_level": 2,
+            },
+            {
+                "label": "Focus on growth companies with higher earnings volatility",
+                "risk_level": 3,
+            },
+            {
+                "label": "Strong focus on very young or highly speculative companies",
+                "risk_level": 4,
+            },
+        ],
+        "bias_tag": None,
+        "herd_majority": None,
+        "risk_relevant": True,
+    },
+    {
+        # Classic gain-frame lottery
+        "id": 10,
+        "phase": "boom",
+        "question": (
+            "You can choose between different gain profiles for a one-year investment. "
+            "All options refer to the same invested amount. Which gain profile would you prefer?"
+        ),
+        "options": [
+            {
+                "label": "Secure small gain – you know exactly what you will receive",
+                "risk_level": 1,
+            },
+            {
+                "label": "Moderate chance of a noticeably higher gain, otherwise no gain",
+                "risk_level": 2,
+            },
+            {
+                "label": "Lower chance of a very high gain, otherwise no gain",
+                "risk_level": 3,
+            },
+            {
+                "label": "No immediate payout, stay fully invested long-term with full market risk",
+                "risk_level": 4,
+            },
+        ],
+        "bias_tag": "gain_frame",
+        "herd_majority": None,
+        "risk_relevant": True,
+    },
+    {
+        # Pure Herding / FOMO – OHNE Risikobeitrag
+        "id": 11,
+        "phase": "boom",
+        "question": (
+            "Several friends and colleagues tell you that they made high short-term profits with "
+            "a very popular, highly discussed investment theme (for example, a specific tech or "
+            "crypto asset). You have not invested in it so far. How do you react?"
+        ),
+        "options": [
+            {
+                "label": "I do not invest and consciously stick to my own strategy",
+                "risk_level": 1,
+            },
+            {
+                "label": "I inform myself, but do not change my portfolio for now",
+                "risk_level": 2,
+            },
+            {
+                "label": "I invest a moderate amount to participate",
+                "risk_level": 3,
+            },
+            {
+                "label": "I invest a significant amount quickly to not miss the opportunity",
+                "risk_level": 4,
+            },
+        ],
+        "bias_tag": "herding",
+        "herd_majority": "I invest a significant amount quickly to not miss the opportunity",
+        "risk_relevant": False,  # Beispiel: nur Herding-Bias, kein Beitrag zum Risk-Average
+    },
+    {
+        # Overconfidence / bubble warnings
+        "id": 12,
+        "phase": "boom",
+        "question": (
+            "Financial media and some experts warn more and more loudly of a possible bubble and "
+            "overvaluation on the markets. Your portfolio is strongly in profit. What do you do?"
+        ),
+        "options": [
+            {
+                "label": "I reduce risk significantly and secure a large part of the profits",
+                "risk_level": 1,
+            },
+            {
+                "label": "I reduce risk slightly (small profit-taking)",
+                "risk_level": 2,
+            },
+            {
+                "label": "I do not change anything, the rally continues in my view",
+                "risk_level": 3,
+            },
+            {
+                "label": "I even increase risk and expand my equity or leverage positions",
+                "risk_level": 4,
+            },
+        ],
+        "bias_tag": "overconfidence_candidate",
+        "herd_majority": None,
+        "risk_relevant": True,
+    },
+
+    # ---------------- CRISIS MARKET ----------------
+    {
+        # Loss aversion candidate – crisis
+        "id": 13,
+        "phase": "crisis",
+        "question": (
+            "Stock markets have fallen by around 30% within a year. Your long-term portfolio is "
+            "clearly in the red. You realize that such losses are emotionally very stressful for you. "
+            "What do you do?"
+        ),
+        "options": [
+            {
+                "label": "Sell everything, limit losses and go to cash",
+                "risk_level": 1,
+            },
+            {
+                "label": "Partial sale, leave part invested",
+                "risk_level": 2,
+            },
+            {
+                "label": "Stay invested and keep a long-term view",
+                "risk_level": 3,
+            },
+            {
+                "label": "Add additional capital and buy 'cheap'",
+                "risk_level": 4,
+            },
+        ],
+        "bias_tag": "loss_aversion_candidate",
+        "herd_majority": None,
+        "risk_relevant": True,
+    },
+    {
+        # Crisis risk setting
+        "id": 14,
+        "phase": "crisis",
+        "question": (
+            "In the current market crisis you are reviewing your overall strategy. "
+            "For the next years, how much risk are you willing to carry in your investments?"
+        ),
+        "options": [
+            {
+                "label": "Very defensive – strong focus on capital preservation, little fluctuation",
+                "risk_level": 1,
+            },
+            {
+                "label": "Defensive – reduced equity share, limited fluctuation acceptable",
+                "risk_level": 2,
+            },
+            {
+                "label": "Balanced – you accept clear fluctuations for long-term return",
+                "risk_level": 3,
+            },
+            {
+                "label": "Aggressive – you accept strong fluctuations to use the crisis as an opportunity",
+                "risk_level": 4,
+            },
+        ],
+        "bias_tag": None,
+        "herd_majority": None,
+        "risk_relevant": True,
+    },
+    {
+        # Recency bias – Q15 (Strings wichtig)
+        "id": 15,
+        "phase": "crisis",
+        "question": (
+            "In the last weeks, markets have steadily fallen and the last two trading days were again "
+            "clearly negative. Your portfolio shows large losses. How do you react now?"
+        ),
+        "options": [
+            {
+                "label": "I sell everything now and go to cash",
+                "risk_level": 1,
+            },
+            {
+                "label": "I only sell part of the portfolio",
+                "risk_level": 2,
+            },
+            {
+                "label": "I hold on, without investing further",
+                "risk_level": 3,
+            },
+            {
+                "label": "I hold on and even buy more, because I see opportunities",
+                "risk_level": 4,
+            },
+        ],
+        "bias_tag": "recency_candidate",
+        "herd_majority": None,
+        "risk_relevant": True,
+    },
+    {
+        # Herding in crisis
+        "id": 16,
+        "phase": "crisis",
+        "question": (
+            "The media say: 'Everyone is selling now, this could be the beginning of a long crisis.' "
+            "You also hear from acquaintances that they have sold a large part of their investments. "
+            "What do you do?"
+        ),
+        "options": [
+            {
+                "label": "I sell like the majority and move largely into cash",
+                "risk_level": 1,
+            },
+            {
+                "label": "I reduce risk moderately but keep a core position",
+                "risk_level": 2,
+            },
+            {
+                "label": "I stay invested, even if it hurts",
+                "risk_level": 3,
+            },
+            {
+                "label": "I consciously use the opportunity to buy more",
+                "risk_level": 4,
+            },
+        ],
+        "bias_tag": "herding",
+        "herd_majority": "I sell like the majority and move largely into cash",
+        "risk_relevant": True,
+    },
+    {
+        "id": 17,
+        "phase": "crisis",
+        "question": (
+            "You have not yet invested a separate amount of money that you could also use as a "
+            "long-term investment. Prices have fallen sharply. How do you deal with this additional capital "
+            "in the current crisis?"
+        ),
+        "options": [
+            {
+                "label": "No further investment, hold everything in cash",
+                "risk_level": 1,
+            },
+            {
+                "label": "Invest a small part in a defensive mixed fund",
+                "risk_level": 2,
+            },
+            {
+                "label": "Invest a larger part in a broad equity fund",
+                "risk_level": 3,
+            },
+            {
+                "label": "Invest most of it in very risky, sharply fallen individual stocks",
+                "risk_level": 4,
+            },
+        ],
+        "bias_tag": None,
+        "herd_majority": None,
+        "risk_relevant": True,
+    },
+    {
+        # Hindsight / regret – Q18 (Strings wichtig)
+        "id": 18,
+        "phase": "crisis",
+        "question": (
+            "Looking back, suppose you could rewind the last 12 months and set up your portfolio "
+            "again from today's perspective. How would you decide?"
+        ),
+        "options": [
+            {
+                "label": "Yes, I would have been much more defensive in my allocation",
+                "risk_level": 1,
+            },
+            {
+                "label": "I would only make small adjustments to the portfolio",
+                "risk_level": 2,
+            },
+            {
+                "label": "No, I would have done the same",
+                "risk_level": 3,
+            },
+            {
+                "label": "I would have been even more aggressive and taken more risk",
+                "risk_level": 4,
+            },
+        ],
+        "bias_tag": "hindsight",
+        "herd_majority": None,
+        "risk_relevant": True,
+    },
+]
+
+QUESTIONS_BY_ID = {q["id"]: q for q in SCENARIO_QUESTIONS}
+
+
+def response_metadata(q_id, selected_label) -> dict:
+    """Per-response fields the simulation derives from the question (not stored in the DB)."""
+    q = QUESTIONS_BY_ID.get(q_id)
+    if q is None:
+        return {}
+    herd_majority_flag = int(q.get("bias_tag") == "herding" and q.get("herd_majority") is not None)
+    return {
+        "risk_relevant": bool(q.get("risk_relevant", True)),
+        "bias_tag": q.get("bias_tag"),
+        "follow_crowd": int(herd_majority_flag == 1 and selected_label == q["herd_majority"]),
+        "herd_majority_flag": herd_majority_flag,
+    }
+
+
+# ---------------------------------------------------------
+# Demographics form
+# ---------------------------------------------------------
+AGE_RANGE = (18, 99)
+GENDER_OPTIONS = ["No Information", "Female", "Male", "Diverse"]
+KNOWLEDGE_RANGE = (1, 5)
+EXPERIENCE_OPTIONS = ["None", "Little", "Medium", "A lot"]
+GOAL_OPTIONS = ["Wealth Accumulation", "Income/Dividends", "Capital Preservation/Security", "Speculation"]
+INVEST_AMOUNT_RANGE = (1000, 1_000_000)  # CHF, in steps of 1000
+AMOUNT_FEEL_OPTIONS = ["Rather small", "Medium size", "Very large amount for me"]
+INVESTMENT_OPTIONS = ["Stocks", "Funds/ETFs", "Bonds", "Crypto", "Real Estate", "Cash", "Nothing yet"]
+HORIZON_OPTIONS = ["Short-term (< 3 years)", "Medium (3–10 years)", "Long-term (> 10 years)"]
+STATED_RISK_RANGE = (1, 7)
+RISK_CONSTANT_OPTIONS = ["Yes", "No", "Don't know"]
+
+
+def stated_risk_norm(stated_risk_raw) -> float:
+    """Self-assessed risk tolerance (1..7 slider) scaled to 0..1."""
+    lo, hi = STATED_RISK_RANGE
+    return (stated_risk_raw - lo) / float(hi - lo)
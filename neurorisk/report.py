@@ -0,0 +1,390 @@
+"""PDF results report and the worker pool that renders it off the script thread.
+
+``generate_results_pdf`` is a pure function of the results-page data. The app
+never calls it inline: ``PdfService.submit`` renders in a thread pool and keeps
+the finished bytes by content hash, so a report is built at most once and only
+when someone asks for it.
+"""
+import functools
+import importlib.util
+import logging
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from io import BytesIO
+
+import pandas as pd
+
+from neurorisk.metrics import REGISTRY
+from neurorisk.scoring import PHASE_ORDER, classify_risk_level, classify_stability_profile
+
+log = logging.getLogger(__name__)
+
+PDF_BUILD_SECONDS = REGISTRY.histogram("neurorisk_pdf_build_seconds", "PDF report render time")
+
+PHASE_LABELS = {"calm": "Calm", "boom": "Boom", "crisis": "Crisis"}
+
+
+@functools.lru_cache(maxsize=None)
+def pdf_available() -> bool:
+    """Whether reportlab is installed; checked without importing it."""
+    return importlib.util.find_spec("reportlab") is not None
+
+
+def _reportlab():
+    """(A4, canvas, simpleSplit), imported on the first PDF rather than at app start."""
+    try:
+        from reportlab.lib.pagesizes import A4
+        from reportlab.pdfgen import canvas
+        from reportlab.lib.utils import simpleSplit  # for wrapping
+    except ImportError:
+        return None, None, None
+    return A4, canvas, simpleSplit
+
+
+def biometrics_frame(responses) -> pd.DataFrame:
+    """Average pulse and reaction time per market phase (section 1 of the results)."""
+    df = pd.DataFrame(responses)
+    biometrics = df.groupby("phase")[["x_pulse", "x_reaction_time"]].mean().reindex(PHASE_ORDER)
+    biometrics = biometrics.rename(columns={"x_pulse": "Average Pulse (bpm)", "x_reaction_time": "Average Reaction Time (s)"}).reset_index()
+    biometrics["Market Phase"] = biometrics["phase"].map(PHASE_LABELS)
+    return biometrics
+
+
+def report_args(demographics, biometrics_df, scores) -> tuple:
+    """Positional arguments of ``generate_results_pdf`` for one profile."""
+    stress_summary = {PHASE_LABELS[p]: float(scores["stress_by_phase"].get(p, 0.0)) for p in PHASE_ORDER}
+    risk_summary = {PHASE_LABELS[p]: float(scores["risk_by_phase"].get(p, 0.0)) for p in PHASE_ORDER}
+    risk_type = f"{classify_risk_level(scores['BR'])}, {classify_stability_profile(scores['RCS'], scores['SSS'])}"
+    return demographics, biometrics_df, stress_summary, risk_summary, scores, risk_type
+
+
+def compute_bias_messages(scores):
+    """Create bias messages with severity levels."""
+    messages = []
+    la = scores.get("loss_aversion_proxy", 0.0)
+    if la > 0.2:
+        messages.append((
+            "info",
+            "🧩 **Loss Aversion:** You behave much more risk-seeking during boom phases than in crises. "
+            "This indicates pronounced loss aversion."
+        ))
+    elif la > 0.05:
+        messages.append((
+            "info",
+            "🧩 **Loss Aversion:** Slight tendency toward loss avoidance in crises – overall moderate."
+        ))
+    else:
+        messages.append((
+            "info",
+            "🧩 **Loss Aversion:** Your risk choices hardly differ between boom and crisis – rather low loss aversion."
+        ))
+
+    herd_score = scores.get("herding_score", 0.0)
+    if herd_score > 70:
+        messages.append((
+            "warning",
+            "👥 **Herding Tendency:** You frequently follow the majority. "
+            "Be careful not to base decisions solely on 'everyone's doing it'."
+        ))
+    elif herd_score > 30:
+        messages.append((
+            "info",
+            "👥 **Herding Tendency:** Moderate tendency to orient yourself toward the majority."
+        ))
+    else:
+        messages.append((
+            "success",
+            "👥 **Herding Tendency:** Low tendency toward herding – you make relatively independent decisions."
+        ))
+
+    disposition = scores.get("disposition")
+    if disposition == "high":
+        messages.append((
+            "warning",
+            "💰 **Disposition Effect:** You tend to realize gains quickly and completely. "
+            "In the long run, this can lead to missing upside potential."
+        ))
+    elif disposition == "medium":
+        messages.append((
+            "info",
+            "💰 **Disposition Effect:** Tendency to sell when in profit – normal, but observable."
+        ))
+    elif disposition == "slight":
+        messages.append((
+            "info",
+            "💰 **Disposition Effect:** Slight tendency to take profits, overall balanced."
+        ))
+    elif disposition == "low":
+        messages.append((
+            "success",
+            "💰 **Disposition Effect:** You let gains run relatively – little tendency to realize prematurely."
+        ))
+
+    recency = scores.get("recency")
+    if recency == "strong negative":
+        messages.append((
+            "warning",
+            "⏳ **Recency Bias:** After short-term losses, you react very defensively. "
+            "This can lead to emotional selling."
+        ))
+    elif recency == "moderate":
+        messages.append((
+            "info",
+            "⏳ **Recency Bias:** Your reaction to short-term losses is moderate."
+        ))
+    elif recency == "resilient_proactive":
+        messages.append((
+            "success",
+            "⏳ **Recency Bias:** You not only stay calm, but also actively use downturns."
+        ))
+    elif recency == "resilient":
+        messages.append((
+            "success",
+            "⏳ **Recency Bias:** Short-term losses seem to hardly dominate your behavior."
+        ))
+
+
+    hindsight = scores.get("hindsight")
+    if hindsight == "high":
+        messages.append((
+            "warning",
+            "🔁 **Hindsight / Regret:** In hindsight, you would clearly choose a more defensive strategy. "
+            "This may indicate high emotional retrospective pressure."
+        ))
+    elif hindsight == "moderate":
+        messages.append((
+            "info",
+            "🔁 **Hindsight / Regret:** You would change some, but not all decisions."
+        ))
+    elif hindsight == "aggressive":
+        messages.append((
+            "info",
+            "🔁 **Hindsight:** In hindsight, you would have been even more aggressive – you accept volatility relatively well."
+        ))
+    elif hindsight == "low":
+        messages.append((
+            "success",
+            "🔁 **Hindsight / Regret:** You would hardly change your strategy in hindsight."
+        ))
+
+    return messages
+
+def generate_results_pdf(demographics, biometrics_df, stress_summary, risk_summary, scores, risk_type):
+    """Render PDF export (sections 1–8) with wrapped text."""
+    A4, canvas, simpleSplit = _reportlab()
+    if canvas is None or A4 is None:
+        return None
+
+    buffer = BytesIO()
+    pdf = canvas.Canvas(buffer, pagesize=A4)
+    width, height = A4
+    margin = 40
+    y = height - margin
+    content_width = width - 2 * margin
+
+    def new_page():
+        nonlocal y
+        pdf.showPage()
+        pdf.setFont("Helvetica", 11)
+        y = height - margin
+
+    def ensure_space(required=40):
+        nonlocal y
+        if y - required < margin:
+            new_page()
+
+    def write_heading(text):
+        nonlocal y
+        ensure_space(30)
+        pdf.setFont("Helvetica-Bold", 13)
+        pdf.drawString(margin, y, text)
+        y -= 22
+        pdf.setFont("Helvetica", 11)
+
+    def write_line(text=""):
+        nonlocal y
+        ensure_space(18)
+        pdf.drawString(margin, y, text)
+        y -= 16
+
+    def write_wrapped(text, indent=0):
+        """Wrap long lines to fit the page width."""
+        nonlocal y
+        ensure_space(18)
+        pdf.setFont("Helvetica", 11)
+        # Fallback: manual wrap at ~95 chars if simpleSplit not available
+        if simpleSplit:
+            lines = simpleSplit(text, "Helvetica", 11, content_width - indent)
+        else:
+            max_chars = 95
+            words = text.split()
+            lines, cur = [], ""
+            for w in words:
+                if len(cur) + len(w) + 1 <= max_chars:
+                    cur = (cur + " " + w).strip()
+                else:
+                    lines.append(cur)
+                    cur = w
+            if cur:
+                lines.append(cur)
+        for i, ln in enumerate(lines):
+            ensure_space(16)
+            pdf.drawString(margin + indent, y, ln)
+            y -= 16
+
+    def clean_text(t: str) -> str:
+        return t.replace("**", "").replace("–", "-")
+
+    # Title block
+    pdf.setFont("Helvetica-Bold", 16)
+    pdf.drawString(margin, y, "NeuroRiskAI – Results Report")
+    y -= 28
+    pdf.setFont("Helvetica", 11)
+    write_wrapped(f"Created on: {datetime.now().strftime('%d.%m.%Y %H:%M')}")
+    write_wrapped(f"Age: {demographics.get('age', '–')} | Goal: {demographics.get('goal', '–')} | Experience: {demographics.get('experience', '–')}")
+    write_line()
+
+    # 1. Biometrics
+    write_heading("1. Biometrics")
+    if biometrics_df is not None and not biometrics_df.empty:
+        for _, row in biometrics_df.iterrows():
+            pulse = row.get("Average Pulse (bpm)")
+            rt = row.get("Average Reaction Time (s)")
+            txt = (
+                f"{row.get('Market Phase', '–')}: Pulse {pulse:.0f} bpm, Reaction time {rt:.2f} s"
+                if pd.notnull(pulse) and pd.notnull(rt)
+                else f"{row.get('Market Phase', '–')}: No data available"
+            )
+            write_wrapped(txt)
+    else:
+        write_wrapped("No data available.")
+    write_line()
+
+    # 2. Stress Progression
+    write_heading("2. Stress Progression")
+    for phase, value in stress_summary.items():
+        write_wrapped(f"{phase}: Stress (z-score) {value:.2f}")
+    write_line()
+
+    # 3. Risk Progression
+    write_heading("3. Risk Progression")
+    for phase, value in risk_summary.items():
+        write_wrapped(f"{phase}: Risk index {value:.2f}")
+    write_line()
+
+    # 4. Key Metrics (Scores)
+    write_heading("4. Key Metrics (Scores)")
+    for key in ["RCS", "SSS", "RGS", "AdvisorNeedScore"]:
+        if key in scores:
+            write_wrapped(f"{key}: {scores[key]:.0f} / 100")
+    write_line()
+
+    # 5. Bias Cards – grouped and wrapped, no numbers, Green → Blue → Orange
+    write_heading("5. Bias Cards")
+    bias_msgs = compute_bias_messages(scores)
+    groups = [
+        ("success", "Positive (Green)"),
+        ("info", "Neutral (Blue)"),
+        ("warning", "Critical (Warning)"),
+    ]
+    for level, title in groups:
+        items = [m for lvl, m in bias_msgs if lvl == level]
+        if items:
+            write_wrapped(f"{title}:")
+            for m in items:
+                write_wrapped(" - " + clean_text(m), indent=12)
+            write_line()
+
+    # 6. Risk Character
+    write_heading("6. Risk Character")
+    write_wrapped(f"Profile: {risk_type}")
+    write_line()
+
+
+
+    pdf.save()
+    buffer.seek(0)
+    return buffer.getvalue()
+
+
+class PdfService:
+    """Renders PDFs in a small thread pool and caches the bytes by content hash."""
+
+    def __init__(self, max_workers: int = 2, max_cached: int = 256):
+        self.max_cached = max_cached
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="pdf")
+        self._lock = threading.Lock()
+        self._cache = OrderedDict()   # key -> bytes (LRU)
+        self._pending = {}            # key -> Future
+        self.stats = {
+            "builds": 0, "failures": 0, "cache_hits": 0,
+            "build_seconds_total": 0.0, "build_seconds_max": 0.0, "last_build_seconds": 0.0,
+            "bytes_total": 0, "last_bytes": 0,
+        }
+
+    def get(self, key):
+        """Cached PDF bytes for ``key``, or None."""
+        with self._lock:
+            pdf_bytes = self._cache.get(key)
+            if pdf_bytes is not None:
+                self._cache.move_to_end(key)
+                self.stats["cache_hits"] += 1
+            return pdf_bytes
+
+    def pending(self, key) -> bool:
+        with self._lock:
+            return key in self._pending
+
+    def submit(self, key, *args):
+        """Queue ``generate_results_pdf(*args)`` unless cached or already running; returns a Future."""
+        with self._lock:
+            future = self._pending.get(key)
+            if future is None:
+                future = self._executor.submit(self._build, key, args)
+                self._pending[key] = future
+            return future
+
+    def _build(self, key, args):
+        start = time.perf_counter()
+        try:
+            pdf_bytes = generate_results_pdf(*args)
+        except Exception:
+            log.exception("PDF build failed")
+            with self._lock:
+                self.stats["failures"] += 1
+                self._pending.pop(key, None)
+            raise
+        elapsed = time.perf_counter() - start
+        size = len(pdf_bytes or b"")
+        log.info("PDF built in %.3fs (%d bytes)", elapsed, size)
+        PDF_BUILD_SECONDS.observe(elapsed)
+
+        with self._lock:
+            stats = self.stats
+            stats["builds"] += 1
+            stats["build_seconds_total"] += elapsed
+            stats["build_seconds_max"] = max(stats["build_seconds_max"], elapsed)
+            stats["last_build_seconds"] = elapsed
+            stats["bytes_total"] += size
+            stats["last_bytes"] = size
+            if pdf_bytes is not None:
+                self._cache[key] = pdf_bytes
+                while len(self._cache) > self.max_cached:
+                    self._cache.popitem(last=False)
+            self._pending.pop(key, None)
+        return pdf_bytes
+
+    def snapshot(self) -> dict:
+        """Copy of the counters plus cache size and mean build time."""
+        with self._lock:
+            out = dict(self.stats)
+            out["cached"] = len(self._cache)
+            out["pending"] = len(self._pending)
+        out["build_seconds_avg"] = out["build_seconds_total"] / out["builds"] if out["builds"] else 0.0
+        return out
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False)
@@ -0,0 +1,176 @@
+"""Offline re-scoring of stored profiles after a change to the scoring formulas.
+
+Profiles whose ``score_version`` is older than ``neurorisk.scoring.SCORE_VERSION``
+(or NULL) are streamed from the DB in chunks together with their responses,
+re-scored with the vectorized batch scorer across a process pool, and written
+back one transaction per chunk::
+
+    python -m neurorisk.rescore --db neurorisk.db --workers 4
+
+Every committed chunk stamps its rows with the current version, so an
+interrupted run simply continues where it stopped when started again. The
+peer cube is adjusted in the same transaction; once the run ends the peer
+generation is bumped so running apps reload their cached peer data.
+"""
+import argparse
+import json
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+from neurorisk.peers import PEER_SELECT, add_to_cube, bump_peer_generation, row_from_columns
+from neurorisk.profiles import RESPONSE_COLUMNS, clean_scores, stored_response
+from neurorisk.schema import PROFILE_COLUMN_NAMES, profile_columns
+from neurorisk.scoring import SCORE_VERSION
+
+CHUNK_SIZE = 2000
+
+_UPDATE = (
+    f"UPDATE profiles SET scores = ?, score_version = ?, "
+    f"{', '.join(f'{name} = ?' for name in PROFILE_COLUMN_NAMES)} WHERE id = ?"
+)
+
+
+def _pending_where(version):
+    return "(score_version IS NULL OR score_version <> ?)", [version]
+
+
+def count_pending(conn, version: int = SCORE_VERSION) -> int:
+    where, params = _pending_where(version)
+    return conn.execute(f"SELECT COUNT(*) FROM profiles WHERE {where}", params).fetchone()[0]
+
+
+def iter_chunks(conn, version: int = SCORE_VERSION, chunk_size: int = CHUNK_SIZE):
+    """Yield lists of (profile_id, demographics JSON, response tuples) still needing a re-score."""
+    where, params = _pending_where(version)
+    last_id = 0
+    while True:
+        rows = conn.execute(
+            f"SELECT id, demographics FROM profiles WHERE {where} AND id > ? ORDER BY id LIMIT ?",
+            params + [last_id, chunk_size],
+        ).fetchall()
+        if not rows:
+            return
+        ids = [r["id"] for r in rows]
+        responses = {pid: [] for pid in ids}
+        for r in conn.execute(
+            f"SELECT profile_id, {', '.join(RESPONSE_COLUMNS)} FROM responses "
+            f"WHERE profile_id IN ({', '.join('?' * len(ids))}) ORDER BY profile_id, id",
+            ids,
+        ):
+            responses[r[0]].append(tuple(r)[1:])
+        yield [(r["id"], r["demographics"], responses[r["id"]]) for r in rows]
+        last_id = ids[-1]
+
+
+def rescore_chunk(chunk) -> list:
+    """Worker: score one chunk; returns (profile_id, clean scores, typed columns) per profile.
+
+    Profiles without stored responses keep their scores and come back as
+    (profile_id, None, None), so they are only stamped with the new version.
+    """
+    from neurorisk.batch_scoring import score_sessions
+
+    ids, sessions, out = [], [], []
+    for profile_id, demographics, rows in chunk:
+        if not rows:
+            out.append((profile_id, None, None))  # nothing to score from
+            continue
+        ids.append(profile_id)
+        sessions.append((json.loads(demographics), [stored_response(row) for row in rows]))
+
+    for profile_id, (demographics, _), scores in zip(ids, sessions, score_sessions(sessions)):
+        scores = clean_scores(scores)
+        out.append((profile_id, scores, profile_columns(demographics, scores)))
+    return out
+
+
+def write_chunk(conn, results, version: int = SCORE_VERSION):
+    """Store re-scored profiles in one transaction, moving their cube contributions."""
+    if not results:
+        return
+    conn.execute("BEGIN IMMEDIATE")
+    conn.executemany("UPDATE profiles SET score_version = ? WHERE id = ?",
+                     [(version, profile_id) for profile_id, scores, _ in results if scores is None])
+    results = [r for r in results if r[1] is not None]
+    if not results:
+        conn.commit()
+        return
+    ids = [profile_id for profile_id, _, _ in results]
+    old = conn.execute(
+        f"SELECT {PEER_SELECT} FROM profiles WHERE id IN ({', '.join('?' * len(ids))})", ids
+    ).fetchall()
+    conn.executemany(_UPDATE, [
+        (json.dumps(scores), version, *(typed[name] for name in PROFILE_COLUMN_NAMES), profile_id)
+        for profile_id, scores, typed in results
+    ])
+    add_to_cube(conn, [row_from_columns(r) for r in old], sign=-1)
+    add_to_cube(conn, [row_from_columns(typed) for _, _, typed in results])
+    conn.commit()
+
+
+def rescore(conn, workers: int = None, chunk_size: int = CHUNK_SIZE, version: int = SCORE_VERSION,
+            progress=None) -> dict:
+    """Re-score every outdated profile; returns counters."""
+    stats = {"total": count_pending(conn, version), "done": 0, "seconds": 0.0}
+    start = time.perf_counter()
+    window = max(2, (workers or 2) * 2)
+
+    try:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            in_flight = set()
+
+            def drain():
+                nonlocal in_flight
+                done, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+                for future in done:
+                    results = future.result()
+                    write_chunk(conn, results, version)
+                    stats["done"] += len(results)
+                stats["seconds"] = time.perf_counter() - start
+                if progress:
+                    progress(stats)
+
+            for chunk in iter_chunks(conn, version, chunk_size):
+                in_flight.add(pool.submit(rescore_chunk, chunk))
+                if len(in_flight) >= window:
+                    drain()
+            while in_flight:
+                drain()
+    finally:
+        if stats["done"]:
+            # Once per run, also an interrupted one: apps drop their peer caches on a new generation
+            conn.execute("BEGIN IMMEDIATE")
+            bump_peer_generation(conn)
+            conn.commit()
+
+    stats["seconds"] = time.perf_counter() - start
+    return stats
+
+
+def _print_progress(stats):
+    rate = stats["done"] / stats["seconds"] if stats["seconds"] > 0 else 0.0
+    print(f"\r{stats['done']}/{stats['total']} profiles ({rate:,.0f} rows/s)", end="", file=sys.stderr, flush=True)
+
+
+def main(argv=None):
+    from neurorisk.db import DEFAULT_DB_FILE, ConnectionManager
+    from neurorisk.schema import init_schema
+
+    parser = argparse.ArgumentParser(description="Re-score stored profiles with the current scoring formulas.")
+    parser.add_argument("--db", default=str(DEFAULT_DB_FILE))
+    parser.add_argument("--workers", type=int, default=None, help="processes (default: CPU count)")
+    parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE)
+    args = parser.parse_args(argv)
+
+    db = ConnectionManager(args.db)
+    with db.connection() as conn:
+        init_schema(conn)
+        stats = rescore(conn, args.workers, args.chunk_size, progress=_print_progress)
+    rate = stats["done"] / stats["seconds"] if stats["seconds"] > 0 else 0.0
+    print(f"\nre-scored {stats['done']} profiles to version {SCORE_VERSION} "
+          f"in {stats['seconds']:.2f}s ({rate:,.0f} rows/s)", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,271 @@
+"""Results page data: per-session results cache, charts and the PDF export section."""
+import hashlib
+import json
+import threading
+
+import altair as alt
+import pandas as pd
+import streamlit as st
+
+from neurorisk.metrics import REGISTRY
+from neurorisk.report import PdfService, biometrics_frame, pdf_available, report_args
+from neurorisk.scoring import PHASE_ORDER, classify_risk_level, classify_stability_profile, compute_scores
+from neurorisk.theme import PRIMARY_COLOR
+
+
+# ---------------------------------------------------------
+# Results cache: computed once per session and set of responses
+# ---------------------------------------------------------
+# Hit/miss counters across all sessions (monitoring)
+@st.cache_resource
+def get_results_cache_stats():
+    stats = {"hits": 0, "misses": 0, "lock": threading.Lock()}
+    REGISTRY.add_collector("results_cache", lambda: _results_cache_samples(stats))
+    return stats
+
+def _results_cache_samples(stats) -> list:
+    with stats["lock"]:
+        hits, misses = stats["hits"], stats["misses"]
+    return [
+        ("neurorisk_results_cache_hits_total", "counter", "Results page cache hits", hits),
+        ("neurorisk_results_cache_misses_total", "counter", "Results page cache misses", misses),
+    ]
+
+def results_cache_stats() -> dict:
+    stats = get_results_cache_stats()
+    with stats["lock"]:
+        return {"hits": stats["hits"], "misses": stats["misses"]}
+
+def results_key(demo, responses) -> str:
+    """Content hash of demographics + responses."""
+    payload = json.dumps({"demo": demo, "responses": responses}, sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+def build_results(demo, responses) -> dict:
+    """Scores, biometrics and chart objects for the results page."""
+    scores = compute_scores(demo, responses)
+    biometrics = biometrics_frame(responses)
+
+    pulse_chart = (
+        alt.Chart(biometrics)
+        .mark_bar(color=PRIMARY_COLOR)
+        .encode(
+            x=alt.X("Market Phase:N", title="Market Phase"),
+            y=alt.Y("Average Pulse (bpm):Q", title="Average Pulse (bpm)"),
+            tooltip=[alt.Tooltip("Market Phase:N"), alt.Tooltip("Average Pulse (bpm):Q", format=".0f")]
+        )
+        .properties(height=200)
+    )
+    rt_chart = (
+        alt.Chart(biometrics)
+        .mark_bar(color=PRIMARY_COLOR)
+        .encode(
+            x=alt.X("Market Phase:N", title="Market Phase"),
+            y=alt.Y("Average Reaction Time (s):Q", title="Average Reaction Time (s)"),
+            tooltip=[alt.Tooltip("Market Phase:N"), alt.Tooltip("Average Reaction Time (s):Q", format=".2f")]
+        )
+        .properties(height=200)
+    )
+    # z-score stress per phase (display directly, without 0..1 normalization)
+    raw_stress = [scores["stress_by_phase"].get(p, 0.0) for p in PHASE_ORDER]
+
+    stress_df = pd.DataFrame({
+        "Market Phase": PHASE_ORDER,
+        "Stress (zscore)": raw_stress
+    })
+
+    stress_chart = (
+        alt.Chart(stress_df)
+        .mark_line(point=True, color=PRIMARY_COLOR)
+        .encode(
+            x=alt.X("Market Phase:N", title="Market Phase"),
+            y=alt.Y(
+                "Stress (zscore):Q",
+                title="Stress Index (0 = your average, >0 = more stress, <0 = less stress)",
+                scale=alt.Scale(domain=[-2, 2])
+            ),
+            tooltip=[alt.Tooltip("Market Phase:N", title="Phase"),
+                     alt.Tooltip("Stress (zscore):Q", title="Stress (z-score)", format=".2f")]
+        )
+        .properties(height=400)  
+    )
+
+    risk_df = pd.DataFrame({
+        "Market Phase": PHASE_ORDER,
+        "Risk (0 = cautious, 1 = risk-seeking)": [scores["risk_by_phase"].get(p, 0.0) for p in PHASE_ORDER]
+    })
+    risk_chart = (
+        alt.Chart(risk_df)
+        .mark_line(point=True, color=PRIMARY_COLOR)
+        .encode(
+            x=alt.X("Market Phase:N", title="Market Phase"),
+            y=alt.Y(
+                "Risk (0 = cautious, 1 = risk-seeking):Q",
+                title="Risk (0 = cautious, 1 = risk-seeking)",
+                scale=alt.Scale(domain=[0,1])
+            ),
+        )
+        .properties(height=400)  # same height as stress chart
+    )
+
+    point_df = pd.DataFrame({
+        "Dimension": ["Your Profile"],
+        "RCS": [scores["RCS"]],
+        "SSS": [scores["SSS"]],
+    })
+
+
+    bg_df = pd.DataFrame({
+        "x1": [0,   50,  0,  50],
+        "x2": [50, 100, 50, 100],
+        "y1": [50,  50,  0,   0],
+        "y2": [100,100, 50,  50],
+        "Label": [
+            "Low RCS / High SSS",
+            "High RCS / High SSS",
+            "Low RCS / Low SSS",
+            "High RCS / Low SSS",
+        ],
+        "color": ["#2564eb32", "#16a34a3f", "#efc57e4b", "#2564eb32"] 
+    })
+
+    bg_layer = (
+        alt.Chart(bg_df)
+        .mark_rect()
+        .encode(
+            x=alt.X("x1:Q", title="Risk Consistency Score (RCS)", scale=alt.Scale(domain=[0, 100])),
+            x2="x2:Q",
+            y=alt.Y("y1:Q", title="Stress Stability Score (SSS)", scale=alt.Scale(domain=[0, 100])),
+            y2="y2:Q",
+            color=alt.Color("color:N", scale=None, legend=None),
+        )
+    )
+
+    # Threshold lines at 50 (consistent with classification)
+    rules = (
+        alt.Chart(pd.DataFrame({"pos": [50]}))
+        .mark_rule(color="#6b7280", strokeDash=[6, 4])
+        .encode(x="pos:Q")
+    ) + (
+        alt.Chart(pd.DataFrame({"pos": [50]}))
+        .mark_rule(color="#6b7280", strokeDash=[6, 4])
+        .encode(y="pos:Q")
+    )
+
+    # Profile point
+    point_layer = (
+        alt.Chart(point_df)
+        .mark_circle(size=420, color=PRIMARY_COLOR)
+        .encode(
+            x=alt.X("RCS:Q", scale=alt.Scale(domain=[0, 100])),
+            y=alt.Y("SSS:Q", scale=alt.Scale(domain=[0, 100])),
+            tooltip=[
+                alt.Tooltip("RCS:Q", format=".0f"),
+                alt.Tooltip("SSS:Q", format=".0f"),
+                alt.Tooltip("Dimension:N"),
+            ],
+        )
+    )
+
+    # Square representation (fixed width/height)
+    matrix_chart = (bg_layer + rules + point_layer).properties(width=500, height=500)
+
+    risk_level = classify_risk_level(scores["BR"])
+    stability_profile = classify_stability_profile(scores["RCS"], scores["SSS"])
+
+    return {
+        "scores": scores,
+        "biometrics": biometrics,
+        "stress_df": stress_df,
+        "risk_df": risk_df,
+        "pulse_chart": pulse_chart,
+        "rt_chart": rt_chart,
+        "stress_chart": stress_chart,
+        "risk_chart": risk_chart,
+        "matrix_chart": matrix_chart,
+        "stability_profile": stability_profile,
+        "risk_type": f"{risk_level}, {stability_profile}",
+    }
+
+def get_results(demo, responses) -> dict:
+    """Results for the current responses; rebuilt only when they change."""
+    key = results_key(demo, responses)
+    cached = st.session_state.get("results_cache")
+    stats = get_results_cache_stats()
+    if cached and cached["key"] == key:
+        with stats["lock"]:
+            stats["hits"] += 1
+        return cached["data"]
+
+    with stats["lock"]:
+        stats["misses"] += 1
+    data = build_results(demo, responses)
+    data["key"] = key
+    st.session_state.results_cache = {"key": key, "data": data}
+    return data
+
+
+# ---------------------------------------------------------
+# PDF export: rendered on request in a worker pool
+# ---------------------------------------------------------
+# Shared by all sessions; finished reports are cached by content hash
+@st.cache_resource
+def get_pdf_service():
+    service = PdfService()
+    REGISTRY.add_collector("pdf_service", lambda: _pdf_service_samples(service))
+    return service
+
+def _pdf_service_samples(service) -> list:
+    snap = service.snapshot()
+    return [
+        ("neurorisk_pdf_builds_total", "counter", "PDF reports built", snap["builds"]),
+        ("neurorisk_pdf_failures_total", "counter", "PDF builds that raised", snap["failures"]),
+        ("neurorisk_pdf_cache_hits_total", "counter", "PDF requests served from the cache", snap["cache_hits"]),
+        ("neurorisk_pdf_cached", "gauge", "PDF reports held in the cache", snap["cached"]),
+        ("neurorisk_pdf_pending", "gauge", "PDF builds queued or running", snap["pending"]),
+        ("neurorisk_pdf_bytes_total", "counter", "Bytes of PDF output built", snap["bytes_total"]),
+    ]
+
+def submit_results_pdf(results, demo):
+    """Queue the PDF build for these results (no-op if cached or already running)."""
+    return get_pdf_service().submit(results["key"], *report_args(demo, results["biometrics"], results["scores"]))
+
+def _pdf_export_body(results, demo):
+    service = get_pdf_service()
+    key = results["key"]
+    pdf_bytes = service.get(key)
+    if pdf_bytes:
+        st.download_button(
+            "📄 Export Results as PDF",
+            data=pdf_bytes,
+            file_name="NeuroRiskAI_Report.pdf",
+            mime="application/pdf"
+        )
+        return
+    if service.pending(key):
+        st.info("⏳ Preparing your PDF report …")
+        return
+
+    pdf_key, future = st.session_state.get("pdf_future") or (None, None)
+    failed = pdf_key == key and future.done() and future.exception() is not None
+    if failed:
+        st.error(f"Error creating PDF report: {future.exception()}")
+    if st.button("Try again" if failed else "📄 Create PDF Report", key="pdf_create"):
+        st.session_state.pdf_future = (key, submit_results_pdf(results, demo))
+        st.rerun()
+
+def render_pdf_export(results, demo):
+    """Export section; polls (as a fragment) only while a build is running."""
+    if not pdf_available():
+        st.info("PDF export requires the Python package reportlab.")
+        return
+    pending = get_pdf_service().pending(results["key"])
+    if pending:
+        st.fragment(run_every=0.5)(_pdf_export_poll)(results, demo)
+    else:
+        _pdf_export_body(results, demo)
+
+def _pdf_export_poll(results, demo):
+    if not get_pdf_service().pending(results["key"]):
+        st.rerun()  # done: full rerun renders the section without polling
+    _pdf_export_body(results, demo)
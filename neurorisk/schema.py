@@ -0,0 +1,272 @@
+"""Database schema and migrations.
+
+``PRAGMA user_version`` records which migrations have been applied. Each
+migration's DDL runs in one ``BEGIN IMMEDIATE`` transaction, with the version
+re-read once the write lock is held. Migrations that add profile columns then
+backfill them from the archived JSON one committed chunk at a time, so the
+write lock is never held for a whole-table pass. Rows still NULL in the new
+columns are what is left to do, so an interrupted backfill resumes on the next
+start. The version is bumped, again under the lock, only after the backfill.
+The JSON columns ``profiles.demographics`` / ``profiles.scores`` stay as an
+archive copy; analytic queries read the typed columns added by migration 1.
+"""
+import json
+import math
+
+from neurorisk.db import begin_immediate
+from neurorisk.peers import init_cube
+
+PHASES = ["calm", "boom", "crisis"]
+
+# Typed profile columns: (column, SQL type)
+PROFILE_COLUMNS = [
+    ("age", "INTEGER"),
+    ("gender", "TEXT"),
+    ("goal", "TEXT"),
+    ("experience", "TEXT"),
+    ("horizon", "TEXT"),
+    ("rcs", "REAL"),
+    ("sss", "REAL"),
+    ("rgs", "REAL"),
+    ("ans", "REAL"),
+    ("br", "REAL"),
+    ("ss", "REAL"),
+    ("loss_aversion", "REAL"),
+    ("herding", "REAL"),
+] + [(f"risk_{p}", "REAL") for p in PHASES] + [(f"stress_{p}", "REAL") for p in PHASES]
+
+PROFILE_COLUMN_NAMES = [name for name, _ in PROFILE_COLUMNS]
+
+BACKFILL_CHUNK = 5000
+
+
+def _num(val):
+    """Float or None (NaN is stored as NULL anyway)."""
+    try:
+        val = float(val)
+    except (TypeError, ValueError):
+        return None
+    return None if math.isnan(val) else val
+
+
+def profile_columns(demographics: dict, scores: dict) -> dict:
+    """Typed column values for one profile (scores already JSON-clean)."""
+    age = demographics.get("age")
+    out = {
+        "age": int(age) if isinstance(age, (int, float)) else None,
+        "gender": demographics.get("gender"),
+        "goal": demographics.get("goal"),
+        "experience": demographics.get("experience"),
+        "horizon": demographics.get("horizon"),
+        "rcs": _num(scores.get("RCS")),
+        "sss": _num(scores.get("SSS")),
+        "rgs": _num(scores.get("RGS")),
+        "ans": _num(scores.get("AdvisorNeedScore")),
+        "br": _num(scores.get("BR")),
+        "ss": _num(scores.get("SS")),
+        "loss_aversion": _num(scores.get("loss_aversion_proxy")),
+        "herding": _num(scores.get("herding_score")),
+    }
+    for prefix, key in (("risk", "risk_by_phase"), ("stress", "stress_by_phase")):
+        by_phase = scores.get(key)
+        if not isinstance(by_phase, dict):
+            by_phase = {}
+        for ph in PHASES:
+            out[f"{prefix}_{ph}"] = _num(by_phase.get(ph))
+    return out
+
+
+# ---------------------------------------------------------
+# Base tables (version 0)
+# ---------------------------------------------------------
+def _create_base_tables(conn):
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS users (
+            username TEXT PRIMARY KEY,
+            password_hash TEXT NOT NULL,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    """)
+
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS profiles (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            username TEXT,  -- NULL for guest sessions
+            demographics TEXT NOT NULL,
+            scores TEXT NOT NULL,
+            timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            FOREIGN KEY (username) REFERENCES users(username)
+        )
+    """)
+
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS responses (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            profile_id INTEGER NOT NULL,
+            q_id INTEGER,
+            phase TEXT,
+            selected_label TEXT,
+            mu REAL,
+            sigma REAL,
+            x_risk_relative REAL,
+            x_reaction_time REAL,
+            x_pulse REAL,
+            advisor_help_used INTEGER,
+            switch_action INTEGER,
+            FOREIGN KEY (profile_id) REFERENCES profiles(id)
+        )
+    """)
+
+
+# ---------------------------------------------------------
+# Migration 1: typed profile columns + indexes
+# ---------------------------------------------------------
+def _migrate_1_typed_columns(conn):
+    existing = {r["name"] for r in conn.execute("PRAGMA table_info(profiles)")}
+    for name, sql_type in PROFILE_COLUMNS:
+        if name not in existing:
+            conn.execute(f"ALTER TABLE profiles ADD COLUMN {name} {sql_type}")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_profiles_user_ts ON profiles(username, timestamp)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_profiles_goal_gender_age ON profiles(goal, gender, age)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_responses_profile ON responses(profile_id)")
+
+
+def backfill_profile_columns(conn, names=PROFILE_COLUMN_NAMES, chunk_size: int = BACKFILL_CHUNK) -> int:
+    """Fill typed columns from the archived JSON where one of them is NULL, one transaction per chunk."""
+    assignments = ", ".join(f"{name} = ?" for name in names)
+    missing = " OR ".join(f"{name} IS NULL" for name in names)
+    last_id, done = 0, 0
+    while True:
+        begin_immediate(conn)
+        rows = conn.execute(
+            f"SELECT id, demographics, scores FROM profiles WHERE id > ? AND ({missing}) ORDER BY id LIMIT ?",
+            (last_id, chunk_size),
+        ).fetchall()
+        if not rows:
+            conn.commit()
+            break
+        params = []
+        for r in rows:
+            try:
+                cols = profile_columns(json.loads(r["demographics"]), json.loads(r["scores"]))
+            except Exception:
+                continue
+            params.append([cols[name] for name in names] + [r["id"]])
+        conn.executemany(f"UPDATE profiles SET {assignments} WHERE id = ?", params)
+        conn.commit()
+        last_id = rows[-1]["id"]
+        done += len(params)
+    return done
+
+
+# ---------------------------------------------------------
+# Migration 2: write-behind journal bookkeeping
+# ---------------------------------------------------------
+def _migrate_2_writer_state(conn):
+    # Highest journal sequence number committed per journal file (see neurorisk.writer)
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS writer_state (
+            journal TEXT PRIMARY KEY,
+            last_seq INTEGER NOT NULL
+        )
+    """)
+
+
+# ---------------------------------------------------------
+# Migration 3: scoring formula version + shared counters
+# ---------------------------------------------------------
+def _migrate_3_score_version(conn):
+    # NULL = scored by an unknown (pre-versioning) formula
+    existing = {r["name"] for r in conn.execute("PRAGMA table_info(profiles)")}
+    if "score_version" not in existing:
+        conn.execute("ALTER TABLE profiles ADD COLUMN score_version INTEGER")
+    # Small named counters, e.g. peer_generation (see neurorisk.peers)
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS counters (
+            name TEXT PRIMARY KEY,
+            value INTEGER NOT NULL
+        )
+    """)
+
+
+# ---------------------------------------------------------
+# Migration 4: browser vs. server reaction times
+# ---------------------------------------------------------
+def _migrate_4_reaction_times(conn):
+    # x_reaction_time keeps the value used for scoring (client time when the
+    # browser reported one); both raw measurements are kept next to it
+    existing = {r["name"] for r in conn.execute("PRAGMA table_info(responses)")}
+    for name in ("client_reaction_time", "server_reaction_time"):
+        if name not in existing:
+            conn.execute(f"ALTER TABLE responses ADD COLUMN {name} REAL")
+
+
+# ---------------------------------------------------------
+# Migration 5: loss aversion + herding (nearest-neighbour features)
+# ---------------------------------------------------------
+def _migrate_5_neighbor_features(conn):
+    existing = {r["name"] for r in conn.execute("PRAGMA table_info(profiles)")}
+    for name in ("loss_aversion", "herding"):
+        if name not in existing:
+            conn.execute(f"ALTER TABLE profiles ADD COLUMN {name} REAL")
+
+
+# ---------------------------------------------------------
+# Migration 6: versioned cluster models (risk characters)
+# ---------------------------------------------------------
+def _migrate_6_cluster_models(conn):
+    # One row per training run of neurorisk.clusters; the app uses the newest
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS cluster_models (
+            version INTEGER PRIMARY KEY AUTOINCREMENT,
+            trained_at REAL NOT NULL,       -- unix time
+            profiles INTEGER NOT NULL,      -- rows trained on
+            high_water INTEGER NOT NULL,    -- largest profiles.id included
+            model TEXT NOT NULL             -- JSON: centroids, sizes, feature mean/std
+        )
+    """)
+
+
+MIGRATIONS = [
+    _migrate_1_typed_columns,
+    _migrate_2_writer_state,
+    _migrate_3_score_version,
+    _migrate_4_reaction_times,
+    _migrate_5_neighbor_features,
+    _migrate_6_cluster_models,
+]
+SCHEMA_VERSION = len(MIGRATIONS)
+
+# Profile columns filled from the archived JSON after a migration (index into MIGRATIONS)
+BACKFILLS = {
+    0: PROFILE_COLUMN_NAMES,
+    4: ["loss_aversion", "herding"],
+}
+
+
+def _user_version(conn) -> int:
+    return conn.execute("PRAGMA user_version").fetchone()[0]
+
+
+def init_schema(conn):
+    """Create missing tables and apply pending migrations."""
+    while _user_version(conn) < SCHEMA_VERSION:
+        # Another process may be migrating as well: re-read the version under the write lock.
+        # Migrations are idempotent, so one interrupted before its version bump just runs again.
+        begin_immediate(conn)
+        _create_base_tables(conn)
+        version = _user_version(conn)
+        if version < SCHEMA_VERSION:
+            MIGRATIONS[version](conn)
+        conn.commit()
+        if version >= SCHEMA_VERSION:
+            break
+        if version in BACKFILLS:
+            backfill_profile_columns(conn, BACKFILLS[version])
+        begin_immediate(conn)
+        if _user_version(conn) == version:
+            conn.execute(f"PRAGMA user_version = {version + 1}")
+        conn.commit()
+
+    # Pre-aggregated peer comparison cells
+    init_cube(conn)
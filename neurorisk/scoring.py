@@ -0,0 +1,211 @@
+"""Behavioral scores for one completed simulation.
+
+``compute_scores`` turns the demographics and the list of response dicts
+collected during the simulation into the risk/stress curves, the four headline
+scores (RCS, SSS, RGS, Advisor Need) and the bias proxies shown on the results
+page.
+"""
+import numpy as np
+import pandas as pd
+
+PHASE_ORDER = ["calm", "boom", "crisis"]
+
+# Bump whenever a formula or constant below changes; stored profiles with an
+# older profiles.score_version are brought up to date by neurorisk.rescore
+SCORE_VERSION = 1
+
+# Scoring constants (shared with neurorisk.batch_scoring)
+STRESS_WEIGHT_RT = 0.6        # stress_i = w_rt * z(reaction time) + w_pulse * z(pulse)
+STRESS_WEIGHT_PULSE = 0.4
+STRESS_RANGE_MAX = 4.0        # stress spread across phases that maps to SSS = 0
+ANS_WEIGHTS = {"rcs": 0.3, "sss": 0.25, "rgs": 0.25, "help": 0.1, "switch": 0.1}
+
+# Questions whose chosen answer is classified into a bias category
+DISPOSITION_Q, RECENCY_Q, HINDSIGHT_Q = 3, 15, 18
+
+
+def classify_disposition(label: str) -> str:
+    """Disposition effect from the answer to q_id 3."""
+    label = label.lower()
+    if "sell everything" in label:
+        return "high"
+    elif "take profits" in label or "larger part" in label:
+        return "medium"
+    elif "partial sale" in label:
+        return "slight"
+    return "low"
+
+
+def classify_recency(label: str) -> str:
+    """Recency bias from the answer to q_id 15."""
+    label = label.lower()
+    if "sell everything now" in label:
+        return "strong_negative"
+    elif "only sell part" in label:
+        return "moderate"
+    elif "hold on" in label and "even buy more" in label:
+        return "resilient_proactive"
+    return "resilient"
+
+
+def classify_hindsight(label: str) -> str:
+    """Hindsight / regret from the answer to q_id 18."""
+    label = label.lower()
+    if "much more defensive" in label:
+        return "high"
+    elif "small adjustments" in label:
+        return "moderate"
+    elif "more aggressive" in label:
+        return "aggressive"
+    return "low"
+
+
+def compute_scores(demo, responses):
+    if not responses:
+        return {}
+
+    df = pd.DataFrame(responses)
+
+    # ---------- RISK: nur risk_relevante Fragen ----------
+    if "risk_relevant" in df.columns:
+        df_risk = df[df["risk_relevant"] == True]
+    else:
+        df_risk = df
+
+    # Falls aus irgendeinem Grund alle Fragen risk_relevant=False wären:
+    if df_risk.empty:
+        # Fallback, damit nichts crasht
+        df_risk = df.copy()
+
+    risk_by_phase = df_risk.groupby("phase")["x_risk_relative"].mean().reindex(PHASE_ORDER)
+    R_calm = risk_by_phase.get("calm", 0.0)
+    R_boom = risk_by_phase.get("boom", 0.0)
+    R_crisis = risk_by_phase.get("crisis", 0.0)
+
+    R_max = risk_by_phase.max()
+    R_min = risk_by_phase.min()
+    delta_R = float(R_max - R_min) if pd.notnull(R_max) and pd.notnull(R_min) else 0.0
+    RCS = 100 * (1 - min(max(delta_R, 0.0), 1.0))  # Risk Consistency Score
+
+    # ---------- STRESS: alle Fragen (inkl. Bias-only) ----------
+    rt = df["x_reaction_time"].values
+    pulse = df["x_pulse"].values
+
+    def zscore(x):
+        x = np.array(x)
+        if len(x) > 1 and x.std() > 0:
+            return (x - x.mean()) / x.std()
+        return np.zeros_like(x)
+
+    z_rt = zscore(rt)
+    z_pulse = zscore(pulse)
+
+    df["stress_i"] = STRESS_WEIGHT_RT * z_rt + STRESS_WEIGHT_PULSE * z_pulse
+    stress_by_phase = df.groupby("phase")["stress_i"].mean().reindex(PHASE_ORDER)
+    S_calm = stress_by_phase.get("calm", 0.0)
+    S_boom = stress_by_phase.get("boom", 0.0)
+    S_crisis = stress_by_phase.get("crisis", 0.0)
+
+    try:
+        s_max = float(stress_by_phase.max())
+        s_min = float(stress_by_phase.min())
+    except Exception:
+        s_max = 0.0
+        s_min = 0.0
+    delta_s = max(0.0, s_max - s_min)
+    ratio = delta_s / STRESS_RANGE_MAX
+    ratio_clamped = min(max(ratio, 0.0), 1.0)
+    SSS = 100 * (1 - ratio_clamped)  # Stress Stability Score
+
+    # ---------- Reality Gap ----------
+    SS = demo.get("stated_risk_norm", 0.5)  # self-stated risk [0,1]
+
+    BR = df_risk["x_risk_relative"].mean() if not df_risk.empty else 0.5
+    G = abs(SS - BR)
+    RGS = 100 * G
+
+    # ---------- Advisor Need ----------
+    RCS_norm = 1 - RCS / 100.0
+    SSS_norm = 1 - SSS / 100.0
+    RGS_norm = RGS / 100.0
+
+    help_rate = df["advisor_help_used"].mean() if "advisor_help_used" in df else 0.0
+    switch_rate = df["switch_action"].mean() if "switch_action" in df else 0.0
+
+    ANS_raw = (
+        ANS_WEIGHTS["rcs"] * RCS_norm
+        + ANS_WEIGHTS["sss"] * SSS_norm
+        + ANS_WEIGHTS["rgs"] * RGS_norm
+        + ANS_WEIGHTS["help"] * help_rate
+        + ANS_WEIGHTS["switch"] * switch_rate
+    )
+    AdvisorNeedScore = 100 * ANS_raw
+
+    # ---------- Bias Proxies (wie bei dir, aber mit R_boom/R_crisis aus df_risk) ----------
+    loss_aversion_proxy = R_boom - R_crisis
+
+    herd_rows = [r for r in responses if r.get("herd_majority_flag") == 1]
+    herd_follow_rate = np.mean([r.get("follow_crowd", 0) for r in herd_rows]) if herd_rows else 0.0
+
+    # Disposition (q_id 3)
+    disp = None
+    disp_row = next((r for r in responses if r["q_id"] == DISPOSITION_Q), None)
+    if disp_row:
+        disp = classify_disposition(disp_row["selected_label"])
+
+    # Recency (q_id 15)
+    recency = None
+    q15 = next((r for r in responses if r["q_id"] == RECENCY_Q), None)
+    if q15:
+        recency = classify_recency(q15["selected_label"])
+
+    # Hindsight (q_id 18)
+    hindsight = None
+    q18 = next((r for r in responses if r["q_id"] == HINDSIGHT_Q), None)
+    if q18:
+        hindsight = classify_hindsight(q18["selected_label"])
+
+    # Overconfidence Proxy
+    OC_raw = SS * (1 - RCS / 100.0) * (1 - SSS / 100.0)
+    OverconfidenceScore = 100 * OC_raw
+
+    scores = {
+        "risk_by_phase": risk_by_phase,
+        "stress_by_phase": stress_by_phase,
+        "RCS": float(RCS),
+        "SSS": float(SSS),
+        "RGS": float(RGS),
+        "AdvisorNeedScore": float(AdvisorNeedScore),
+        "BR": float(BR),
+        "SS": float(SS),
+        "loss_aversion_proxy": float(loss_aversion_proxy),
+        "herding_score": float(herd_follow_rate * 100),
+        "disposition": disp,
+        "recency": recency,
+        "hindsight": hindsight,
+        "OverconfidenceScore": float(OverconfidenceScore),
+    }
+    return scores
+
+def classify_risk_level(BR: float) -> str:
+    """Risk Level (BR) → Defensive / Balanced / Dynamic."""
+    if BR < 0.33:
+        return "Defensive Investor"
+    elif BR < 0.66:
+        return "Balanced Investor"
+    return "Dynamic Investor"
+
+def classify_stability_profile(RCS: float, SSS: float) -> str:
+    """2x2 Matrix from RCS & SSS → 4 Archetypes (threshold at 50)."""
+    def is_high(x): 
+        return x >= 50
+    def is_low(x): 
+        return x < 50
+
+    if is_high(RCS) and is_high(SSS):
+        return "Calm & Consistent Investor"
+    if is_high(RCS) and is_low(SSS):
+        return "Calm Outside, Storm Inside"
+    if is_low(RCS) and is_high(SSS):
+        return "Flexible, but relaxed"
+    return "Emotional Swing Investor"
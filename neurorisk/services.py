@@ -0,0 +1,380 @@
+"""Persistence and shared process-wide resources used by the app pages.
+
+Everything here is defined once per process; the pooled DB connection
+manager, the background profile writer, the peer store, the
+nearest-neighbour index, the cluster service and the What-if models live in
+``st.cache_resource``.
+"""
+import atexit
+import hashlib
+import json
+import os
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from pathlib import Path
+
+import streamlit as st
+
+from neurorisk.clusters import ClusterService
+from neurorisk.db import DEFAULT_DB_FILE, ConnectionManager
+from neurorisk.metrics import REGISTRY, db_timed, start_textfile_exporter
+from neurorisk.neighbors import NeighborIndex, neighbor_view, score_features
+from neurorisk.panic import PanicModel
+from neurorisk.peers import PeerCube, PeerStore
+from neurorisk.schema import init_schema
+from neurorisk.stress import StressModel
+
+
+# ---------------------------------------------------------
+# SQLite Database Setup
+# ---------------------------------------------------------
+# NEURORISK_DB points benchmarks and load tests at a scratch database
+DB_FILE = Path(os.environ.get("NEURORISK_DB", DEFAULT_DB_FILE))
+
+# One pooled connection manager per process (shared by all sessions)
+@st.cache_resource
+def get_db():
+    db = ConnectionManager(DB_FILE)
+    REGISTRY.add_collector("db_pool", lambda: _db_pool_samples(db))
+    return db
+
+def _db_pool_samples(db) -> list:
+    stats = db.stats()
+    return [
+        ("neurorisk_db_connections_opened_total", "counter", "SQLite connections opened", stats["opened"]),
+        ("neurorisk_db_checkouts_total", "counter", "Connections handed out by the pool", stats["checkouts"]),
+        ("neurorisk_db_idle_connections", "gauge", "Connections idle in the pool", stats["idle"]),
+    ]
+
+# Prometheus text file for a local scraper (node_exporter textfile collector etc.)
+METRICS_FILE = Path(os.environ.get("NEURORISK_METRICS_FILE", DB_FILE.with_suffix(".prom")))
+METRICS_INTERVAL = float(os.environ.get("NEURORISK_METRICS_INTERVAL", 10.0))  # seconds
+
+@st.cache_resource
+def start_metrics_exporter():
+    return start_textfile_exporter(METRICS_FILE, METRICS_INTERVAL)
+
+# Runs once per process (cached), not on every rerun
+@st.cache_resource
+@db_timed
+def init_db():
+    """Initialize SQLite database (tables, migrations, peer cube)"""
+    with get_db().connection() as conn:
+        init_schema(conn)
+    return True
+
+def hash_password(pw: str) -> str:
+    return hashlib.sha256(pw.encode("utf-8")).hexdigest()
+
+@db_timed
+def user_exists(username: str) -> bool:
+    with get_db().connection() as conn:
+        c = conn.cursor()
+        c.execute("SELECT 1 FROM users WHERE username = ?", (username,))
+        return c.fetchone() is not None
+
+@db_timed
+def create_user(username: str, password: str) -> bool:
+    try:
+        with get_db().connection() as conn:
+            conn.execute(
+                "INSERT INTO users (username, password_hash) VALUES (?, ?)",
+                (username, hash_password(password))
+            )
+        return True
+    except Exception as e:
+        st.error(f"Error creating account: {e}")
+        return False
+
+@db_timed
+def verify_user(username: str, password: str) -> bool:
+    with get_db().connection() as conn:
+        c = conn.cursor()
+        c.execute("SELECT password_hash FROM users WHERE username = ?", (username,))
+        row = c.fetchone()
+
+    if row:
+        return row[0] == hash_password(password)
+    return False
+
+@db_timed
+def load_user_profile(username: str):
+    """Load the latest profile of a user"""
+    with get_db().connection() as conn:
+        c = conn.cursor()
+
+        c.execute("""
+            SELECT id, demographics, scores, timestamp 
+            FROM profiles 
+            WHERE username = ? 
+            ORDER BY timestamp DESC, id DESC 
+            LIMIT 1
+        """, (username,))
+        profile = c.fetchone()
+
+        if not profile:
+            return None
+
+        profile_id = profile["id"]
+
+        # Load all responses for this profile
+        c.execute("""
+            SELECT q_id, phase, selected_label, mu, sigma, x_risk_relative, 
+                   x_reaction_time, x_pulse, advisor_help_used, switch_action
+            FROM responses 
+            WHERE profile_id = ?
+            ORDER BY id
+        """, (profile_id,))
+
+        responses_rows = c.fetchall()
+
+    # Convert to list of dicts
+    responses = [dict(row) for row in responses_rows]
+    
+    try:
+        demographics = json.loads(profile["demographics"])
+        scores = json.loads(profile["scores"])
+    except Exception as e:
+        st.error(f"Error loading profile: {e}")
+        return None
+    
+    return {
+        "demographics": demographics,
+        "responses": responses,
+        "scores": scores,
+        "timestamp": profile["timestamp"]
+    }
+
+# Background writer shared by all sessions; queued saves are journaled next to the DB,
+# one journal file per app process (see neurorisk.writer)
+JOURNAL_DIR = DB_FILE.with_suffix(".journals")
+
+@st.cache_resource
+def get_profile_writer():
+    from neurorisk.writer import ProfileWriter  # pulls in the scoring stack (pandas)
+
+    writer = ProfileWriter(get_db(), JOURNAL_DIR).start()
+    # Flush on a clean shutdown, so no journal is left behind for the next process
+    atexit.register(writer.close)
+    REGISTRY.add_collector("profile_writer", lambda: _profile_writer_samples(writer))
+    return writer
+
+def _profile_writer_samples(writer) -> list:
+    stats = dict(writer.stats)
+    return [
+        ("neurorisk_writer_committed_total", "counter", "Profiles committed by the writer", stats["committed"]),
+        ("neurorisk_writer_failed_total", "counter", "Profiles the writer failed to store", stats["failed"]),
+        ("neurorisk_writer_batches_total", "counter", "Group commits", stats["batches"]),
+        ("neurorisk_writer_busy_retries_total", "counter", "Commits retried because the DB was locked",
+         stats["busy_retries"]),
+        ("neurorisk_writer_queued", "gauge", "Profiles waiting for the writer", writer.queue_size()),
+    ]
+
+@db_timed
+def save_user_profile(username: str, demographics: dict, responses: list, scores: dict):
+    """Queue profile + all responses for saving (written in the background).
+       Returns a Future resolving to the new profile_id, or None on error.
+    """
+    try:
+        return get_profile_writer().submit(username, demographics, responses, scores)
+    except Exception as e:
+        st.error(f"Error saving profile: {e}")
+        return None
+
+@db_timed
+def save_guest_profile(demographics: dict, responses: list, scores: dict):
+    """Queue guest session (username = '' for old DBs with NOT NULL).
+       Returns a Future resolving to the new profile_id, or None on error.
+    """
+    try:
+        # username = '' instead of NULL (compatible with NOT NULL constraint)
+        return get_profile_writer().submit("", demographics, responses, scores)
+    except Exception as e:
+        st.error(f"Error saving guest session: {e}")
+        return None
+
+@db_timed
+def resolve_saved_profile_id(timeout: float = 0.05):
+    """ID of this session's saved profile once the background write is done (else None).
+
+    Waits at most ``timeout`` seconds so a queued save never holds up the page;
+    until it lands the caller excludes the user by name (nothing to exclude for guests).
+    """
+    future = st.session_state.get("saved_profile_future")
+    if future is not None:
+        try:
+            st.session_state.saved_profile_id = future.result(timeout=timeout)
+            st.session_state.saved_profile_future = None
+        except FutureTimeoutError:
+            return None
+        except Exception as e:
+            st.error(f"Error saving profile: {e}")
+            st.session_state.saved_profile_future = None
+    return st.session_state.get("saved_profile_id")
+
+# ---------------------------------------------------------
+# User Management Functions
+# ---------------------------------------------------------
+USERS_FILE = DEFAULT_DB_FILE.parent / "users.json"
+
+# Cache for users (avoids repeated reading)
+@st.cache_resource
+def get_users_cache():
+    return {"data": None, "last_modified": None}
+
+@db_timed
+def load_users():
+    """Load users.json with local cache"""
+    cache = get_users_cache()
+    
+    if not os.path.exists(USERS_FILE):
+        return {}
+    
+    try:
+        stat = os.stat(USERS_FILE)
+        current_mtime = stat.st_mtime
+        
+        # Is cache current?
+        if cache["data"] is not None and cache["last_modified"] == current_mtime:
+            return cache["data"]
+        
+        # Reload
+        with open(USERS_FILE, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        
+        cache["data"] = data
+        cache["last_modified"] = current_mtime
+        return data
+    except Exception as e:
+        st.error(f"Error loading: {e}")
+        return {}
+
+@db_timed
+def save_users(users):
+    """Speichere users.json und invalidiere Cache"""
+    try:
+        # Ensure directory exists
+        USERS_FILE.parent.mkdir(parents=True, exist_ok=True)
+        
+        with open(USERS_FILE, "w", encoding="utf-8") as f:
+            json.dump(users, f, ensure_ascii=False, indent=2)
+        
+        # Invalidate cache
+        cache = get_users_cache()
+        cache["data"] = None
+        cache["last_modified"] = None
+    except Exception as e:
+        st.error(f"Error saving: {e}")
+
+# ---------------------------------------------------------
+# Peer comparison: Load, Filter, Aggregate
+# ---------------------------------------------------------
+# Loaded once per process, afterwards only new rows are pulled
+@st.cache_resource
+def get_peer_store():
+    return PeerStore()
+
+@db_timed
+def get_peer_stats(exclude_username=None, exclude_profile_id=None):
+    """Load all profiles (users + guests) for peer comparison.
+       Guests: username = ''.
+       Served from the pre-aggregated peer cube; excluding a whole user needs
+       per-profile data and falls back to the columnar peer store.
+    """
+    with get_db().connection() as conn:
+        if exclude_username:
+            store = get_peer_store()
+            store.refresh(conn)
+            return store.snapshot(exclude_username=exclude_username)
+        return PeerCube.load(conn, exclude_profile_id=exclude_profile_id)
+
+
+# Built on first use, afterwards only new profiles are hashed in
+@st.cache_resource
+def get_neighbor_index():
+    return NeighborIndex()
+
+@db_timed
+def get_similar_profiles(scores, k: int, exclude_profile_id=None):
+    """The k stored profiles whose score vectors are closest to ``scores``.
+
+       Returned as a PeerView, so the section-9 aggregates work on it unchanged.
+    """
+    with get_db().connection() as conn:
+        index = get_neighbor_index()
+        index.refresh(conn)
+        ids, _ = index.query(score_features(scores), k, exclude_id=exclude_profile_id)
+        return neighbor_view(conn, ids)
+
+# ---------------------------------------------------------
+# Risk characters (k-means clusters, see neurorisk.clusters)
+# ---------------------------------------------------------
+# Seconds between background retrainings (only if new profiles arrived)
+CLUSTER_INTERVAL = float(os.environ.get("NEURORISK_CLUSTER_INTERVAL", 6 * 3600))
+
+@st.cache_resource
+def get_cluster_service():
+    service = ClusterService(get_db(), DB_FILE, interval=CLUSTER_INTERVAL).start()
+    REGISTRY.add_collector("clusters", lambda: _cluster_samples(service))
+    return service
+
+def _cluster_samples(service) -> list:
+    model = service.model
+    return [
+        ("neurorisk_cluster_model_version", "gauge", "Cluster model version in use (0 = none yet)",
+         model.version if model else 0),
+        ("neurorisk_cluster_trainings_total", "counter", "Background cluster trainings", service.stats["trainings"]),
+        ("neurorisk_cluster_training_failures_total", "counter", "Background cluster trainings that failed",
+         service.stats["failures"]),
+        ("neurorisk_cluster_training_seconds", "gauge", "Duration of the last cluster training",
+         service.stats["last_training_seconds"]),
+    ]
+
+def get_risk_character(scores):
+    """(character, model) of these scores under the current cluster model; (None, None) before the first training."""
+    model = get_cluster_service().model
+    if model is None:
+        return None, None
+    return model.character(model.assign(score_features(scores))), model
+
+# ---------------------------------------------------------
+# What-if: panic probability and crisis stress (see neurorisk.panic / .stress)
+# ---------------------------------------------------------
+def _model_mtime(path):
+    try:
+        return path.stat().st_mtime_ns
+    except FileNotFoundError:
+        return None
+
+# Coefficient file written by ``python -m neurorisk.panic``; reloaded whenever it is replaced
+PANIC_MODEL_FILE = Path(os.environ.get("NEURORISK_PANIC_MODEL", DB_FILE.with_suffix(".panic.json")))
+
+@st.cache_resource(max_entries=1)
+def _load_panic_model(path, mtime):
+    return PanicModel.load(path)
+
+def get_panic_model():
+    return _load_panic_model(PANIC_MODEL_FILE, _model_mtime(PANIC_MODEL_FILE))
+
+def predict_panic(responses):
+    """(prediction, model) for this session; (None, None) until a model was trained."""
+    model = get_panic_model()
+    if model is None:
+        return None, None
+    return model.predict(responses), model
+
+# Model file written by ``python -m neurorisk.stress``; reloaded whenever it is replaced
+STRESS_MODEL_FILE = Path(os.environ.get("NEURORISK_STRESS_MODEL", DB_FILE.with_suffix(".stress.json")))
+
+@st.cache_resource(max_entries=1)
+def _load_stress_model(path, mtime):
+    return StressModel.load(path)
+
+def get_stress_model():
+    return _load_stress_model(STRESS_MODEL_FILE, _model_mtime(STRESS_MODEL_FILE))
+
+def forecast_stress(responses):
+    """(crisis stress forecast from the calm and boom answers, model); (None, None) without a model."""
+    model = get_stress_model()
+    if model is None:
+        return None, None
+    return model.forecast(responses), model
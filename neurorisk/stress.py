@@ -0,0 +1,282 @@
+"""Crisis stress forecast: ridge regression from the calm and boom answers.
+
+The target is a session's crisis stress level, the crisis mean of ``stress_i``
+as ``compute_scores`` defines it (weighted z-scores of reaction time and
+pulse against the whole session). The features only use the calm and boom
+answers, so a forecast is available before the crisis phase is answered:
+
+* how much reaction time and pulse rise from calm to boom (mean boom z-score);
+* reaction time level and spread (log mean, coefficient of variation);
+* pulse level and spread;
+* risk taking in calm and boom, and the switch_action rate.
+
+Training streams ``responses`` like ``neurorisk.panic`` and only accumulates
+the sufficient statistics of a linear model (the Gram matrix of the features
+plus intercept, and its products with the target), so memory does not grow
+with the number of profiles. The ridge solution is computed from them on
+standardized features. Profiles with ``id % HOLDOUT_EVERY == 0`` accumulate
+separately; their RMSE and R² follow exactly from the same statistics.
+
+Every training writes the next model version to a small JSON file, read once
+per app process::
+
+    python -m neurorisk.stress --db neurorisk.db     # writes neurorisk.stress.json
+"""
+import argparse
+import json
+import logging
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+from neurorisk.panic import (
+    CHUNK_ROWS,
+    HOLDOUT_EVERY,
+    PHASE_CODES,
+    group_mean,
+    group_zscore,
+    iter_response_arrays,
+    save_model,
+)
+from neurorisk.questions import SCENARIO_QUESTIONS
+
+log = logging.getLogger(__name__)
+
+MODEL_FORMAT = 1
+RIDGE = 1.0
+MIN_PROFILES = 300
+
+FEATURE_NAMES = [
+    "rt_boom_z",
+    "pulse_boom_z",
+    "rt_log",
+    "rt_cv",
+    "pulse_mean",
+    "pulse_sd",
+    "risk_calm",
+    "risk_boom",
+    "switch_rate",
+]
+
+_RISK_RELEVANT = [q["id"] for q in SCENARIO_QUESTIONS if q.get("risk_relevant", True)]
+_CALM, _BOOM, _CRISIS = PHASE_CODES["calm"], PHASE_CODES["boom"], PHASE_CODES["crisis"]
+
+
+# ---------------------------------------------------------
+# Features and target
+# ---------------------------------------------------------
+def _group_std(group, n, values, mask):
+    mean = group_mean(group, n, values, mask)
+    return np.sqrt(np.maximum(group_mean(group, n, values ** 2, mask) - mean ** 2, 0.0)), mean
+
+
+def session_features(group, n, q_id, phase, risk, reaction_time, pulse, switch):
+    """n × features matrix from flat response arrays (see neurorisk.panic.session_features).
+
+    Rows outside the calm and boom phases are ignored; NaN where a session has none.
+    """
+    before = (phase == _CALM) | (phase == _BOOM)
+    boom = phase == _BOOM
+    risky = before & np.isin(q_id, _RISK_RELEVANT)
+    rt_sd, rt_mean = _group_std(group, n, reaction_time, before)
+    pulse_sd, pulse_mean = _group_std(group, n, pulse, before)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        features = np.column_stack([
+            group_mean(group, n, group_zscore(group, n, reaction_time, before), boom),
+            group_mean(group, n, group_zscore(group, n, pulse, before), boom),
+            np.log(rt_mean),
+            rt_sd / rt_mean,
+            pulse_mean,
+            pulse_sd,
+            group_mean(group, n, risk, risky & (phase == _CALM)),
+            group_mean(group, n, risk, risky & boom),
+            group_mean(group, n, switch, before),
+        ])
+    features[~np.isfinite(features)] = np.nan
+    return features
+
+
+def session_targets(group, n, phase, reaction_time, pulse):
+    """Crisis stress level per session (NaN without crisis answers), as compute_scores computes it."""
+    from neurorisk.scoring import STRESS_WEIGHT_PULSE, STRESS_WEIGHT_RT  # scoring pulls in pandas
+
+    every = np.ones(len(group), dtype=bool)
+    stress = (STRESS_WEIGHT_RT * group_zscore(group, n, reaction_time, every)
+              + STRESS_WEIGHT_PULSE * group_zscore(group, n, pulse, every))
+    return group_mean(group, n, stress, phase == _CRISIS)
+
+
+def response_features(responses):
+    """Feature row of one session's response dicts; crisis answers, if any, are ignored."""
+    columns = ("q_id", "phase", "x_risk_relative", "x_reaction_time", "x_pulse", "switch_action")
+    rows = [
+        tuple(np.nan if r.get(c) is None else (PHASE_CODES.get(r[c], -1) if c == "phase" else r[c])
+              for c in columns)
+        for r in responses
+    ]
+    arrays = np.array(rows, dtype=np.float64).reshape(-1, len(columns)).T
+    q_id, phase = arrays[0].astype(np.int64), arrays[1].astype(np.int64)
+    return session_features(np.zeros(len(rows), dtype=np.int64), 1, q_id, phase, *arrays[2:])[0]
+
+
+# ---------------------------------------------------------
+# Training
+# ---------------------------------------------------------
+class Moments:
+    """Running X'X, X'y and y'y of [features, 1] rows against a target."""
+
+    def __init__(self, dims: int):
+        self.xx = np.zeros((dims + 1, dims + 1))
+        self.xy = np.zeros(dims + 1)
+        self.yy = 0.0
+
+    @property
+    def n(self) -> int:
+        return int(round(self.xx[-1, -1]))
+
+    def add(self, x, y):
+        x1 = np.column_stack([x, np.ones(len(x))])
+        self.xx += x1.T @ x1
+        self.xy += x1.T @ y
+        self.yy += float(y @ y)
+
+    def sse(self, theta) -> float:
+        """Sum of squared errors of the linear predictor [coef, intercept] = theta."""
+        return max(self.yy - 2 * theta @ self.xy + theta @ self.xx @ theta, 0.0)
+
+
+def fit_ridge(moments: Moments, ridge: float = RIDGE):
+    """(mean, scale, coef on standardized features, intercept) from the training moments."""
+    n = moments.n
+    mean = moments.xx[:-1, -1] / n
+    y_mean = moments.xy[-1] / n
+    cov = moments.xx[:-1, :-1] / n - np.outer(mean, mean)
+    scale = np.sqrt(np.maximum(np.diag(cov), 0.0))
+    scale = np.where(scale > 1e-12, scale, 1.0)
+    gram = cov * n / np.outer(scale, scale)
+    cross = (moments.xy[:-1] / n - mean * y_mean) * n / scale
+    coef = np.linalg.solve(gram + ridge * np.eye(len(mean)), cross)
+    return mean, scale, coef, float(y_mean)
+
+
+def train(conn, chunk_rows: int = CHUNK_ROWS, holdout_every: int = HOLDOUT_EVERY, ridge: float = RIDGE,
+          version: int = 1):
+    """Fit the forecast over all stored sessions in one pass; None with too few profiles."""
+    fit, holdout = Moments(len(FEATURE_NAMES)), Moments(len(FEATURE_NAMES))
+    high_water = 0
+    for ids, group, q_id, phase, risk, reaction_time, pulse, switch in iter_response_arrays(conn, chunk_rows):
+        x = session_features(group, len(ids), q_id, phase, risk, reaction_time, pulse, switch)
+        y = session_targets(group, len(ids), phase, reaction_time, pulse)
+        usable = np.isfinite(y) & np.isfinite(x).all(axis=1)
+        test = ids % holdout_every == 0
+        fit.add(x[usable & ~test], y[usable & ~test])
+        holdout.add(x[usable & test], y[usable & test])
+        high_water = max(high_water, int(ids[-1]))
+    if fit.n < MIN_PROFILES:
+        return None
+
+    mean, scale, coef, y_mean = fit_ridge(fit, ridge)
+    # Same predictor on raw features, for the holdout error from its moments
+    theta = np.append(coef / scale, y_mean - (coef / scale) @ mean)
+    metrics = {"profiles": holdout.n}
+    if holdout.n:
+        h = holdout.n
+        sse = holdout.sse(theta)
+        sst = holdout.yy - holdout.xy[-1] ** 2 / h
+        baseline = holdout.sse(np.append(np.zeros(len(coef)), y_mean))
+        metrics.update(rmse=float(np.sqrt(sse / h)), r2=float(1 - sse / sst) if sst > 0 else float("nan"),
+                       baseline_rmse=float(np.sqrt(baseline / h)))
+    return {
+        "format": MODEL_FORMAT,
+        "version": version,
+        "features": FEATURE_NAMES,
+        "trained_at": time.time(),
+        "profiles": fit.n,
+        "high_water": high_water,
+        "mean": mean.tolist(),
+        "scale": scale.tolist(),
+        "coef": coef.tolist(),
+        "intercept": y_mean,
+        "holdout": metrics,
+    }
+
+
+def stored_version(path) -> int:
+    """Version of the model file at ``path`` (0 if there is none)."""
+    try:
+        return int(json.loads(Path(path).read_text(encoding="utf-8")).get("version", 0))
+    except (FileNotFoundError, ValueError):
+        return 0
+
+
+# ---------------------------------------------------------
+# Inference
+# ---------------------------------------------------------
+class StressModel:
+    """One fitted model version; ``forecast`` predicts crisis stress from a (partial) session."""
+
+    def __init__(self, model: dict):
+        self.version = model["version"]
+        self.trained_at = model["trained_at"]
+        self.profiles = model["profiles"]
+        self.holdout = model["holdout"]
+        self.mean = np.array(model["mean"])
+        self.scale = np.array(model["scale"])
+        self.coef = np.array(model["coef"])
+        self.intercept = model["intercept"]
+
+    @classmethod
+    def load(cls, path):
+        """The model stored at ``path``, or None if there is none (yet) or it does not fit this code."""
+        try:
+            model = json.loads(Path(path).read_text(encoding="utf-8"))
+        except FileNotFoundError:
+            return None
+        if model.get("format") != MODEL_FORMAT or model.get("features") != FEATURE_NAMES:
+            log.warning("stress model %s was trained on other features; retrain", path)
+            return None
+        try:
+            return cls(model)
+        except KeyError as e:
+            log.warning("stress model %s lacks %s; retrain", path, e)
+            return None
+
+    def forecast(self, responses):
+        """Expected crisis stress level; None before any calm or boom answer."""
+        x = response_features(responses)
+        if np.isnan(x).all():
+            return None
+        z = np.nan_to_num((x - self.mean) / self.scale)   # missing features sit at the mean
+        return float(z @ self.coef + self.intercept)
+
+
+def main(argv=None):
+    from neurorisk.db import DEFAULT_DB_FILE, ConnectionManager
+
+    parser = argparse.ArgumentParser(description="Train the crisis-stress forecast and write its next model version.")
+    parser.add_argument("--db", default=str(DEFAULT_DB_FILE))
+    parser.add_argument("--out", help="model file (default: the DB path with suffix .stress.json)")
+    parser.add_argument("--chunk-rows", type=int, default=CHUNK_ROWS)
+    args = parser.parse_args(argv)
+
+    out = Path(args.out or Path(args.db).with_suffix(".stress.json"))
+    db = ConnectionManager(args.db)
+    start = time.perf_counter()
+    with db.connection() as conn:
+        model = train(conn, args.chunk_rows, version=stored_version(out) + 1)
+    if model is None:
+        sys.exit(f"need at least {MIN_PROFILES} complete sessions to train")
+    save_model(model, out)
+    holdout = model.get("holdout", {})
+    print(f"trained version {model['version']} on {model['profiles']} profiles in "
+          f"{time.perf_counter() - start:.2f}s, holdout RMSE {holdout.get('rmse', float('nan')):.3f} "
+          f"(predicting the mean: {holdout.get('baseline_rmse', float('nan')):.3f}), "
+          f"R² {holdout.get('r2', float('nan')):.3f} → {out}", file=sys.stderr)
+    for name, coef in zip(FEATURE_NAMES, model["coef"]):
+        print(f"  {name:<14} {coef:+.3f}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,277 @@
+"""Synthetic participants for load and scale testing.
+
+Fabricates complete guest sessions — demographics drawn from the options of the
+demographics form, one answer per scenario question with a reaction time and a
+pulse — scores them with the vectorized batch scorer and bulk-loads them into a
+profiles DB::
+
+    python -m neurorisk.synthetic --db /tmp/load.db --participants 1000000 --seed 7
+
+Each participant gets a latent risk appetite (driven by experience, goal,
+horizon and age) that shifts up in the boom and down in the crisis phase by
+personal amounts, a herding tendency for the crowd questions, and a stress
+reactivity that raises pulse, reaction time and the wish for advisor help as
+the market turns. Stated risk tolerance is the appetite plus a personal
+(mostly optimistic) misjudgement, so the reality gap is spread realistically.
+
+Participants are generated in blocks of ``BLOCK_SIZE``; block ``i`` draws from
+``numpy.random.default_rng([seed, i])`` and is written in order, so the same
+seed and participant count produce the same rows whatever ``--workers`` is.
+"""
+import argparse
+import sys
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from neurorisk.batch_scoring import BIAS_QUESTIONS, PHASE_CODES, SessionBatch, batch_score_dicts, score_batch
+from neurorisk.profiles import insert_profiles
+from neurorisk.questions import (
+    AGE_RANGE,
+    AMOUNT_FEEL_OPTIONS,
+    EXPERIENCE_OPTIONS,
+    GENDER_OPTIONS,
+    GOAL_OPTIONS,
+    HORIZON_OPTIONS,
+    INVEST_AMOUNT_RANGE,
+    INVESTMENT_OPTIONS,
+    KNOWLEDGE_RANGE,
+    RISK_CONSTANT_OPTIONS,
+    SCENARIO_QUESTIONS,
+    STATED_RISK_RANGE,
+    response_metadata,
+    stated_risk_norm,
+)
+
+BLOCK_SIZE = 1000
+
+# Share of participants per option (same order as the form's options)
+GENDER_P = [0.08, 0.45, 0.45, 0.02]
+EXPERIENCE_P = [0.20, 0.35, 0.30, 0.15]
+GOAL_P = [0.45, 0.20, 0.25, 0.10]
+HORIZON_P = [0.20, 0.40, 0.40]
+RISK_CONSTANT_P = [0.45, 0.35, 0.20]
+
+# Shift of the latent risk appetite per goal / horizon option
+GOAL_APPETITE = [0.0, -0.05, -0.20, 0.20]
+HORIZON_APPETITE = [-0.05, 0.0, 0.05]
+
+# How strongly each phase triggers a participant's stress reactivity
+PHASE_STRESS = {"calm": 0.0, "boom": 0.3, "crisis": 1.0}
+
+
+def _layout():
+    """Per-question arrays shared by every block."""
+    qs = SCENARIO_QUESTIONS
+    meta = [response_metadata(q["id"], None) for q in qs]
+    herd_levels = []
+    for q in qs:
+        majority = [o["risk_level"] for o in q["options"] if o["label"] == q.get("herd_majority")]
+        herd_levels.append(majority[0] if majority else 0)
+    return {
+        "q_ids": [q["id"] for q in qs],
+        "phases": [q["phase"] for q in qs],
+        "phase": np.array([PHASE_CODES[q["phase"]] for q in qs]),
+        "stress": np.array([PHASE_STRESS[q["phase"]] for q in qs]),
+        "risk_relevant": [m["risk_relevant"] for m in meta],
+        "herd": np.array([m["herd_majority_flag"] == 1 for m in meta]),
+        "herd_level": np.array(herd_levels),
+        # option index by risk level 1..4, per question
+        "option_by_level": [{o["risk_level"]: i for i, o in enumerate(q["options"])} for q in qs],
+    }
+
+
+# ---------------------------------------------------------
+# Drawing one block
+# ---------------------------------------------------------
+def _demographics(rng, n):
+    """Demographics dicts (as the form stores them) plus the latent risk appetite."""
+    age = np.clip(np.rint(rng.normal(42, 14, n)), *AGE_RANGE).astype(int)
+    gender = rng.choice(len(GENDER_OPTIONS), n, p=GENDER_P)
+    experience = rng.choice(len(EXPERIENCE_OPTIONS), n, p=EXPERIENCE_P)
+    knowledge = np.clip(np.rint(1.5 + experience + rng.normal(0, 0.8, n)), *KNOWLEDGE_RANGE).astype(int)
+    goal = rng.choice(len(GOAL_OPTIONS), n, p=GOAL_P)
+    horizon = rng.choice(len(HORIZON_OPTIONS), n, p=HORIZON_P)
+    amount = np.clip(np.rint(rng.lognormal(np.log(20_000), 1.0, n) / 1000) * 1000, *INVEST_AMOUNT_RANGE)
+    # The same amount feels larger to the inexperienced
+    feel = np.clip(np.rint(np.log10(amount) - 3.3 - 0.4 * experience + rng.normal(0, 0.5, n)), 0,
+                   len(AMOUNT_FEEL_OPTIONS) - 1).astype(int)
+    holds = rng.random((n, len(INVESTMENT_OPTIONS) - 1)) < (0.1 + 0.18 * experience)[:, None]
+    risk_constant = rng.choice(len(RISK_CONSTANT_OPTIONS), n, p=RISK_CONSTANT_P)
+
+    appetite = np.clip(
+        0.45 + 0.08 * (experience - 1.5) + np.take(GOAL_APPETITE, goal) + np.take(HORIZON_APPETITE, horizon)
+        - 0.003 * (age - 42) + rng.normal(0, 0.12, n),
+        0.0, 1.0,
+    )
+    lo, hi = STATED_RISK_RANGE
+    misjudgement = rng.normal(0.05, 0.12, n)
+    stated = np.clip(np.rint(lo + (hi - lo) * (appetite + misjudgement)), lo, hi).astype(int)
+
+    demographics = []
+    for i in range(n):
+        investments = [name for name, held in zip(INVESTMENT_OPTIONS, holds[i]) if held] or ["Nothing yet"]
+        demographics.append({
+            "age": int(age[i]),
+            "gender": GENDER_OPTIONS[gender[i]],
+            "job": "",
+            "knowledge": int(knowledge[i]),
+            "experience": EXPERIENCE_OPTIONS[experience[i]],
+            "goal": GOAL_OPTIONS[goal[i]],
+            "invest_amount": int(amount[i]),
+            "amount_feel": AMOUNT_FEEL_OPTIONS[feel[i]],
+            "current_investments": investments,
+            "horizon": HORIZON_OPTIONS[horizon[i]],
+            "stated_risk_raw": int(stated[i]),
+            "stated_risk_norm": stated_risk_norm(int(stated[i])),
+            "risk_constant_self_view": RISK_CONSTANT_OPTIONS[risk_constant[i]],
+        })
+    return demographics, appetite, experience
+
+
+def _answers(rng, layout, appetite, experience):
+    """(N, Q) arrays: chosen risk level 1..4, reaction times, pulses, help, follow_crowd."""
+    n, q = len(appetite), len(layout["q_ids"])
+
+    # Risk taking: personal euphoria in the boom, panic in the crisis
+    shift = np.zeros((n, len(PHASE_CODES)))
+    shift[:, PHASE_CODES["boom"]] = rng.normal(0.08, 0.08, n)
+    shift[:, PHASE_CODES["crisis"]] = -np.abs(rng.normal(0.18, 0.12, n))
+    noise = rng.uniform(0.08, 0.20, n)[:, None]
+    target = appetite[:, None] + shift[:, layout["phase"]] + rng.normal(0, 1, (n, q)) * noise
+    level = np.clip(np.rint(1 + 3 * target), 1, 4).astype(int)
+
+    herding = rng.beta(2, 5, n)[:, None]
+    level = np.where(layout["herd"] & (rng.random((n, q)) < herding), layout["herd_level"], level)
+    follow = layout["herd"] & (level == layout["herd_level"])  # also by coincidence, as the app counts it
+
+    # Stress: pulse, reaction time and advisor help rise with the phase's pressure
+    stress = rng.lognormal(0, 0.4, n)[:, None] * layout["stress"]
+    resting = rng.normal(72, 9, n)[:, None]
+    pulse = np.clip(np.rint(resting + 25 * stress + rng.normal(0, 4, (n, q))), 40, 180)
+    speed = rng.lognormal(np.log(7.0), 0.3, n)[:, None]
+    reaction_time = np.clip(speed * np.exp(0.35 * stress) * rng.lognormal(0, 0.35, (n, q)), 0.8, 120.0)
+    latency = rng.lognormal(np.log(0.25), 0.4, (n, q))  # rerun round trip on top of the browser time
+    help_logit = -2.5 + 0.5 * (1.5 - experience)[:, None] + 1.2 * stress
+    advisor_help = (rng.random((n, q)) < 1 / (1 + np.exp(-help_logit))).astype(int)
+
+    return level, reaction_time, latency, pulse, advisor_help, follow.astype(int)
+
+
+def make_block(seed: int, block: int, n: int = BLOCK_SIZE) -> list:
+    """Block ``block`` of the population: (username, demographics, responses, scores) per participant."""
+    rng = np.random.default_rng([seed, block])
+    layout = _layout()
+    demographics, appetite, experience = _demographics(rng, n)
+    level, reaction_time, latency, pulse, advisor_help, follow = _answers(rng, layout, appetite, experience)
+
+    risk = (level - 1) / 3.0
+    prev = np.concatenate([risk[:, :1], risk[:, :-1]], axis=1)
+    switch = (np.abs(risk - prev) > 0.5).astype(int)
+    options = np.array([[lv[k] for k in (1, 2, 3, 4)] for lv in layout["option_by_level"]])
+    chosen = options[np.arange(len(layout["q_ids"])), level - 1]  # (N, Q) option index
+
+    labels = {}
+    for _, q_id, _ in BIAS_QUESTIONS:
+        if q_id in layout["q_ids"]:
+            j = layout["q_ids"].index(q_id)
+            labels[q_id] = (chosen[:, j], [o["label"] for o in SCENARIO_QUESTIONS[j]["options"]])
+    batch = SessionBatch(
+        q_ids=layout["q_ids"], phase=layout["phase"], risk_relevant=layout["risk_relevant"],
+        herd=layout["herd"], risk=risk, reaction_time=reaction_time, pulse=pulse,
+        help=advisor_help, switch=switch, follow_crowd=follow,
+        stated_risk=[d["stated_risk_norm"] for d in demographics], labels=labels,
+    )
+    scores = batch_score_dicts(score_batch(batch))
+
+    # Plain Python lists: much cheaper to index than NumPy scalars in the per-response loop
+    labels_by_q = [[o["label"] for o in q["options"]] for q in SCENARIO_QUESTIONS]
+    server_rt = (reaction_time + latency).tolist()
+    columns = zip(chosen.tolist(), risk.tolist(), reaction_time.tolist(), server_rt, pulse.tolist(),
+                  advisor_help.tolist(), switch.tolist())
+    sessions = []
+    for demo, session_scores, (opt, rk, rt, srt, pl, hp, sw) in zip(demographics, scores, columns):
+        responses = [
+            {
+                "q_id": q_id,
+                "phase": phase,
+                "selected_label": labels[opt[j]],
+                "mu": None,
+                "sigma": None,
+                "x_risk_relative": rk[j],
+                "x_reaction_time": rt[j],
+                "x_pulse": pl[j],
+                "advisor_help_used": hp[j],
+                "switch_action": sw[j],
+                "client_reaction_time": rt[j],
+                "server_reaction_time": srt[j],
+            }
+            for j, (q_id, phase, labels) in enumerate(zip(layout["q_ids"], layout["phases"], labels_by_q))
+        ]
+        sessions.append(("", demo, responses, session_scores))  # guests, as save_guest_profile stores them
+    return sessions
+
+
+# ---------------------------------------------------------
+# Bulk load
+# ---------------------------------------------------------
+def populate(conn, participants: int, seed: int = 0, workers: int = None, progress=None) -> dict:
+    """Generate ``participants`` sessions and insert them, one transaction per block."""
+    stats = {"total": participants, "done": 0, "seconds": 0.0}
+    start = time.perf_counter()
+    sizes = [min(BLOCK_SIZE, participants - first) for first in range(0, participants, BLOCK_SIZE)]
+    window = max(2, (workers or 2) * 2)
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        in_flight = deque()
+
+        def drain():
+            # Oldest block first, so row ids do not depend on worker timing
+            sessions = in_flight.popleft().result()
+            insert_profiles(conn, sessions)
+            conn.commit()
+            stats["done"] += len(sessions)
+            stats["seconds"] = time.perf_counter() - start
+            if progress:
+                progress(stats)
+
+        for block, size in enumerate(sizes):
+            in_flight.append(pool.submit(make_block, seed, block, size))
+            if len(in_flight) >= window:
+                drain()
+        while in_flight:
+            drain()
+
+    stats["seconds"] = time.perf_counter() - start
+    return stats
+
+
+def _print_progress(stats):
+    rate = stats["done"] / stats["seconds"] if stats["seconds"] > 0 else 0.0
+    print(f"\r{stats['done']}/{stats['total']} participants ({rate:,.0f}/s)", end="", file=sys.stderr, flush=True)
+
+
+def main(argv=None):
+    from neurorisk.db import ConnectionManager
+    from neurorisk.schema import init_schema
+
+    parser = argparse.ArgumentParser(description="Fill a profiles DB with synthetic participants.")
+    parser.add_argument("--db", required=True, help="target DB (created if missing)")
+    parser.add_argument("--participants", type=int, default=10_000)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--workers", type=int, default=None, help="processes (default: CPU count)")
+    args = parser.parse_args(argv)
+
+    db = ConnectionManager(args.db)
+    with db.connection() as conn:
+        init_schema(conn)
+        stats = populate(conn, args.participants, args.seed, args.workers, progress=_print_progress)
+    rate = stats["done"] / stats["seconds"] if stats["seconds"] > 0 else 0.0
+    print(f"\nloaded {stats['done']} participants ({stats['done'] * len(SCENARIO_QUESTIONS)} responses) "
+          f"in {stats['seconds']:.2f}s ({rate:,.0f}/s)", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
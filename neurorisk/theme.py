@@ -0,0 +1,570 @@
+"""Design system: colors and the global CSS of the app.
+
+The CSS strings are built once at import; ``inject_css`` still has to run on
+every rerun because Streamlit only keeps elements emitted by the current run.
+"""
+import streamlit as st
+
+PRIMARY_COLOR = "#06436D"
+SECONDARY_COLOR = "#0B6AA4"
+ACCENT_COLOR = "#F0F6FB"
+SUCCESS_COLOR = "#10B981"
+WARNING_COLOR = "#F59E0B"
+DANGER_COLOR = "#EF4444"
+TEXT_PRIMARY = "#1F2937"
+TEXT_SECONDARY = "#6B7280"
+TEXT_BUTTON = "#FFFFFF"  # White text for buttons
+BACKGROUND_LIGHT = "#FFFFFF"
+BACKGROUND_SUBTLE = "#F9FAFB"
+BORDER_COLOR = "#E5E7EB"
+
+# Cards and phase intro boxes
+BASE_CSS = f"""
+    <style>
+    /* Additional styles - does NOT override button styles */
+    .neuro-card {{
+        padding: 1rem 1.25rem;
+        border-radius: 0.75rem;
+        border: 1px solid #e5e7eb;
+        background-color: #f9fafb;
+        margin-bottom: 1rem;
+    }}
+    .neuro-phase-intro {{
+        padding: 1.25rem 1.5rem;
+        border-radius: 0.75rem;
+        border: 1px solid #d1e3f0;
+        background-color: #f2f7fb;
+        margin-bottom: 1rem;
+    }}
+    </style>
+    """
+
+# GLOBAL CSS – Professional B2C Design
+GLOBAL_CSS = f"""
+    <style>
+    /* Force light theme regardless of device settings */
+    :root {{
+        color-scheme: light !important;
+    }}
+    html, body, .stApp,
+    [data-testid="stAppViewContainer"],
+    [data-testid="stHeader"],
+    [data-testid="stSidebar"],
+    .main, .block-container {{
+        background-color: #ffffff !important;
+        color: {TEXT_PRIMARY} !important;
+    }}
+    @media (prefers-color-scheme: dark) {{
+        :root {{ color-scheme: light !important; }}
+        html, body, .stApp,
+        [data-testid="stAppViewContainer"],
+        [data-testid="stHeader"],
+        [data-testid="stSidebar"],
+        .main, .block-container {{
+            background-color: #ffffff !important;
+            color: {TEXT_PRIMARY} !important;
+        }}
+    }}
+
+    /* ===== TYPOGRAPHY ===== */
+    @import url('https://fonts.googleapis.com/css2?family=Inter:wght@400;500;600;700;800&display=swap');
+    
+    html, body, [class*="css"] {{
+        font-family: 'Inter', -apple-system, BlinkMacSystemFont, 'Segoe UI', sans-serif;
+        color: {TEXT_PRIMARY};
+    }}
+    
+    h1, h2, h3, h4, h5, h6 {{
+        font-family: 'Inter', sans-serif;
+        color: {PRIMARY_COLOR};
+        font-weight: 700;
+        letter-spacing: -0.02em;
+    }}
+    
+    h1 {{ font-size: 2.5rem; line-height: 1.2; }}
+    h2 {{ font-size: 1.875rem; line-height: 1.3; }}
+    h3 {{ font-size: 1.5rem; line-height: 1.4; }}
+    h4 {{ font-size: 0.8rem; line-height: 0.9; }}
+    
+    p, li {{ 
+        color: {TEXT_SECONDARY}; 
+        line-height: 1.6;
+        font-size: 1rem;
+    }}
+ 
+
+    /* ===== LAYOUT CONTAINER ===== */
+    .main .block-container {{
+        max-width: 900px;
+        padding: 2rem 1.5rem 4rem;
+    }}
+    
+     /* ===== DECORATIVE CIRCLES (Brand Element) - MEHRERE KREISE ===== */
+    .neuro-bg-circles {{
+        position: absolute !important;
+        top: 0 !important;
+        left: 0 !important;
+        width: 100% !important;
+        height: 100% !important;
+        pointer-events: none !important;
+        z-index: 0 !important;
+        overflow: visible !important;
+    }}
+    
+    /* Kreis 1: Oben links */
+    .neuro-bg-circles::before {{
+        content: '' !important;
+        position: absolute !important;
+        top: -250px !important;
+        left: -500px !important;
+        width: 400px !important;
+        height: 400px !important;
+        border-radius: 50% !important;
+        border: 60px solid {PRIMARY_COLOR} !important;
+        opacity: 1 !important;
+        pointer-events: none !important;
+    }}
+
+ 
+
+    /* ===== CARDS ===== */
+    .neuro-card {{
+        background: {BACKGROUND_LIGHT};
+        border: 1px solid {BORDER_COLOR};
+        border-radius: 16px;
+        padding: 1.5rem;
+        margin-bottom: 1.25rem;
+        box-shadow: 0 1px 3px rgba(0,0,0,0.04), 0 1px 2px rgba(0,0,0,0.06);
+        transition: box-shadow 0.2s ease, transform 0.2s ease;
+    }}
+    
+    .neuro-card:hover {{
+        box-shadow: 0 4px 12px rgba(6,67,109,0.08);
+    }}
+    
+    .neuro-card h3 {{
+        margin-top: 0;
+        margin-bottom: 0.75rem;
+        font-size: 1.25rem;
+    }}
+    
+    .neuro-card p {{
+        margin-bottom: 0;
+    }}
+    
+    /* Hero Card */
+    .neuro-hero {{
+        background: linear-gradient(135deg, {ACCENT_COLOR} 0%, {BACKGROUND_LIGHT} 100%);
+        border: 1px solid {PRIMARY_COLOR}20;
+        border-radius: 20px;
+        padding: 2.5rem 2rem;
+        text-align: center;
+        margin-bottom: 2rem;
+    }}
+    
+    .neuro-hero h2 {{
+        font-size: 1.75rem;
+        margin-bottom: 1rem;
+        color: {PRIMARY_COLOR};
+    }}
+    
+    .neuro-hero p {{
+        font-size: 1.1rem;
+        color: {TEXT_SECONDARY};
+        max-width: 600px;
+        margin: 0 auto 1.5rem;
+    }}
+    
+    /* Phase Intro Card */
+    .neuro-phase-intro {{
+        background: linear-gradient(135deg, {ACCENT_COLOR} 0%, #E8F4FD 100%);
+        border: 1px solid {PRIMARY_COLOR}25;
+        border-radius: 16px;
+        padding: 1.75rem;
+        margin-bottom: 1.5rem;
+    }}
+    
+    .neuro-phase-intro h3 {{
+        color: {PRIMARY_COLOR};
+        margin-top: 0;
+    }}
+    
+    /* Glass Card (for questions) */
+    .neuro-glass {{
+        background: rgba(255,255,255,0.85);
+        backdrop-filter: blur(10px);
+        -webkit-backdrop-filter: blur(10px);
+        border: 1px solid rgba(6,67,109,0.1);
+        border-radius: 16px;
+        padding: 1.5rem;
+        margin-bottom: 1rem;
+    }}
+    
+    /* ===== BUTTONS ===== */
+    .stButton > button {{
+        background: linear-gradient(135deg, {PRIMARY_COLOR} 0%, {SECONDARY_COLOR} 100%) !important;
+        color: {TEXT_BUTTON} !important;
+        border: none !important;
+        border-radius: 12px !important;
+        padding: 0.75rem 1.75rem !important;
+        font-weight: 600 !important;
+        font-size: 1rem !important;
+        letter-spacing: 0.01em !important;
+        transition: all 0.2s ease !important;
+        box-shadow: 0 2px 8px rgba(6,67,109,0.25) !important;
+    }}
+    
+    .stButton > button:hover {{
+        transform: translateY(-1px) !important;
+        box-shadow: 0 4px 16px rgba(6,67,109,0.35) !important;
+        color: {TEXT_BUTTON} !important;
+    }}
+    
+    .stButton > button:active {{
+        transform: translateY(0) !important;
+        color: {TEXT_BUTTON} !important;
+    }}
+    
+    .stButton > button p,
+    .stButton > button span,
+    .stButton > button div {{
+        color: {TEXT_BUTTON} !important;
+    }}
+    
+    /* Form Submit Buttons */
+    .stFormSubmitButton > button {{
+        background: linear-gradient(135deg, {PRIMARY_COLOR} 0%, {SECONDARY_COLOR} 100%) !important;
+        color: {TEXT_BUTTON} !important;
+        border: none !important;
+        border-radius: 12px !important;
+        padding: 0.75rem 1.75rem !important;
+        font-weight: 600 !important;
+        font-size: 1rem !important;
+        letter-spacing: 0.01em !important;
+        transition: all 0.2s ease !important;
+        box-shadow: 0 2px 8px rgba(6,67,109,0.25) !important;
+    }}
+    
+    .stFormSubmitButton > button:hover {{
+        transform: translateY(-1px) !important;
+        box-shadow: 0 4px 16px rgba(6,67,109,0.35) !important;
+        color: {TEXT_BUTTON} !important;
+    }}
+    
+    .stFormSubmitButton > button p,
+    .stFormSubmitButton > button span,
+    .stFormSubmitButton > button div {{
+        color: {TEXT_BUTTON} !important;
+    }}
+
+    /* Secondary Button Style */
+    .secondary-btn > button {{
+        background: transparent !important;
+        color: {PRIMARY_COLOR} !important;
+        border: 2px solid {PRIMARY_COLOR} !important;
+        box-shadow: none !important;
+    }}
+    
+    .secondary-btn > button:hover {{
+        background: {ACCENT_COLOR} !important;
+        box-shadow: none !important;
+    }}
+    
+    /* ===== PROGRESS STEPPER ===== */
+    .neuro-stepper {{
+        display: flex;
+        justify-content: center;
+        align-items: center;
+        gap: 0.5rem;
+        margin: 1.5rem 0 2rem;
+        padding: 1rem;
+        background: {BACKGROUND_SUBTLE};
+        border-radius: 12px;
+    }}
+    
+    .neuro-step {{
+        display: flex;
+        align-items: center;
+        gap: 0.5rem;
+    }}
+    
+    .neuro-step-dot {{
+        width: 32px;
+        height: 32px;
+        border-radius: 50%;
+        display: flex;
+        align-items: center;
+        justify-content: center;
+        font-weight: 600;
+        font-size: 0.875rem;
+        transition: all 0.3s ease;
+    }}
+    
+    .neuro-step-dot.active {{
+        background: {PRIMARY_COLOR};
+        color: white;
+    }}
+    
+    .neuro-step-dot.completed {{
+        background: {SUCCESS_COLOR};
+        color: white;
+    }}
+    
+    .neuro-step-dot.inactive {{
+        background: {BORDER_COLOR};
+        color: {TEXT_SECONDARY};
+    }}
+    
+    .neuro-step-label {{
+        font-size: 0.875rem;
+        font-weight: 500;
+        color: {TEXT_SECONDARY};
+    }}
+    
+    .neuro-step-label.active {{
+        color: {PRIMARY_COLOR};
+        font-weight: 600;
+    }}
+    
+    .neuro-step-connector {{
+        width: 40px;
+        height: 2px;
+        background: {BORDER_COLOR};
+        margin: 0 0.25rem;
+    }}
+    
+    .neuro-step-connector.completed {{
+        background: {SUCCESS_COLOR};
+    }}
+    
+    /* ===== METRICS / KPIs ===== */
+    .neuro-metric {{
+        background: {BACKGROUND_LIGHT};
+        border: 1px solid {BORDER_COLOR};
+        border-radius: 12px;
+        padding: 1.25rem;
+        text-align: center;
+    }}
+    
+    .neuro-metric-value {{
+        font-size: 2rem;
+        font-weight: 700;
+        color: {PRIMARY_COLOR};
+        line-height: 1.2;
+    }}
+    
+    .neuro-metric-label {{
+        font-size: 0.875rem;
+        color: {TEXT_SECONDARY};
+        margin-top: 0.25rem;
+    }}
+    
+    .neuro-metric-delta {{
+        font-size: 0.8rem;
+        font-weight: 500;
+        margin-top: 0.5rem;
+    }}
+    
+    .neuro-metric-delta.positive {{ color: {SUCCESS_COLOR}; }}
+    .neuro-metric-delta.negative {{ color: {DANGER_COLOR}; }}
+    .neuro-metric-delta.neutral {{ color: {TEXT_SECONDARY}; }}
+    
+    /* ===== BADGES ===== */
+    .neuro-badge {{
+        display: inline-block;
+        padding: 0.25rem 0.75rem;
+        border-radius: 999px;
+        font-size: 0.75rem;
+        font-weight: 600;
+        text-transform: uppercase;
+        letter-spacing: 0.05em;
+    }}
+    
+    .neuro-badge.calm {{ background: #DBEAFE; color: #1E40AF; }}
+    .neuro-badge.boom {{ background: #D1FAE5; color: #065F46; }}
+    .neuro-badge.crisis {{ background: #FEE2E2; color: #991B1B; }}
+    .neuro-badge.info {{ background: {ACCENT_COLOR}; color: {PRIMARY_COLOR}; }}
+    
+    /* ===== TABS OVERRIDE ===== */
+    .stTabs [data-baseweb="tab-list"] {{
+        gap: 0.5rem;
+        background: {BACKGROUND_SUBTLE};
+        padding: 0.5rem;
+        border-radius: 12px;
+    }}
+    
+    .stTabs [data-baseweb="tab"] {{
+        border-radius: 8px;
+        padding: 0.75rem 1.25rem;
+        font-weight: 500;
+        color: {TEXT_SECONDARY};
+    }}
+    
+    .stTabs [aria-selected="true"] {{
+        background: {BACKGROUND_LIGHT} !important;
+        color: {PRIMARY_COLOR} !important;
+        font-weight: 600;
+        box-shadow: 0 1px 3px rgba(0,0,0,0.1);
+    }}
+    
+    /* ===== EXPANDER ===== */
+    .streamlit-expanderHeader {{
+        background: {BACKGROUND_SUBTLE};
+        border-radius: 12px;
+        font-weight: 600;
+        color: {PRIMARY_COLOR};
+    }}
+    
+    /* ===== RADIO BUTTONS ===== */
+    .stRadio > div {{
+        gap: 0.5rem;
+    }}
+    
+    .stRadio > label {{
+        background: transparent !important;
+        border: none !important;
+        padding: 0 !important;
+        font-weight: 600;
+        color: {TEXT_PRIMARY};
+    }}
+    
+    .stRadio [data-testid="stWidgetLabel"] {{
+        background: transparent !important;
+        border: none !important;
+        padding: 0 !important;
+    }}
+    
+    .stRadio [role="radiogroup"] > label {{
+        background: {BACKGROUND_LIGHT};
+        border: 2px solid {BORDER_COLOR};
+        border-radius: 12px;
+        padding: 1rem 1.25rem;
+        cursor: pointer;
+        transition: all 0.2s ease;
+    }}
+    
+    .stRadio [role="radiogroup"] > label:hover {{
+        border-color: {PRIMARY_COLOR}50;
+        background: {ACCENT_COLOR};
+    }}
+    
+    .stRadio [role="radiogroup"] > label:has(input:checked) {{
+        border-color: {PRIMARY_COLOR};
+        background: {ACCENT_COLOR};
+    }}
+    
+    /* ===== INFO BOX ===== */
+    .neuro-info {{
+        background: {ACCENT_COLOR};
+        border-left: 4px solid {PRIMARY_COLOR};
+        border-radius: 0 12px 12px 0;
+        padding: 1rem 1.25rem;
+        margin: 1rem 0;
+    }}
+    
+    .neuro-info p {{
+        margin: 0;
+        color: {PRIMARY_COLOR};
+        font-size: 0.95rem;
+    }}
+    
+    /* ===== FOOTER ===== */
+    .neuro-footer {{
+        background: {BACKGROUND_SUBTLE};
+        border-top: 1px solid {BORDER_COLOR};
+        padding: 2rem 1.5rem;
+        margin-top: 4rem;
+        text-align: center;
+        border-radius: 16px 16px 0 0;
+    }}
+    
+    .neuro-footer p {{
+        font-size: 0.875rem;
+        color: {TEXT_SECONDARY};
+        margin: 0.25rem 0;
+    }}
+    
+    .neuro-footer a {{
+        color: {PRIMARY_COLOR};
+        text-decoration: none;
+        font-weight: 500;
+    }}
+    
+    .neuro-footer a:hover {{
+        text-decoration: underline;
+    }}
+    
+    /* ===== FEATURE TILES ===== */
+    .neuro-feature {{
+        background: {BACKGROUND_LIGHT};
+        border: 1px solid {BORDER_COLOR};
+        border-radius: 16px;
+        padding: 1.5rem;
+        text-align: center;
+        height: 100%;
+        transition: all 0.2s ease;
+    }}
+    
+    .neuro-feature:hover {{
+        border-color: {PRIMARY_COLOR}30;
+        box-shadow: 0 4px 12px rgba(6,67,109,0.08);
+    }}
+    
+    .neuro-feature-icon {{
+        font-size: 2.5rem;
+        margin-bottom: 1rem;
+    }}
+    
+    .neuro-feature h4 {{
+        font-size: 1.1rem;
+        margin-bottom: 0.5rem;
+        color: {PRIMARY_COLOR};
+    }}
+    
+    .neuro-feature p {{
+        font-size: 0.9rem;
+        color: {TEXT_SECONDARY};
+        margin: 0;
+    }}
+    
+    /* ===== RESPONSIVE ===== */
+    @media (max-width: 768px) {{
+        .main .block-container {{
+            padding: 1rem 1rem 3rem;
+        }}
+        
+        h1 {{ font-size: 1.875rem; }}
+        h2 {{ font-size: 1.5rem; }}
+        
+        .neuro-hero {{
+            padding: 1.75rem 1.25rem;
+        }}
+        
+        .neuro-stepper {{
+            flex-wrap: wrap;
+        }}
+        
+        .neuro-step-connector {{
+            display: none;
+        }}
+    }}
+    
+    /* ===== HIDE STREAMLIT BRANDING ===== */
+    #MainMenu {{ visibility: hidden; }}
+    footer {{ visibility: hidden; }}
+    header {{ visibility: hidden; }}
+    
+    </style>
+    
+    <div class="neuro-bg-circles"></div>
+    <div class="neuro-circle-1"></div>
+    <div class="neuro-circle-2"></div>
+    <div class="neuro-circle-3"></div>
+    <div class="neuro-circle-4"></div>
+    <div class="neuro-circle-5"></div>
+    """
+
+
+def inject_css():
+    st.markdown(BASE_CSS, unsafe_allow_html=True)
+    st.markdown(GLOBAL_CSS, unsafe_allow_html=True)
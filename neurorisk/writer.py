@@ -0,0 +1,284 @@
+"""Write-behind queue for profile saves.
+
+The results page hands a finished session to ``ProfileWriter.submit`` and gets
+a Future back; a single background thread drains the queue and writes whatever
+has accumulated from all sessions in one group commit. Every submitted session
+is first appended (and fsynced) to a JSONL journal, so queued profiles survive
+a process restart.
+
+Each writer journals to its own file in a shared directory and holds an
+exclusive ``flock`` on it for as long as the process lives; ``writer_state``
+tracks the last committed sequence number per journal file. On start-up a
+writer adopts every journal whose lock it can take (its owner has exited):
+entries newer than that journal's ``last_seq`` are committed, then the file
+and its ``writer_state`` row are removed. A batch that cannot be committed at
+all (I/O error, corrupt DB) is moved to a new, unlocked journal file, so the
+next writer to start retries it.
+"""
+import fcntl
+import json
+import logging
+import os
+import queue
+import sqlite3
+import threading
+import time
+import uuid
+from concurrent.futures import Future
+from pathlib import Path
+
+from neurorisk.metrics import DB_LOCK_WAIT_SECONDS
+from neurorisk.profiles import clean_scores, insert_profiles
+
+log = logging.getLogger(__name__)
+
+_STOP = object()
+
+
+def _is_busy(error) -> bool:
+    msg = str(error).lower()
+    return "locked" in msg or "busy" in msg
+
+
+class ProfileWriter:
+    """Background writer with group commits and a durable spill-to-disk journal."""
+
+    def __init__(self, db, journal_dir, max_batch: int = 200, max_wait: float = 0.05):
+        self.db = db                          # ConnectionManager
+        self.journal_dir = Path(journal_dir)
+        self.journal_name = f"{os.getpid()}-{uuid.uuid4().hex[:12]}.journal"
+        self.journal_path = str(self.journal_dir / self.journal_name)
+        self._journal_fd = None               # holds the flock while this writer lives
+        self.max_batch = max_batch
+        self.max_wait = max_wait
+        self._queue = queue.Queue()
+        self._journal_lock = threading.Lock()
+        self._pending = 0                     # journaled but not yet committed
+        self._seq = 0
+        self._thread = None
+        self.stats = {"submitted": 0, "committed": 0, "failed": 0, "batches": 0, "replayed": 0,
+                      "busy_retries": 0}
+
+    # ---------- lifecycle ----------
+    def start(self) -> "ProfileWriter":
+        """Lock a fresh journal, replay journals left by exited writers, then start the writer thread."""
+        self.journal_dir.mkdir(parents=True, exist_ok=True)
+        self._journal_fd = os.open(self.journal_path, os.O_RDWR | os.O_CREAT, 0o644)
+        fcntl.flock(self._journal_fd, fcntl.LOCK_EX)
+        for path in sorted(self.journal_dir.glob("*.journal")):
+            if path.name != self.journal_name:
+                self._adopt(path)
+
+        self._thread = threading.Thread(target=self._run, name="profile-writer", daemon=True)
+        self._thread.start()
+        return self
+
+    def close(self, timeout: float = 10.0):
+        """Flush the queue and stop the writer thread."""
+        if self._thread is not None:
+            self._queue.put(_STOP)
+            self._thread.join(timeout)
+            self._thread = None
+        if self._journal_fd is not None and not self._pending:
+            # Everything is committed: nothing for another writer to adopt
+            try:
+                os.unlink(self.journal_path)
+                self._forget(self.journal_name)
+            except (OSError, sqlite3.Error) as e:
+                # e.g. at interpreter exit, with a throw-away DB directory already removed
+                log.warning("profile writer could not remove its journal: %s", e)
+        if self._journal_fd is not None:
+            os.close(self._journal_fd)
+            self._journal_fd = None
+
+    # ---------- producer side ----------
+    def submit(self, username, demographics: dict, responses: list, scores: dict) -> Future:
+        """Journal a finished session and queue it; the Future resolves to the profile id."""
+        session = {
+            "username": username,
+            "demographics": demographics,
+            "responses": responses,
+            "scores": clean_scores(scores),
+        }
+        future = Future()
+        with self._journal_lock:
+            self._seq += 1
+            seq = self._seq
+            with open(self.journal_path, "a", encoding="utf-8") as f:
+                f.write(json.dumps({"seq": seq, "session": session}) + "\n")
+                f.flush()
+                os.fsync(f.fileno())
+            self._pending += 1
+        self.stats["submitted"] += 1
+        self._queue.put((seq, session, future))
+        return future
+
+    def queue_size(self) -> int:
+        return self._queue.qsize()
+
+    # ---------- journal ----------
+    @staticmethod
+    def _read_journal(path):
+        with open(path, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    continue  # torn last line after a crash
+                yield entry["seq"], entry["session"]
+
+    def _adopt(self, path):
+        """Commit what an exited writer left in its journal, then remove the journal."""
+        try:
+            fd = os.open(path, os.O_RDWR)
+        except FileNotFoundError:
+            return  # adopted by another writer meanwhile
+        try:
+            try:
+                fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                return  # owner still running
+            if not os.path.exists(path):
+                return  # adopted and removed before we got the lock
+            with self.db.connection() as conn:
+                row = conn.execute(
+                    "SELECT last_seq FROM writer_state WHERE journal = ?", (path.name,)
+                ).fetchone()
+            last_seq = row["last_seq"] if row else 0
+            items = [(seq, session, None) for seq, session in self._read_journal(path) if seq > last_seq]
+            try:
+                for i in range(0, len(items), self.max_batch):
+                    results = self._commit_retrying(items[i:i + self.max_batch], path.name)
+                    self.stats["replayed"] += sum(1 for _, error in results if error is None)
+                    self.stats["failed"] += sum(1 for _, error in results if error is not None)
+            except Exception:
+                log.exception("profile writer could not replay %s; leaving it for the next start", path)
+                return
+            os.unlink(path)
+            self._forget(path.name)
+        finally:
+            os.close(fd)
+
+    def _spill(self, items):
+        """Move uncommitted entries to a journal file of their own, left unlocked for adoption."""
+        name = f"{os.getpid()}-{uuid.uuid4().hex[:12]}.journal"
+        tmp = self.journal_dir / f"{name}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            for seq, session, _ in items:
+                f.write(json.dumps({"seq": seq, "session": session}) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+        os.rename(tmp, self.journal_dir / name)
+
+    def _forget(self, journal_name):
+        with self.db.connection() as conn:
+            conn.execute("DELETE FROM writer_state WHERE journal = ?", (journal_name,))
+
+    def _truncate_journal(self):
+        os.ftruncate(self._journal_fd, 0)
+
+    def _mark_done(self, count):
+        with self._journal_lock:
+            self._pending -= count
+            if self._pending == 0:
+                self._truncate_journal()
+
+    # ---------- consumer side ----------
+    def _next_batch(self):
+        batch = [self._queue.get()]
+        deadline = time.monotonic() + self.max_wait
+        while len(batch) < self.max_batch and batch[-1] is not _STOP:
+            remaining = deadline - time.monotonic()
+            try:
+                batch.append(self._queue.get(timeout=max(remaining, 0)) if remaining > 0
+                             else self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self):
+        while True:
+            batch = self._next_batch()
+            stop = batch[-1] is _STOP
+            items = [item for item in batch if item is not _STOP]
+            if items:
+                self._write(items)
+            if stop:
+                return
+
+    def _write(self, items):
+        done = len(items)
+        try:
+            results = self._commit_retrying(items, self.journal_name)
+        except Exception as e:
+            results = [(None, e)] * len(items)
+            try:
+                self._spill(items)
+                log.exception("profile writer could not commit a batch of %d; spilled for replay", len(items))
+            except OSError:
+                # Keep them in our own journal; it is then left for adoption on exit
+                log.exception("profile writer could not commit or spill a batch of %d", len(items))
+                done = 0
+
+        for (_, _, future), (profile_id, error) in zip(items, results):
+            if error is None:
+                future.set_result(profile_id)
+            else:
+                future.set_exception(error)
+        failed = sum(1 for _, error in results if error is not None)
+        self.stats["committed"] += len(items) - failed
+        self.stats["failed"] += failed
+        self.stats["batches"] += 1
+        self._mark_done(done)
+
+    def _commit_retrying(self, items, journal_name):
+        delay = 0.05
+        while True:
+            try:
+                return self._commit(items, journal_name)
+            except sqlite3.OperationalError as e:
+                if not _is_busy(e):
+                    raise
+                # DB locked by another writer past busy_timeout: keep the batch and retry
+                log.warning("profile writer retrying after %s", e)
+                self.stats["busy_retries"] += 1
+                time.sleep(delay)
+                delay = min(delay * 2, 2.0)
+
+    def _commit(self, items, journal_name):
+        """Insert the batch in one transaction; returns [(profile_id, error)] per item."""
+        sessions = [
+            (s["username"], s["demographics"], s["responses"], s["scores"])
+            for _, s, _ in items
+        ]
+        with self.db.connection() as conn:
+            with DB_LOCK_WAIT_SECONDS.time():
+                conn.execute("BEGIN IMMEDIATE")
+            try:
+                conn.execute("SAVEPOINT batch")
+                results = [(pid, None) for pid in insert_profiles(conn, sessions)]
+                conn.execute("RELEASE batch")
+            except sqlite3.OperationalError:
+                raise
+            except Exception:
+                # A bad session must not sink the rest: fall back to one savepoint each
+                conn.execute("ROLLBACK TO batch")
+                conn.execute("RELEASE batch")
+                results = []
+                for session in sessions:
+                    conn.execute("SAVEPOINT one")
+                    try:
+                        results.append((insert_profiles(conn, [session])[0], None))
+                        conn.execute("RELEASE one")
+                    except sqlite3.OperationalError:
+                        raise
+                    except Exception as e:
+                        conn.execute("ROLLBACK TO one")
+                        conn.execute("RELEASE one")
+                        results.append((None, e))
+            conn.execute(
+                "INSERT INTO writer_state (journal, last_seq) VALUES (?, ?) "
+                "ON CONFLICT (journal) DO UPDATE SET last_seq = MAX(last_seq, excluded.last_seq)",
+                (journal_name, max(seq for seq, _, _ in items)),
+            )
+        return results
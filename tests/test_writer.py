@@ -0,0 +1,126 @@
+"""ProfileWriter: group commits, the per-session fallback and journal replay."""
+import json
+import sqlite3
+import threading
+
+import pytest
+
+from neurorisk.db import ConnectionManager
+from neurorisk.schema import init_schema
+from neurorisk.writer import ProfileWriter
+
+DEMOGRAPHICS = {"age": 30, "gender": "Female", "goal": "Wealth Accumulation", "region": "Europe"}
+SCORES = {"RCS": 0.5, "herding_score": 0.2}
+
+
+@pytest.fixture
+def db(tmp_path):
+    db = ConnectionManager(tmp_path / "profiles.db")
+    with db.connection() as conn:
+        init_schema(conn)
+    yield db
+    db.close_all()
+
+
+def _count(db, username=None):
+    with db.connection() as conn:
+        if username is None:
+            return conn.execute("SELECT COUNT(*) FROM profiles").fetchone()[0]
+        return conn.execute("SELECT COUNT(*) FROM profiles WHERE username = ?", (username,)).fetchone()[0]
+
+
+def _journals(journal_dir):
+    return sorted(p.name for p in journal_dir.glob("*.journal"))
+
+
+def _write_journal(path, sessions, first_seq=1):
+    with open(path, "w", encoding="utf-8") as f:
+        for seq, session in enumerate(sessions, first_seq):
+            f.write(json.dumps({"seq": seq, "session": session}) + "\n")
+
+
+def _session(username):
+    return {"username": username, "demographics": DEMOGRAPHICS, "responses": [], "scores": SCORES}
+
+
+def test_group_commit(db, tmp_path):
+    writer = ProfileWriter(db, tmp_path / "journals", max_wait=0.5)
+    gate = threading.Event()
+    commit = writer._commit
+    writer._commit = lambda items, name: gate.wait() and commit(items, name)
+    writer.start()
+
+    futures = [writer.submit(f"u{i}", DEMOGRAPHICS, [], SCORES) for i in range(50)]
+    gate.set()
+    ids = [f.result(timeout=10) for f in futures]
+
+    assert len(set(ids)) == 50 and _count(db) == 50
+    assert writer.stats["committed"] == 50 and writer.stats["batches"] < 50
+    writer.close()
+    assert _journals(tmp_path / "journals") == []   # all committed: nothing left to adopt
+
+
+def test_bad_session_does_not_sink_the_batch(db, tmp_path):
+    writer = ProfileWriter(db, tmp_path / "journals", max_wait=0.5)
+    gate = threading.Event()
+    commit = writer._commit
+    writer._commit = lambda items, name: gate.wait() and commit(items, name)
+    writer.start()
+
+    good = [writer.submit("good", DEMOGRAPHICS, [], SCORES) for _ in range(3)]
+    bad = writer.submit("bad", DEMOGRAPHICS, [None], SCORES)   # no response dict: insert raises
+    gate.set()
+
+    assert all(f.result(timeout=10) for f in good)
+    with pytest.raises(AttributeError):
+        bad.result(timeout=10)
+    assert writer.stats["batches"] == 1
+    assert _count(db, "good") == 3 and _count(db, "bad") == 0
+    writer.close()
+
+
+def test_failed_batch_is_replayed_by_the_next_writer(db, tmp_path):
+    journal_dir = tmp_path / "journals"
+    writer = ProfileWriter(db, journal_dir)
+
+    def broken(items, name):
+        raise sqlite3.DatabaseError("database disk image is malformed")
+
+    writer._commit = broken
+    writer.start()
+    futures = [writer.submit("lost", DEMOGRAPHICS, [], SCORES) for _ in range(3)]
+    for f in futures:
+        with pytest.raises(sqlite3.DatabaseError):
+            f.result(timeout=10)
+    writer.close()
+    assert _count(db) == 0 and _journals(journal_dir)   # the spilled batches
+
+    ProfileWriter(db, journal_dir).start().close()
+    assert _count(db, "lost") == 3
+    assert _journals(journal_dir) == []
+
+
+def test_replay_skips_committed_entries_and_locked_journals(db, tmp_path):
+    journal_dir = tmp_path / "journals"
+    live = ProfileWriter(db, journal_dir)
+    live._run = lambda: None   # owner still alive; its journal keeps an entry in flight
+    live.start()
+    _write_journal(live.journal_path, [_session("live")])
+    live._pending = 1
+
+    _write_journal(journal_dir / "1-crashed.journal", [_session("crashed")] * 4)
+    with db.connection() as conn:
+        conn.execute("INSERT INTO writer_state (journal, last_seq) VALUES ('1-crashed.journal', 1)")
+
+    writer = ProfileWriter(db, journal_dir).start()
+    assert writer.stats["replayed"] == 3
+    assert _count(db, "crashed") == 3 and _count(db, "live") == 0
+    assert _journals(journal_dir) == sorted([live.journal_name, writer.journal_name])
+    with db.connection() as conn:
+        assert conn.execute("SELECT journal FROM writer_state").fetchall() == []
+
+    live.close()   # pending entry: the journal stays for adoption
+    writer.close()
+    ProfileWriter(db, journal_dir).start().close()
+    assert _count(db, "live") == 1
+    assert _journals(journal_dir) == []